@@ -0,0 +1,354 @@
+"""
+Offline benchmarks for dojoutils.
+
+Measures OUI lookups (single and batch), MAC address formatting,
+interface enumeration and channel hop scheduling without network access,
+wireless hardware or root.  OUI lookups run against a synthetic IEEE
+registry generated into a temporary directory, interface enumeration
+against a fake '/sys/class/net' tree and hopping against MockBackend.
+
+Results are written as JSON (with the git commit and Python version) so
+runs can be compared across commits.
+
+Usage:
+    python benchmarks/run_benchmarks.py -o before.json
+    git checkout <other commit>
+    python benchmarks/run_benchmarks.py -o after.json --compare before.json
+
+    python benchmarks/run_benchmarks.py --quick --only oui mac
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+from datetime import datetime, timezone
+from time import perf_counter, sleep
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from dojoutils import ouilookup
+from dojoutils.channelhopper import hopper, async_hopper, HopStats
+from dojoutils.channelswitch import MockBackend
+from dojoutils.macformatter import format_mac_address, normalize_macs, MAC
+from dojoutils.wifiselector import get_wlan_interfaces
+
+SEED = 1234
+
+
+def _log(message):
+    """
+    Progress and comparison output; stdout only ever carries the JSON report.
+    """
+    print(message, file=sys.stderr)
+
+
+def _timeit(fn, number, repeat):
+    """
+    Run fn() `number` times per round for `repeat` rounds and return the
+    best and median seconds per call.
+    """
+    rounds = []
+    for _ in range(repeat):
+        started = perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((perf_counter() - started) / number)
+    best = min(rounds)
+    return {
+        "best_s": best,
+        "median_s": statistics.median(rounds),
+        "ops_per_s": 1 / best if best else None,
+    }
+
+
+def _per_item(result, items):
+    """
+    Convert the timings of a call that processes `items` items into
+    per-item figures.
+    """
+    return {
+        "items": items,
+        "best_s": result["best_s"],
+        "median_s": result["median_s"],
+        "items_per_s": items / result["best_s"] if result["best_s"] else None,
+    }
+
+
+def _random_macs(count, ouis, rng):
+    """
+    Return `count` MAC strings in mixed formats; half use a registered
+    OUI, half a random (mostly unregistered) prefix.
+    """
+    formats = ("{}:{}:{}:{}:{}:{}", "{}-{}-{}-{}-{}-{}", "{}{}.{}{}.{}{}")
+    macs = []
+    for i in range(count):
+        prefix = rng.choice(ouis) if i % 2 else rng.getrandbits(24)
+        value = prefix << 24 | rng.getrandbits(24)
+        octets = [f"{value >> shift & 0xff:02x}" for shift in range(40, -8, -8)]
+        if i % 3 == 0:
+            octets = [octet.upper() for octet in octets]
+        macs.append(formats[i % len(formats)].format(*octets))
+    return macs
+
+
+def write_registry(directory, ma_l=35000, ma_m=5000, ma_s=5000, cid=500, rng=None):
+    """
+    Write synthetic MA-L ('oui.txt'), MA-M ('mam.txt'), MA-S ('oui36.txt')
+    and CID ('cid.txt') registries in the IEEE text format.  All four are
+    written so get_oui_database() finds every registry locally.
+
+    Returns:
+    list: The MA-L OUIs (ints) that were registered.
+    """
+    rng = rng or random.Random(SEED)
+    ouis = rng.sample(range(1 << 24), ma_l + ma_m + ma_s + cid)
+    ma_l_ouis, ma_m_ouis = ouis[:ma_l], ouis[ma_l:ma_l + ma_m]
+    ma_s_ouis, cid_ouis = ouis[ma_l + ma_m:ma_l + ma_m + ma_s], ouis[ma_l + ma_m + ma_s:]
+
+    def entry(oui, base16, vendor):
+        hex_field = "-".join(f"{oui:06X}"[i:i + 2] for i in (0, 2, 4))
+        return (f"{hex_field}   (hex)\t\t{vendor}\n"
+                f"{base16}     (base 16)\t\t{vendor}\n"
+                f"\t\t\t\t1 Example Street\n\t\t\t\tSpringfield  12345\n\t\t\t\tUS\n\n")
+
+    with open(os.path.join(directory, "oui.txt"), "w", encoding="utf-8") as f:
+        f.write("OUI/MA-L\t\t\t\t\t\t\tOrganization\ncompany_id\t\t\t\t\t\tOrganization\n\n")
+        for oui in ma_l_ouis:
+            f.write(entry(oui, f"{oui:06X}", f"Vendor {oui:06X}, Inc."))
+    with open(os.path.join(directory, "mam.txt"), "w", encoding="utf-8") as f:
+        for oui in ma_m_ouis:
+            block = rng.randrange(16)
+            f.write(entry(oui, f"{block:X}00000-{block:X}FFFFF", f"MA-M {oui:06X}{block:X} Ltd"))
+    with open(os.path.join(directory, "oui36.txt"), "w", encoding="utf-8") as f:
+        for oui in ma_s_ouis:
+            block = rng.randrange(1 << 12)
+            f.write(entry(oui, f"{block:03X}000-{block:03X}FFF", f"MA-S {oui:06X}{block:03X} GmbH"))
+    with open(os.path.join(directory, "cid.txt"), "w", encoding="utf-8") as f:
+        for oui in cid_ouis:
+            f.write(entry(oui, f"{oui:06X}", f"CID {oui:06X} Corp"))
+    return ma_l_ouis
+
+
+def write_sys_class_net(directory, wireless=8, wired=24):
+    """
+    Write a fake '/sys/class/net' tree: `wireless` interfaces with a
+    'wireless' subdirectory and `wired` interfaces without one.
+    """
+    rng = random.Random(SEED)
+    names = [f"wlan{i}" for i in range(wireless)] + [f"eth{i}" for i in range(wired)]
+    for name in names:
+        path = os.path.join(directory, name)
+        os.makedirs(path)
+        if name.startswith("wlan"):
+            os.mkdir(os.path.join(path, "wireless"))
+        with open(os.path.join(path, "address"), "w") as f:
+            f.write(":".join(f"{rng.getrandbits(8):02x}" for _ in range(6)) + "\n")
+        with open(os.path.join(path, "operstate"), "w") as f:
+            f.write("up\n")
+
+
+def bench_oui(workdir, quick):
+    """
+    OUI index build/load times and single and batch lookup throughput.
+    """
+    rng = random.Random(SEED)
+    ouis = write_registry(workdir, rng=rng)
+    ouilookup.set_oui_location(os.path.join(workdir, "oui.txt"))
+    paths = ouilookup.default_registry_paths()
+
+    def cold_load():
+        os.remove(paths[0] + ouilookup.OUI_CACHE_SUFFIX)
+        ouilookup.OUIDatabase(paths)
+
+    ouilookup.OUIDatabase(paths)  # Writes the cache cold_load() removes
+    results = {
+        "index_build": _timeit(cold_load, 1, 2 if quick else 5),
+        "index_load_cached": _timeit(lambda: ouilookup.OUIDatabase(paths), 1, 3 if quick else 10),
+    }
+
+    database = ouilookup.get_oui_database(log=_log)
+    results["entries"] = len(database)
+    macs = _random_macs(20000 if quick else 200000, ouis, rng)
+    single = iter(macs * 2)
+    results["oui_lookup"] = _timeit(lambda: ouilookup.oui_lookup(next(single)), 5000, 3 if quick else 5)
+
+    def batch():
+        for _ in ouilookup.oui_lookup_many(macs, log=_log):
+            pass
+
+    results["oui_lookup_many"] = _per_item(_timeit(batch, 1, 2 if quick else 3), len(macs))
+    return results
+
+
+def bench_mac(quick):
+    """
+    MAC parsing and formatting throughput: per call and batched.
+    """
+    rng = random.Random(SEED)
+    macs = _random_macs(20000 if quick else 200000, [rng.getrandbits(24) for _ in range(100)], rng)
+    repeat = 3 if quick else 5
+
+    def per_call():
+        for mac in macs:
+            format_mac_address(mac)
+
+    def per_call_upper():
+        for mac in macs:
+            format_mac_address(mac, case="upper", sep="-")
+
+    def mac_objects():
+        for mac in macs:
+            MAC(mac)
+
+    return {
+        "format_mac_address": _per_item(_timeit(per_call, 1, repeat), len(macs)),
+        "format_mac_address_upper_dash": _per_item(_timeit(per_call_upper, 1, repeat), len(macs)),
+        "MAC_parse": _per_item(_timeit(mac_objects, 1, repeat), len(macs)),
+        "normalize_macs": _per_item(_timeit(lambda: normalize_macs(macs), 1, repeat), len(macs)),
+    }
+
+
+def bench_interfaces(workdir, quick):
+    """
+    Interface enumeration against a fake '/sys/class/net' tree.
+    """
+    results = {}
+    for wireless, wired in ((2, 4), (8, 24), (64, 192)):
+        if_dir = os.path.join(workdir, f"net-{wireless}-{wired}")
+        write_sys_class_net(if_dir, wireless, wired)
+        assert len(get_wlan_interfaces(if_dir)) == wireless
+        results[f"{wireless}_wireless_{wired}_wired"] = _timeit(
+            lambda: get_wlan_interfaces(if_dir), 50 if quick else 200, 3 if quick else 5)
+    return results
+
+
+def _hop_result(dwell, elapsed, stats, backend):
+    snapshot = stats.snapshot()
+    configured = 1 / dwell
+    achieved = len(backend.switches) / elapsed
+    return {
+        "dwell_s": dwell,
+        "configured_hops_per_s": configured,
+        "achieved_hops_per_s": achieved,
+        "achieved_ratio": achieved / configured,
+        "overruns": snapshot["overruns"],
+        "mean_interval_s": snapshot["mean_interval"],
+        "mean_switch_latency_s": snapshot["mean_latency"],
+    }
+
+
+def bench_hopping(quick):
+    """
+    Achieved vs configured hop rate of hopper() and async_hopper() with a
+    mock backend that takes `latency` seconds per switch.
+    """
+    duration = 0.5 if quick else 2.0
+    latency = 0.0005
+    results = {"switch_latency_s": latency, "threaded": [], "async": []}
+    for dwell in (0.1, 0.02, 0.005, 0.001):
+        backend, stats, stop_event = MockBackend(latency=latency), HopStats(), threading.Event()
+        thread = threading.Thread(target=hopper, args=("bench0", dwell, "all", None, "sequential", stop_event),
+                                  kwargs={"backend": backend, "stats": stats})
+        started = perf_counter()
+        thread.start()
+        sleep(duration)
+        stop_event.set()
+        thread.join()
+        results["threaded"].append(_hop_result(dwell, perf_counter() - started, stats, backend))
+
+        async def run_async():
+            backend, stats = MockBackend(latency=latency), HopStats()
+            task = asyncio.create_task(async_hopper("bench0", dwell, "all", None, "sequential",
+                                                    backend=backend, stats=stats))
+            started = perf_counter()
+            await asyncio.sleep(duration)
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            return _hop_result(dwell, perf_counter() - started, stats, backend)
+
+        results["async"].append(asyncio.run(run_async()))
+    return results
+
+
+BENCHMARKS = {
+    "oui": lambda workdir, quick: bench_oui(workdir, quick),
+    "mac": lambda workdir, quick: bench_mac(quick),
+    "interfaces": lambda workdir, quick: bench_interfaces(workdir, quick),
+    "hopping": lambda workdir, quick: bench_hopping(quick),
+}
+
+
+def _git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except FileNotFoundError:
+        return None
+    return result.stdout.strip() or None
+
+
+def _compare(current, baseline, path=""):
+    """
+    Print the ratio of every timing/throughput figure to the baseline run.
+    """
+    for key, value in current.items():
+        old = baseline.get(key) if isinstance(baseline, dict) else None
+        name = f"{path}.{key}" if path else key
+        if isinstance(value, dict):
+            _compare(value, old, name)
+        elif isinstance(value, list) and isinstance(old, list):
+            for i, (new_item, old_item) in enumerate(zip(value, old)):
+                if isinstance(new_item, dict):
+                    _compare(new_item, old_item, f"{name}[{i}]")
+        elif key.endswith(("_s", "_per_s")) and isinstance(value, (int, float)) and old:
+            _log(f"  {name:<70} {old:>12.6g} -> {value:>12.6g}  ({value / old:.2f}x)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the dojoutils offline benchmarks.")
+    parser.add_argument("-o", "--output", help="Write results to this JSON file (default: stdout)")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="Run only these benchmarks")
+    parser.add_argument("--quick", action="store_true", help="Smaller inputs and fewer rounds")
+    parser.add_argument("--compare", metavar="JSON", help="Print ratios against a previous results file")
+    args = parser.parse_args(argv)
+
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "quick": args.quick,
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="dojoutils-bench-") as workdir:
+        for name in args.only or BENCHMARKS:
+            _log(f"Running {name} benchmarks...")
+            report["results"][name] = BENCHMARKS[name](workdir, args.quick)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        _log(f"\nCompared with {baseline.get('commit')} ({args.compare}):")
+        _compare(report["results"], baseline.get("results", {}))
+
+
+if __name__ == "__main__":
+    main()
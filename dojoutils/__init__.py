@@ -1,82 +1,182 @@
+"""
+dojoutils: utilities for wireless tooling.
+
+Public names are loaded lazily (PEP 562): `import dojoutils` imports no
+submodule, and each name's module is imported the first time the name is
+accessed.  A script that only uses drawline() or format_mac_address()
+never pays for requests, asyncio or subprocess.
+"""
+
+import importlib
+
 __version__ = "0.1.0"
 
-from .channelhopper import (
-    supported_adapters, 
-    channel_mappings, 
-    get_channel_list, 
-    hopper,
-    WIFI_CHANNELS,
-    SUPPORTED_WIFI_ADAPTERS,
-    DEFAULT_WIFI_CHANNELS
-)
+# Submodule -> the public names it provides
+_EXPORTS = {
+    "channelhopper": [
+        "supported_adapters",
+        "channel_mappings",
+        "get_channel_list",
+        "get_channel_plan",
+        "make_channel",
+        "Channel",
+        "ChannelPlan",
+        "CHANNEL_PLANS",
+        "DEFAULT_CHANNEL_PLAN",
+        "hopper",
+        "async_hopper",
+        "HopStats",
+        "ChannelActivity",
+        "ChannelFeed",
+        "ChannelFeedReader",
+        "calibrate_switch_costs",
+        "plan_hop_order",
+        "partition_channels",
+        "revisit_time",
+        "coordinated_hopper",
+        "WIFI_CHANNELS",
+        "SUPPORTED_WIFI_ADAPTERS",
+        "DEFAULT_WIFI_CHANNELS",
+    ],
+    "channelswitch": [
+        "ChannelSwitchBackend",
+        "ChannelSwitchError",
+        "Nl80211Backend",
+        "IwBackend",
+        "MockBackend",
+        "channel_to_frequency",
+        "get_backend",
+    ],
+    "iwinfo": [
+        "PhyChannel",
+        "parse_iw_phy",
+        "parse_iw_reg",
+        "iface_phy",
+        "get_phy_channels",
+        "usable_channels",
+        "invalidate_phy_cache",
+        "IwInterface",
+        "parse_iw_dev",
+        "get_iw_interfaces",
+        "get_iw_interface",
+        "invalidate_iw_dev_cache",
+    ],
+    "wifiselector": [
+        "get_wlan_interfaces",
+        "interface_selector",
+        "InterfaceInventory",
+        "InterfaceInfo",
+        "get_inventory",
+    ],
+    "macformatter": [
+        "format_mac_address",
+        "normalize_macs",
+        "mac_values",
+        "MAC",
+    ],
+    "ouilookup": [
+        "oui_lookup",
+        "oui_lookup_result",
+        "oui_lookup_many",
+        "check_for_oui_file",
+        "download_oui_file",
+        "refresh_registry",
+        "set_oui_location",
+        "get_oui_database",
+        "OUIDatabase",
+        "OUILookupResult",
+        "OUI_FILE",
+        "OUI_URL",
+        "OUI_REGISTRIES",
+    ],
+    "getos": [
+        "os_is",
+    ],
+    "rootcheck": [
+        "check_root",
+    ],
+    "shellcommands": [
+        "run_shell_cmd",
+        "run_commands",
+        "CommandResult",
+        "iw_state_changed",
+    ],
+    "linuxcommands": [
+        "link_down",
+        "link_up",
+        "set_mode",
+        "set_channel",
+        "get_iface_mode",
+        "set_mac",
+        "add_route",
+        "check_service",
+        "start_service",
+        "enable_service",
+        "stop_service",
+        "disable_service",
+        "is_installed",
+        "LinkTransaction",
+    ],
+    "asynccommands": [
+        "run_cmd_async",
+        "link_down_async",
+        "link_up_async",
+        "set_mode_async",
+        "set_channel_async",
+        "get_iface_mode_async",
+        "set_mac_async",
+        "add_route_async",
+        "check_service_async",
+        "start_service_async",
+        "enable_service_async",
+        "stop_service_async",
+        "disable_service_async",
+        "is_installed_async",
+    ],
+    "bpffilter": [
+        "parse_prefix",
+        "merge_prefixes",
+        "compile_prefix_filter",
+        "vendor_filter",
+    ],
+    "dpkgstatus": [
+        "DpkgStatus",
+        "PackageStatus",
+        "parse_dpkg_status",
+        "get_dpkg_status",
+        "packages_installed",
+        "package_versions",
+    ],
+    "services": [
+        "ServiceState",
+        "ServiceActionResult",
+        "parse_systemctl_show",
+        "parse_action_errors",
+        "service_states",
+        "services_active",
+        "manage_services",
+    ],
+    "instrumentation": [
+        "InstrumentationEvent",
+    ],
+    "draw_line": [
+        "drawline",
+    ],
+}
 
-from .wifiselector import (
-    get_wlan_interfaces,
-    interface_selector
-)
+_LAZY_IMPORTS = {name: module for module, names in _EXPORTS.items() for name in names}
 
-from .macformatter import format_mac_address
+__all__ = list(_LAZY_IMPORTS)
 
-from .ouilookup import (
-    oui_lookup,
-    check_for_oui_file,
-    download_oui_file,
-    OUI_FILE,
-    OUI_URL
-)
 
-from .getos import os_is
-from .rootcheck import check_root
-from .shellcommands import run_shell_cmd
-from .linuxcommands import (
-    link_down,
-    link_up,
-    set_mode,
-    set_channel,
-    get_iface_mode,
-    set_mac,
-    add_route,
-    check_service,
-    start_service,
-    enable_service,
-    stop_service,
-    disable_service,
-    is_installed
-)
+def __getattr__(name):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
 
-from .draw_line import drawline
 
-__all__ = [
-    "getos",
-    "check_root",
-    "run_shell_cmd",
-    "link_down",
-    "link_up",
-    "set_mode",
-    "set_channel",
-    "get_iface_mode",
-    "set_mac",
-    "add_route",
-    "check_service",
-    "start_service",
-    "enable_service",
-    "stop_service",
-    "disable_service",
-    "is_installed",
-    "format_mac_address",
-    "oui_lookup",
-    "check_for_oui_file",
-    "download_oui_file",
-    "OUI_FILE",
-    "OUI_URL",
-    "rootcheck",
-    "supported_adapters",
-    "channel_mappings",
-    "get_channel_list",
-    "hopper",
-    "CHANNELS",
-    "ADAPTERS",
-    "DEFAULT_CHANNELS",
-    "get_wlan_interfaces",
-    "interface_selector",
-]
\ No newline at end of file
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,107 @@
+"""
+This module provides asyncio versions of the linuxcommands operations.
+
+Where linuxcommands only builds command strings, these coroutines run
+them with asyncio.create_subprocess_exec (no shell), so dozens of
+interfaces and services can be managed from a single event loop.
+Cancelling the awaiting task kills the child process.
+
+Functions:
+    run_cmd_async(cmd): Runs a command, returns [stdout, stderr].
+    link_down_async(iface), link_up_async(iface), set_mode_async(iface, mode),
+    set_channel_async(iface, channel), get_iface_mode_async(iface),
+    set_mac_async(iface, mac), add_route_async(dest_net, gw, netmask, interface),
+    start_service_async(service), enable_service_async(service),
+    stop_service_async(service), disable_service_async(service):
+        Run the matching linuxcommands command, return [stdout, stderr].
+    check_service_async(service), is_installed_async(package):
+        Return True/False from the command's exit status.
+
+Example:
+    >>> await asyncio.gather(*(link_up_async(iface) for iface in ifaces))
+"""
+
+import asyncio
+import os
+import shlex
+from time import monotonic
+import dojoutils.instrumentation as instrumentation
+import dojoutils.linuxcommands as linuxcommands
+from dojoutils.shellcommands import iw_state_changed, _changes_interface
+
+
+async def _exec(cmd):
+    """
+    Run a command string or argv list; return (returncode, stdout, stderr).
+    """
+    argv = shlex.split(cmd) if isinstance(cmd, str) else list(cmd)
+    started = monotonic()
+    process = await asyncio.create_subprocess_exec(
+        *argv, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    try:
+        stdout, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        process.kill()
+        await process.wait()
+        raise
+    finally:
+        if _changes_interface(argv):
+            iw_state_changed()
+        if instrumentation.ENABLED:
+            instrumentation.record("command", os.path.basename(argv[0]), monotonic() - started,
+                                   process.returncode == 0, argv=argv, returncode=process.returncode)
+    return process.returncode, stdout.decode(), stderr.decode()
+
+
+async def run_cmd_async(cmd):
+    """
+    Executes a command (string or argv list) without a shell and returns
+    its standard output and standard error, like run_shell_cmd().
+
+    Returns:
+    list: [stdout, stderr]
+    """
+    _, stdout, stderr = await _exec(cmd)
+    return [stdout, stderr]
+
+
+async def link_down_async(iface):
+    return await run_cmd_async(linuxcommands.link_down(iface))
+
+async def link_up_async(iface):
+    return await run_cmd_async(linuxcommands.link_up(iface))
+
+async def set_mode_async(iface, mode):
+    return await run_cmd_async(linuxcommands.set_mode(iface, mode))
+
+async def set_channel_async(iface, channel):
+    return await run_cmd_async(linuxcommands.set_channel(iface, channel))
+
+async def get_iface_mode_async(iface):
+    return await run_cmd_async(linuxcommands.get_iface_mode(iface))
+
+async def set_mac_async(iface, mac):
+    return await run_cmd_async(linuxcommands.set_mac(iface, mac))
+
+async def add_route_async(dest_net, gw, netmask, interface):
+    return await run_cmd_async(linuxcommands.add_route(dest_net, gw, netmask, interface))
+
+async def check_service_async(service):
+    returncode, _, _ = await _exec(linuxcommands.check_service(service))
+    return returncode == 0
+
+async def start_service_async(service):
+    return await run_cmd_async(linuxcommands.start_service(service))
+
+async def enable_service_async(service):
+    return await run_cmd_async(linuxcommands.enable_service(service))
+
+async def stop_service_async(service):
+    return await run_cmd_async(linuxcommands.stop_service(service))
+
+async def disable_service_async(service):
+    return await run_cmd_async(linuxcommands.disable_service(service))
+
+async def is_installed_async(package):
+    returncode, _, _ = await _exec(linuxcommands.is_installed(package))
+    return returncode == 0
@@ -0,0 +1,190 @@
+"""
+This module compiles vendor and OUI selections into BPF capture filters.
+
+Matching vendors in Python means every frame is copied up to scapy and
+looked up.  A filter built here runs in the kernel instead, so frames
+from other vendors are dropped before the capture library sees them.
+
+Prefixes are (value, bits) pairs, the form OUIDatabase uses: value is
+the integer of the first `bits` bits of an address (24 for MA-L/CID, 28
+for MA-M, 36 for MA-S).  Before compiling, prefixes already covered by a
+shorter one are dropped and sibling prefixes are merged (00:C0:CA and
+00:C0:CB become one 23-bit prefix), so contiguous blocks cost a single
+masked comparison.
+
+Each prefix becomes a masked load from the 802.11 header, i.e.
+'wlan[10:4] & 0xffffff00 = 0x00c0ca00' for 00:C0:CA in addr2.  Prefixes
+longer than 32 bits add a one- or two-byte comparison for the rest.  The
+`wlan[]` offsets are relative to the 802.11 header, so the filter works
+on monitor-mode interfaces with or without radiotap headers.
+
+Filter generation needs no capture device; the returned strings can be
+passed to scapy's sniff(filter=...), tcpdump or libpcap.
+
+Functions:
+    parse_prefix(text): 'xx:xx:xx[:x...]' or 'hex/bits' -> (value, bits).
+    merge_prefixes(prefixes): Drops covered prefixes and merges siblings.
+    compile_prefix_filter(prefixes, fields=("addr2",)): Returns a BPF expression.
+    vendor_filter(pattern, fields=("addr2",), regex=False): BPF expression for a vendor.
+
+Usage:
+    >>> vendor_filter("Alfa, Inc")
+    'wlan[10:4] & 0xffffff00 = 0x00c0ca00'
+    >>> sniff(iface="wlan0mon", filter=vendor_filter("Espressif"), prn=handle)
+"""
+
+import re
+
+# Offsets of the address fields within the 802.11 header
+ADDRESS_OFFSETS = {
+    "addr1": 4,    # Receiver
+    "addr2": 10,   # Transmitter (absent in ACK/CTS frames)
+    "addr3": 16,   # BSSID / source / destination, depending on DS bits
+}
+
+_HEX_DIGITS = re.compile(r"[^0-9a-fA-F]")
+
+
+def parse_prefix(text):
+    """
+    Parse a prefix written as hex digits with optional separators.
+
+    '00:C0:CA' is a 24-bit prefix, '70:B3:D5:A9:F' a 36-bit one (4 bits
+    per digit).  An explicit length may follow a slash:
+    '00:C0:C8/22' (the digits are then truncated to that length).
+
+    Returns:
+    tuple: (value, bits)
+
+    Raises:
+    ValueError: On non-hex digits or a length outside 1-48.
+    """
+    digits, _, length = text.partition("/")
+    digits = _HEX_DIGITS.sub("", digits)
+    if not digits or len(digits) > 12:
+        raise ValueError(f"Invalid prefix: {text!r}")
+    value, bits = int(digits, 16), 4 * len(digits)
+    if length:
+        if not length.isdigit() or not 1 <= int(length) <= bits:
+            raise ValueError(f"Invalid prefix length: {text!r}")
+        value, bits = value >> (bits - int(length)), int(length)
+    return value, bits
+
+
+def merge_prefixes(prefixes):
+    """
+    Reduce a set of prefixes to the fewest that match the same addresses.
+
+    Prefixes inside a shorter prefix of the set are dropped, and pairs of
+    sibling prefixes (same length, differing only in the last bit) are
+    repeatedly replaced by their parent.
+
+    Parameters:
+    prefixes (iterable): (value, bits) tuples or prefix strings.
+
+    Returns:
+    list: (value, bits) tuples in address order.
+    """
+    by_length = {}
+    for prefix in prefixes:
+        value, bits = parse_prefix(prefix) if isinstance(prefix, str) else prefix
+        if not 1 <= bits <= 48 or not 0 <= value < 1 << bits:
+            raise ValueError(f"Invalid prefix: {prefix!r}")
+        by_length.setdefault(bits, set()).add(value)
+
+    # Drop prefixes covered by a shorter one
+    for bits in sorted(by_length):
+        values = by_length[bits]
+        for shorter in (length for length in by_length if length < bits):
+            values -= {value for value in values if value >> (bits - shorter) in by_length[shorter]}
+
+    # Merge siblings, longest first, so merged parents can merge again
+    for bits in range(48, 0, -1):
+        values = by_length.get(bits)
+        if not values:
+            continue
+        parents = {value >> 1 for value in values if value ^ 1 in values}
+        if parents:
+            values -= {child for parent in parents for child in (parent << 1, parent << 1 | 1)}
+            by_length.setdefault(bits - 1, set()).update(parents)
+
+    merged = [(value, bits) for bits, values in by_length.items() for value in values]
+    return sorted(merged, key=lambda prefix: (prefix[0] << (48 - prefix[1]), prefix[1]))
+
+
+def _load(offset, size, value, mask):
+    accessor = f"wlan[{offset}:{size}]" if size > 1 else f"wlan[{offset}]"
+    width = 2 * size
+    if mask == (1 << (8 * size)) - 1:
+        return f"{accessor} = 0x{value:0{width}x}"
+    return f"{accessor} & 0x{mask:0{width}x} = 0x{value & mask:0{width}x}"
+
+
+def _prefix_term(offset, value, bits):
+    """
+    Return the BPF comparison matching one prefix at an address offset.
+    """
+    address = value << (48 - bits)
+    if bits <= 32:
+        mask = ((1 << bits) - 1) << (32 - bits)
+        return _load(offset, 4, address >> 16, mask)
+    rest = bits - 32
+    size = 1 if rest <= 8 else 2
+    mask = ((1 << rest) - 1) << (8 * size - rest)
+    tail = (address >> (8 * (2 - size))) & ((1 << (8 * size)) - 1)
+    return f"({_load(offset, 4, address >> 16, 0xffffffff)} and {_load(offset + 4, size, tail, mask)})"
+
+
+def compile_prefix_filter(prefixes, fields=("addr2",)):
+    """
+    Compile prefixes into a BPF filter expression over 802.11 addresses.
+
+    Parameters:
+    prefixes (iterable): (value, bits) tuples or prefix strings (see
+    parse_prefix()); merged with merge_prefixes() first.
+    fields (iterable, optional): Address fields to test: 'addr1'
+    (receiver), 'addr2' (transmitter, default) and/or 'addr3'.  A frame
+    matches if any field matches any prefix.
+
+    Returns:
+    str: The filter expression.  An empty prefix set compiles to a filter
+    that matches nothing.
+
+    Note:
+    Kernels limit a filter to 4096 instructions (a few per prefix and
+    field), so vendors with many hundreds of OUIs may need narrower
+    patterns or fewer fields.
+    """
+    offsets = [ADDRESS_OFFSETS[field] for field in fields]
+    merged = merge_prefixes(prefixes)
+    terms = [_prefix_term(offset, value, bits) for offset in offsets for value, bits in merged]
+    if not terms:
+        return "wlan[0] & 0 = 1"  # Never true
+    return " or ".join(terms)
+
+
+def vendor_filter(pattern, fields=("addr2",), regex=False, database=None):
+    """
+    Build a BPF filter matching frames from vendors whose name matches a
+    pattern.
+
+    Parameters:
+    pattern (str): Case-insensitive vendor name substring, or a regular
+    expression if regex is True.
+    fields (iterable, optional): Address fields to test (see
+    compile_prefix_filter()).  Defaults to the transmitter (addr2).
+    regex (bool, optional): Treat pattern as a regular expression.
+    database (OUIDatabase, optional): Defaults to get_oui_database().
+
+    Returns:
+    str: The filter expression.
+
+    Raises:
+    FileNotFoundError: If no OUI database is available.
+    """
+    if database is None:
+        from dojoutils.ouilookup import get_oui_database
+        database = get_oui_database()
+        if database is None:
+            raise FileNotFoundError("OUI database not available")
+    return compile_prefix_filter(database.vendor_prefixes(pattern, regex=regex), fields)
@@ -1,11 +1,18 @@
 #!/usr/bin/env python3 
 
+import asyncio
+import mmap
+import os
+import struct
 import threading
-from time import sleep
-from random import choice
-from subprocess import run
-from os import geteuid
+from collections import deque, namedtuple
+from multiprocessing import shared_memory
+from time import sleep, monotonic, time
+from random import choice, choices
+import dojoutils.instrumentation as instrumentation
 from dojoutils.rootcheck import check_root
+from dojoutils.channelswitch import get_backend, channel_to_frequency, resolve_frequency, ChannelSwitchError
+from dojoutils.iwinfo import usable_channels
 
 
 # Supported channels for 2.4GHz, 5GHz, and 6GHz - Primary 20MHz channels only
@@ -58,11 +65,413 @@ SUPPORTED_WIFI_ADAPTERS = {
 }
 
 
+class Channel(namedtuple("Channel", ["band", "number", "frequency"])):
+    """
+    A band-qualified 20MHz channel: ("6GHz", 1, 5955) is not ("2.4GHz", 1, 2412).
+
+    str(channel) is the bare channel number, as used everywhere channels
+    used to be plain strings.
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        return str(self.number)
+
+
+def make_channel(number, band=None):
+    """
+    Build a Channel from a number and optional band.  Without a band,
+    channels 1-14 are 2.4GHz and others 5GHz; 6GHz must be explicit.
+    """
+    frequency = channel_to_frequency(number, band)
+    if band is None:
+        band = "2.4GHz" if frequency < 3000 else "5GHz"
+    return Channel(band, int(number), frequency)
+
+
+class ChannelPlan:
+    """
+    An immutable, hashable, ordered set of band-qualified channels.
+
+    Plans for every channel keyword (see channel_mappings()) and every
+    adapter in SUPPORTED_WIFI_ADAPTERS are built once at import, so
+    selecting a plan does no work and plans can be used as cache keys.
+    Membership tests are set lookups and accept a Channel, a
+    (band, number) tuple or a bare channel number (matching any band).
+
+    Usage:
+        plan = get_channel_plan("6GHz")
+        plan[0]                      # Channel(band='6GHz', number=1, frequency=5955)
+        ("6GHz", 37) in plan         # True
+        plan.frequencies             # frozenset of center frequencies (MHz)
+
+    Args:
+        channels (iterable): Channel objects, in hop order; duplicates are dropped.
+    """
+    __slots__ = ("channels", "frequencies", "_keys", "_numbers", "_hash")
+
+    def __init__(self, channels):
+        channels = tuple(dict.fromkeys(channels))
+        set_ = object.__setattr__
+        set_(self, "channels", channels)
+        set_(self, "frequencies", frozenset(channel.frequency for channel in channels))
+        set_(self, "_keys", frozenset((channel.band, channel.number) for channel in channels))
+        set_(self, "_numbers", frozenset(str(channel.number) for channel in channels))
+        set_(self, "_hash", hash(channels))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ChannelPlan is immutable")
+
+    def __contains__(self, item):
+        if isinstance(item, Channel):
+            return item.frequency in self.frequencies
+        if isinstance(item, tuple):
+            return (item[0], int(item[1])) in self._keys
+        return str(item) in self._numbers
+
+    def __iter__(self):
+        return iter(self.channels)
+
+    def __len__(self):
+        return len(self.channels)
+
+    def __getitem__(self, index):
+        return self.channels[index]
+
+    def __add__(self, other):
+        return ChannelPlan(self.channels + tuple(other))
+
+    def __eq__(self, other):
+        return isinstance(other, ChannelPlan) and self.channels == other.channels
+
+    def __hash__(self):
+        return self._hash
+
+    def __repr__(self):
+        return f"ChannelPlan({', '.join(f'{c.band}:{c.number}' for c in self.channels)})"
+
+    def numbers(self):
+        """
+        Return the channel numbers as a list of strings (the format of
+        get_channel_list()).
+        """
+        return [str(channel.number) for channel in self.channels]
+
+
+def _band_plan(band, numbers=None):
+    return ChannelPlan(make_channel(number, band) for number in (numbers or WIFI_CHANNELS[band]))
+
+
+BAND_CHANNEL_PLANS = {band: _band_plan(band) for band in WIFI_CHANNELS}
+
+# Plans behind every channel mapping keyword, built once at import
+CHANNEL_PLANS = {
+    "2.4GHz": BAND_CHANNEL_PLANS["2.4GHz"],   # Channels 1-11
+    "2.4GHz-all": _band_plan("2.4GHz", WIFI_CHANNELS["2.4GHz"] + ["12", "13"]),  # All 2.4GHz channels
+    "5GHz": BAND_CHANNEL_PLANS["5GHz"],  # All 5GHz channels (20MHz primary channels)
+    "5GHz-UNII1": _band_plan("5GHz", ["36", "40", "44", "48"]),  # 5GHz Sub-bands
+    "5GHz-UNII2": _band_plan("5GHz", ["52", "56", "60", "64"]),  # 5GHz Sub-bands
+    "5GHz-UNII3": _band_plan("5GHz", ["149", "153", "157", "161", "165"]),  # 5GHz Sub-bands
+    "6GHz": BAND_CHANNEL_PLANS["6GHz"],  # All 6GHz channels (20MHz primary channels)
+    "all": BAND_CHANNEL_PLANS["2.4GHz"] + BAND_CHANNEL_PLANS["5GHz"] + BAND_CHANNEL_PLANS["6GHz"]
+}
+DEFAULT_CHANNEL_PLAN = BAND_CHANNEL_PLANS["2.4GHz"] + BAND_CHANNEL_PLANS["5GHz"]
+_CHANNEL_LISTS = {keyword: plan.numbers() for keyword, plan in CHANNEL_PLANS.items()}
+
+
+def _infer_plan(channel_list):
+    """
+    Rebuild the band-qualified plan of a SUPPORTED_WIFI_ADAPTERS entry by
+    matching it against concatenations of the WIFI_CHANNELS band lists.
+    """
+    for bands in (("2.4GHz",), ("5GHz",), ("6GHz",), ("2.4GHz", "5GHz"), ("5GHz", "6GHz"),
+                  ("2.4GHz", "6GHz"), ("2.4GHz", "5GHz", "6GHz")):
+        if channel_list == sum((WIFI_CHANNELS[band] for band in bands), []):
+            return sum((BAND_CHANNEL_PLANS[band] for band in bands[1:]), BAND_CHANNEL_PLANS[bands[0]])
+    return get_channel_plan(channel_list)
+
+
 class RootPrivilegesError(Exception):
     """Exception raised when script is not run as root."""
     pass
 
 
+class HopStats:
+    """
+    Per-hop timing statistics recorded by hopper().
+
+    The most recent hops are kept in a fixed-size ring buffer, so the
+    object can be read from another thread while hopping runs without
+    growing without bound.
+
+    Usage:
+        stats = HopStats()
+        threading.Thread(target=hopper, args=("wlan0mon",), kwargs={"stats": stats}).start()
+        ...
+        print(stats.snapshot())
+
+    Args:
+        size (int): Number of recent hops to keep (default 1024).
+    """
+
+    def __init__(self, size=1024):
+        self._hops = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.hop_count = 0
+        self.overruns = 0
+
+    def record(self, timestamp, channel, latency, overrun=False):
+        """
+        Record one hop: monotonic switch time, channel, switch latency (s)
+        and whether the hop missed its deadline.
+        """
+        with self._lock:
+            self._hops.append((timestamp, channel, latency))
+            self.hop_count += 1
+            if overrun:
+                self.overruns += 1
+
+    def recent(self):
+        """
+        Return a list of the buffered (timestamp, channel, latency) tuples.
+        """
+        with self._lock:
+            return list(self._hops)
+
+    def snapshot(self):
+        """
+        Return a dict summarising the buffered hops:
+        hops, overruns, mean/max switch latency and the mean interval
+        actually achieved between hops (compare with the configured dwell).
+        """
+        with self._lock:
+            hops = list(self._hops)
+            hop_count, overruns = self.hop_count, self.overruns
+        latencies = [hop[2] for hop in hops]
+        return {
+            "hops": hop_count,
+            "overruns": overruns,
+            "mean_latency": sum(latencies) / len(latencies) if latencies else None,
+            "max_latency": max(latencies) if latencies else None,
+            "mean_interval": (hops[-1][0] - hops[0][0]) / (len(hops) - 1) if len(hops) > 1 else None,
+        }
+
+
+class ChannelActivity:
+    """
+    Per-channel activity feedback for hopper(mode="adaptive").
+
+    Call record() from a capture callback (e.g. scapy's sniff prn) with the
+    channel the frame was seen on: ideally its frequency from the radiotap
+    header, or a Channel / (band, number) tuple.  A bare channel number is
+    taken as 2.4GHz (1-14) or 5GHz, never 6GHz.  record() only appends to a
+    deque, which is atomic and cheap enough to call once per packet from
+    any thread; the hopper drains the events once per hop.
+
+    Scores are kept per center frequency (`scores`: MHz -> score), so 6GHz
+    channel 1 and 2.4GHz channel 1 never share activity.
+
+    Activity scores decay exponentially with the given half-life, and
+    every channel keeps a baseline weight (explore times the mean score,
+    plus one frame), so quiet channels are still visited now and then, a
+    channel that wakes up is noticed, and once activity has decayed away
+    the choice falls back to uniform.
+
+    Usage:
+        activity = ChannelActivity()
+        threading.Thread(target=hopper, args=("wlan0mon",),
+                         kwargs={"mode": "adaptive", "activity": activity}).start()
+        sniff(iface="wlan0mon", prn=lambda pkt: activity.record(pkt[RadioTap].ChannelFrequency))
+
+    Args:
+        half_life (float): Seconds for a channel's score to halve (default 10).
+        explore (float): Baseline weight of every channel relative to the
+            mean score, on top of an absolute weight of 1 (default 0.2).
+        min_dwell (float): Dwell multiplier for the quietest channels (default 0.5).
+        max_dwell (float): Dwell multiplier cap for the busiest channels (default 4.0).
+    """
+
+    def __init__(self, half_life=10.0, explore=0.2, min_dwell=0.5, max_dwell=4.0):
+        self.half_life = half_life
+        self.explore = explore
+        self.min_dwell = min_dwell
+        self.max_dwell = max_dwell
+        self.scores = {}
+        self._events = deque()
+        self._updated = monotonic()
+
+    def record(self, channel, count=1, band=None):
+        """
+        Record `count` frames seen on `channel` (a frequency in MHz, Channel,
+        (band, number) tuple, or channel number with an optional band).
+        Safe to call per packet.
+        """
+        self._events.append((channel, band, count))
+
+    def update(self):
+        """
+        Decay the scores for the time elapsed since the last update and add
+        the activity recorded since then.  Called by the hopper every hop.
+        """
+        now = monotonic()
+        decay = 0.5 ** ((now - self._updated) / self.half_life)
+        self._updated = now
+        scores = {channel: score * decay for channel, score in self.scores.items()}
+        events = self._events
+        while True:
+            try:
+                channel, band, count = events.popleft()
+            except IndexError:
+                break
+            frequency = resolve_frequency(channel, band)
+            scores[frequency] = scores.get(frequency, 0.0) + count
+        self.scores = scores
+
+    def choose(self, channels):
+        """
+        Pick the next channel, weighted by activity score plus the
+        exploration baseline.
+        """
+        scores = self.scores
+        weights = [scores.get(resolve_frequency(channel), 0.0) for channel in channels]
+        # The absolute 1.0 (as in dwell_for()) lets decayed scores fade
+        # back to uniform instead of keeping their relative weights
+        floor = self.explore * sum(weights) / len(weights) + 1.0
+        return choices(channels, [weight + floor for weight in weights])[0]
+
+    def dwell_for(self, channel, dwell, channels):
+        """
+        Scale the base dwell by the channel's score relative to the mean,
+        clamped to [min_dwell, max_dwell].
+        """
+        scores = self.scores
+        mean = sum(scores.get(resolve_frequency(c), 0.0) for c in channels) / len(channels)
+        ratio = (scores.get(resolve_frequency(channel), 0.0) + 1.0) / (mean + 1.0)
+        return dwell * min(self.max_dwell, max(self.min_dwell, ratio))
+
+
+# Shared memory layout of a ChannelFeed: sequence counter, then the payload
+# (channel, frequency MHz, switch time (time.time()), hop number).
+_FEED_SEQ = struct.Struct("=Q")
+_FEED_DATA = struct.Struct("=IIdQ")
+_FEED_SIZE = _FEED_SEQ.size + _FEED_DATA.size
+# How long ChannelFeedReader.read() waits for a writer stuck mid-update
+FEED_READ_TIMEOUT = 0.5
+
+ChannelReading = namedtuple("ChannelReading", ["channel", "frequency", "timestamp", "sequence"])
+
+
+class ChannelFeed:
+    """
+    Publishes the hopper's current channel into shared memory.
+
+    Pass a ChannelFeed to hopper(feed=...) and hand its `name` to other
+    processes, which read it with ChannelFeedReader.  Updates use a
+    seqlock: the counter is odd while a write is in progress, so readers
+    never see a torn (channel, timestamp) pair and never block the writer.
+    There is one writer per feed.
+
+    Args:
+        name (str): Optional; shared memory name (default: generated).
+    """
+
+    def __init__(self, name=None):
+        self._shm = shared_memory.SharedMemory(name=name, create=True, size=_FEED_SIZE)
+        self.name = self._shm.name
+        self._buf = self._shm.buf
+        self._seq = 0
+        self._hops = 0
+
+    def publish(self, channel, timestamp=None, band=None):
+        """
+        Publish a channel switch (timestamp defaults to time.time()).
+        """
+        # Build the record before taking the seqlock, so a bad channel
+        # raises here instead of leaving the counter odd for good
+        data = _FEED_DATA.pack(int(channel), channel_to_frequency(channel, band),
+                               time() if timestamp is None else timestamp, self._hops + 1)
+        self._hops += 1
+        self._seq += 1  # Odd: write in progress
+        _FEED_SEQ.pack_into(self._buf, 0, self._seq)
+        self._buf[_FEED_SEQ.size:_FEED_SEQ.size + len(data)] = data
+        self._seq += 1  # Even: consistent
+        _FEED_SEQ.pack_into(self._buf, 0, self._seq)
+
+    def close(self, unlink=True):
+        """
+        Detach from (and by default remove) the shared memory segment.
+        """
+        self._buf = None
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+
+
+class ChannelFeedReader:
+    """
+    Reads the live channel published by a ChannelFeed in another process.
+
+    read() only touches shared memory (no syscalls or IPC round trips), so
+    it can be called for every captured frame.
+
+    Usage:
+        reader = ChannelFeedReader(feed_name)
+        channel, frequency, timestamp, sequence = reader.read()
+
+    Args:
+        name (str): The feed's shared memory name (ChannelFeed.name).
+    """
+
+    def __init__(self, name):
+        # Map /dev/shm directly: attaching through SharedMemory would
+        # register the segment with this process's resource tracker (on
+        # Python < 3.13), which unlinks the writer's segment on exit.
+        with open(os.path.join("/dev/shm", name.lstrip("/")), "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), _FEED_SIZE, access=mmap.ACCESS_READ)
+        self._buf = self._mmap
+
+    def read(self):
+        """
+        Return the latest ChannelReading(channel, frequency, timestamp,
+        sequence).  All fields are 0 until the first hop is published.
+
+        Raises TimeoutError if the writer stays mid-update for over
+        FEED_READ_TIMEOUT seconds (i.e. it died while publishing).
+        """
+        buf = self._buf
+        deadline = None
+        while True:
+            before = _FEED_SEQ.unpack_from(buf, 0)[0]
+            if not before & 1:
+                reading = _FEED_DATA.unpack_from(buf, _FEED_SEQ.size)
+                if _FEED_SEQ.unpack_from(buf, 0)[0] == before:
+                    return ChannelReading(*reading)
+            # Writer mid-update; a write takes microseconds, so only start
+            # the clock (and yield the CPU) once the fast retry fails
+            if deadline is None:
+                deadline = monotonic() + FEED_READ_TIMEOUT
+            elif monotonic() > deadline:
+                raise TimeoutError("channel feed writer stalled mid-update")
+            else:
+                sleep(0)
+
+    def close(self):
+        self._buf = None
+        self._mmap.close()
+
+
+def _wait(seconds, stop_event=None):
+    """
+    Sleep for `seconds`, returning early if stop_event is set.
+    """
+    if seconds <= 0:
+        return
+    if stop_event:
+        stop_event.wait(seconds)
+    else:
+        sleep(seconds)
+
+
 def supported_adapters():
     """
     Print the list of supported wireless adapters and their supported channels.
@@ -90,6 +499,9 @@ def get_channel_list(channel_selection):
     """
     Converts user input (channel mapping keyword or custom channel list) 
     into a list of valid channels.
+
+    Channel numbers alone are ambiguous between 2.4GHz and 6GHz; use
+    get_channel_plan() where the band matters.
     
     Args:
         channel_selection (str or list): User input defining channel selection.
@@ -97,68 +509,545 @@ def get_channel_list(channel_selection):
     Returns:
         list: A list of channels.
     """
-    if isinstance(channel_selection, list):  
+    if isinstance(channel_selection, (list, tuple, ChannelPlan)):
         # User provided a custom list of channels, return as list of strings
         return [str(channel) for channel in channel_selection] 
     
     # If user provided a string keyword, map it to predefined channels
-    channel_mapping = {
-        "2.4GHz": WIFI_CHANNELS["2.4GHz"],   # Channels 1-11
-        "2.4GHz-all": WIFI_CHANNELS["2.4GHz"] + ["12", "13"],  # All 2.4GHz channels
-        "5GHz": WIFI_CHANNELS["5GHz"],  # All 5GHz channels (20MHz primary channels)
-        "5GHz-UNII1": ["36", "40", "44", "48"],  # 5GHz Sub-bands
-        "5GHz-UNII2": ["52", "56", "60", "64"],  # 5GHz Sub-bands
-        "5GHz-UNII3": ["149", "153", "157", "161", "165"],  # 5GHz Sub-bands
-        "6GHz": WIFI_CHANNELS["6GHz"],  # All 6GHz channels (20MHz primary channels)
-        "all": WIFI_CHANNELS["2.4GHz"] + WIFI_CHANNELS["5GHz"] + WIFI_CHANNELS["6GHz"]
-    }
-    return channel_mapping.get(channel_selection, DEFAULT_WIFI_CHANNELS)  # Default to 2.4 & 5GHz
+    return list(_CHANNEL_LISTS.get(channel_selection, DEFAULT_WIFI_CHANNELS))  # Default to 2.4 & 5GHz
+
+
+def get_channel_plan(channel_selection):
+    """
+    Converts user input into a ChannelPlan.
 
+    Args:
+        channel_selection (str, list or ChannelPlan): A channel mapping
+            keyword (see channel_mappings()), or a list whose items are
+            Channel objects, (band, number) tuples such as ("6GHz", 37), or
+            bare numbers (1-14 are 2.4GHz, others 5GHz).
 
-def hopper(iface, dwell=0.15, channels=DEFAULT_WIFI_CHANNELS, adapter=None, mode="random", stop_event=None):
+    Returns:
+        ChannelPlan: The plan; keywords return the prebuilt plans.
+    """
+    if isinstance(channel_selection, ChannelPlan):
+        return channel_selection
+    if isinstance(channel_selection, (list, tuple)):
+        channels = []
+        for channel in channel_selection:
+            if isinstance(channel, Channel):
+                channels.append(channel)
+            elif isinstance(channel, tuple):
+                channels.append(make_channel(channel[1], channel[0]))
+            else:
+                channels.append(make_channel(channel))
+        return ChannelPlan(channels)
+    return CHANNEL_PLANS.get(channel_selection, DEFAULT_CHANNEL_PLAN)  # Default to 2.4 & 5GHz
+
+
+# Band-qualified plan of every adapter in SUPPORTED_WIFI_ADAPTERS, built once at import
+ADAPTER_CHANNEL_PLANS = {
+    adapter: _infer_plan(channel_list) for adapter, channel_list in SUPPORTED_WIFI_ADAPTERS.items()
+}
+
+
+def hopper(iface, dwell=0.15, channels=DEFAULT_WIFI_CHANNELS, adapter=None, mode="random", stop_event=None,
+           backend=None, stats=None, activity=None, feed=None, switch_costs=None):
     """
     Performs channel hopping on the specified interface.
     Requires root (sudo) privileges.
+
+    The channel list is first narrowed to the channels the interface's phy
+    has enabled (see dojoutils.iwinfo.usable_channels()).  A channel that is
+    still rejected while hopping is dropped from the rotation rather than
+    stopping the hopper.
+
+    Hops are scheduled against absolute deadlines on the monotonic clock,
+    so the time spent switching is taken out of the dwell rather than
+    added to it and the hop rate does not drift.  If a switch overruns
+    its deadline the schedule restarts from that point instead of firing
+    a burst of catch-up hops.
     
-    Usage: hopper(iface, dwell, channels, adapter, mode, stop_event)
+    Usage: hopper(iface, dwell, channels, adapter, mode, stop_event, backend, stats, activity, feed, switch_costs)
 
     Args:
         iface (str): Network interface.
-        dwell (float): Time between channel switches.
-        channels (str or list): Can be "2.4GHz", "5GHz", "all", or a custom list (i.e. [1,6,11,36,40]).
+        dwell (float): Time between channel switches (start to start).
+        channels (str, list or ChannelPlan): Can be "2.4GHz", "5GHz", "all", or a custom list
+            (i.e. [1,6,11,36,40] or [("6GHz", 37)]); see get_channel_plan().  6GHz channels
+            are switched by frequency, never confused with the 2.4GHz channel of the same number.
         adapter (str): Optional; if specified, will override `channels` based on adapter capabilities.
-        mode (str): "random" (default) or "sequential" for sequential channel hopping.
+        mode (str): "random" (default), "sequential" for sequential channel hopping,
+            "adaptive" to favour (and dwell longer on) channels with recorded activity, or
+            "optimized" to cycle in an order that minimises retune cost (see plan_hop_order()).
         stop_event (threading.Event): Optional event to stop the channel hopper.
+        backend (str or ChannelSwitchBackend): Optional; how channels are switched.
+            "auto" (default) uses in-process nl80211 and falls back to running `iw`.
+            See dojoutils.channelswitch.
+        stats (HopStats): Optional; receives per-hop switch latency and overruns.
+        activity (ChannelActivity): Optional; activity feedback for "adaptive" mode.
+        feed (ChannelFeed): Optional; publishes each switch for other processes.
+        switch_costs (dict): Optional; (from, to) -> seconds for "optimized" mode.
+            Defaults to the adapter's calibrate_switch_costs() results, if any.
+
+    A channel the driver rejects (EINVAL and similar) is dropped from the
+    rotation.  Transient failures (EBUSY, ENETDOWN, EPERM, ...) keep the
+    channel and retry after a dwell.  The hopper stops when no channel is
+    left or the interface is gone.
+    """
+    channels = _resolve_channels(channels, adapter, iface)
+    if not channels:
+        print(f"Error: no usable channels on {iface}")
+        return
+
+    # Reuse one backend (i.e. one netlink socket) for every hop
+    switcher = get_backend(backend or "auto")
+    hops = _hop_sequence(channels, dwell, mode, activity, adapter, switch_costs)
+
+    deadline = monotonic()
+    try:
+        while not (stop_event and stop_event.is_set()):  # Stop if stop_event is set
+            try:
+                channel, hop_dwell = next(hops)
+
+                #print(f"Setting {iface} to channel {channel}")
+                started = monotonic()
+                try:
+                    switcher.set_channel(iface, channel.number, channel.band)
+                except ChannelSwitchError as e:
+                    if instrumentation.ENABLED:
+                        instrumentation.record("channel_switch", switcher.name, monotonic() - started, False,
+                                               iface=iface, channel=channel, error=str(e))
+                    if not e.rejected:
+                        if not e.transient:
+                            raise
+                        # Busy, link down, ...: keep the channel, try again next hop
+                        print(f"Error: {e} (retrying)")
+                        _wait(hop_dwell, stop_event)
+                        deadline = monotonic()
+                        continue
+                    channels = [c for c in channels if c != channel]
+                    if not channels:
+                        raise
+                    print(f"Error: {e} (dropping channel {channel})")
+                    hops = _hop_sequence(channels, dwell, mode, activity, adapter, switch_costs)
+                    continue
+                now = monotonic()
+                if instrumentation.ENABLED:
+                    instrumentation.record("channel_switch", switcher.name, now - started, True,
+                                           iface=iface, channel=channel)
+                if feed is not None:
+                    feed.publish(channel.number, band=channel.band)
+
+                deadline += hop_dwell
+                overrun = now > deadline
+                if overrun:
+                    deadline = now  # Resync rather than hop in a burst to catch up
+                if stats is not None:
+                    stats.record(started, channel, now - started, overrun)
+                _wait(deadline - now, stop_event)
+            except KeyboardInterrupt:
+                print("Exiting channel hopper")
+                break
+            except Exception as e:
+                print(f"Error: {e}")
+                break
+    finally:
+        if switcher is not backend:
+            switcher.close()
+
+
+async def async_hopper(iface, dwell=0.15, channels=DEFAULT_WIFI_CHANNELS, adapter=None, mode="random",
+                       backend=None, stats=None, activity=None, feed=None, switch_costs=None):
+    """
+    asyncio version of hopper(): hops until the task is cancelled.
+
+    Takes the same arguments as hopper() minus stop_event; stop it with
+    task.cancel().  Scheduling uses the event loop's monotonic clock, so
+    any number of interfaces can hop from one event loop without a thread
+    each.  Failed switches are handled as in hopper(); ChannelSwitchError
+    is raised out of the task when no channel is left or the interface
+    cannot be switched at all (i.e. it was removed).
+    Requires root (sudo) privileges.
+
+    Usage:
+        task = asyncio.create_task(async_hopper("wlan0mon", dwell=0.2))
+        ...
+        task.cancel()
+    """
+    channels = _resolve_channels(channels, adapter, iface)
+    if not channels:
+        raise ChannelSwitchError(f"no usable channels on {iface}")
+    switcher = get_backend(backend or "auto")
+    hops = _hop_sequence(channels, dwell, mode, activity, adapter, switch_costs)
+    loop = asyncio.get_running_loop()
+
+    deadline = loop.time()
+    try:
+        while True:
+            channel, hop_dwell = next(hops)
+            started = loop.time()
+            try:
+                await switcher.set_channel_async(iface, channel.number, channel.band)
+            except ChannelSwitchError as e:
+                if instrumentation.ENABLED:
+                    instrumentation.record("channel_switch", switcher.name, loop.time() - started, False,
+                                           iface=iface, channel=channel, error=str(e))
+                if not e.rejected:
+                    if not e.transient:
+                        raise
+                    await asyncio.sleep(hop_dwell)
+                    deadline = loop.time()
+                    continue
+                channels = [c for c in channels if c != channel]
+                if not channels:
+                    raise
+                hops = _hop_sequence(channels, dwell, mode, activity, adapter, switch_costs)
+                continue
+            now = loop.time()
+            if instrumentation.ENABLED:
+                instrumentation.record("channel_switch", switcher.name, now - started, True,
+                                       iface=iface, channel=channel)
+            if feed is not None:
+                feed.publish(channel.number, band=channel.band)
+
+            deadline += hop_dwell
+            overrun = now > deadline
+            if overrun:
+                deadline = now
+            if stats is not None:
+                stats.record(started, channel, now - started, overrun)
+            await asyncio.sleep(max(0.0, deadline - now))
+    finally:
+        if switcher is not backend:
+            switcher.close()
+
+
+def _adapter_plan(adapter):
+    """
+    Returns the ChannelPlan of an adapter (DEFAULT_CHANNEL_PLAN if unknown).
+    """
+    plan = ADAPTER_CHANNEL_PLANS.get(adapter)
+    if plan is None and adapter in SUPPORTED_WIFI_ADAPTERS:
+        # Entry added at runtime; infer and remember its plan
+        plan = ADAPTER_CHANNEL_PLANS[adapter] = _infer_plan(SUPPORTED_WIFI_ADAPTERS[adapter])
+    return plan or DEFAULT_CHANNEL_PLAN
+
+
+def _resolve_channels(channels, adapter, iface=None):
+    """
+    Returns the Channel list for hopper(): the adapter's channels if an
+    adapter is given, else the `channels` selection, narrowed to what the
+    interface's phy actually supports when that can be discovered.
     """
-    
-    # Import here to avoid circular import
-    from dojoutils.channelhopper import get_channel_list, SUPPORTED_WIFI_ADAPTERS, DEFAULT_WIFI_CHANNELS  # Ensure import works
-    
-    # Determine the channel list
     if adapter:
-        channels = SUPPORTED_WIFI_ADAPTERS.get(adapter, DEFAULT_WIFI_CHANNELS)
+        channels = list(_adapter_plan(adapter))
     else:
-        channels = get_channel_list(channels)
+        channels = list(get_channel_plan(channels))
+    if iface:
+        usable = usable_channels(iface, channels)
+        if usable is not None:
+            return usable
+    return list(channels)
+
+
+def _hop_sequence(channels, dwell, mode, activity=None, adapter=None, switch_costs=None):
+    """
+    Yields (channel, dwell) for each hop according to the hopping mode.
+    """
+    if mode == "adaptive" and activity is None:
+        activity = ChannelActivity()
+    if mode == "optimized":
+        channels = plan_hop_order(channels, switch_costs, adapter)
+        mode = "sequential"
 
     index = 0  # Used for sequential mode
-    while not (stop_event and stop_event.is_set()):  # Stop if stop_event is set
-        try:
-            if mode == "sequential":
-                channel = channels[index]  # Pick the next channel sequentially
-                index = (index + 1) % len(channels)  # Loop back when reaching the end
-            else:
-                channel = choice(channels)  # Default to random selection
-
-            #print(f"Setting {iface} to channel {channel}")
-            cmd = f"iw dev {iface} set channel {channel}"
-            run(cmd, shell=True, check=True)
-            sleep(dwell)
-        except KeyboardInterrupt:
-            print("Exiting channel hopper")
-            break
-        except Exception as e:
-            print(f"Error: {e}")
-            break
+    while True:
+        if mode == "sequential":
+            yield channels[index], dwell  # Pick the next channel sequentially
+            index = (index + 1) % len(channels)  # Loop back when reaching the end
+        elif mode == "adaptive":
+            activity.update()
+            channel = activity.choose(channels)
+            yield channel, activity.dwell_for(channel, dwell, channels)
+        else:
+            yield choice(channels), dwell  # Default to random selection
+
+
+# Retune cost model used when no measured cost is known for a channel pair:
+# a flat in-band cost, a much larger cross-band one, and a small term for
+# frequency distance so in-band neighbours stay adjacent.
+IN_BAND_SWITCH_COST = 1.0
+CROSS_BAND_SWITCH_COST = 10.0
+
+_switch_costs = {}  # adapter -> {(from, to): seconds}, see calibrate_switch_costs()
+_hop_orders = {}    # (adapter, channels, costs) -> planned order
+
+
+def _band_of(frequency):
+    return "2.4GHz" if frequency < 3000 else "5GHz" if frequency < 5925 else "6GHz"
+
+
+def _switch_cost(costs, a, b):
+    if costs:
+        cost = costs.get((a, b))
+        if cost is None:
+            cost = costs.get((str(a), str(b)))  # Tables keyed by channel number
+        if cost is not None:
+            return cost
+    fa, fb = a.frequency, b.frequency
+    base = IN_BAND_SWITCH_COST if _band_of(fa) == _band_of(fb) else CROSS_BAND_SWITCH_COST
+    return base + abs(fa - fb) / 1000
+
+
+def calibrate_switch_costs(iface, channels=DEFAULT_WIFI_CHANNELS, adapter=None, backend=None, repeats=3):
+    """
+    Measures how long the interface takes to switch between every ordered
+    pair of channels.  Requires root (sudo) privileges.
+
+    Each pair is timed `repeats` times (switch to `from`, then time the
+    switch to `to`) and the fastest sample is kept.  If `adapter` is given
+    the table is remembered and used by hopper(mode="optimized") for that
+    adapter.
+
+    Args:
+        iface (str): Network interface to calibrate on.
+        channels (str or list): Channels to measure.
+        adapter (str): Optional; adapter name to store the results under.
+        backend (str or ChannelSwitchBackend): Optional; see hopper().
+        repeats (int): Samples per pair (default 3).
+
+    Returns:
+        dict: (from Channel, to Channel) -> seconds.
+    """
+    channels = list(get_channel_plan(channels))
+    switcher = get_backend(backend or "auto")
+    costs = {}
+    try:
+        for a in channels:
+            for b in channels:
+                if a == b:
+                    continue
+                samples = []
+                for _ in range(repeats):
+                    switcher.set_channel(iface, a.number, a.band)
+                    started = monotonic()
+                    switcher.set_channel(iface, b.number, b.band)
+                    samples.append(monotonic() - started)
+                costs[(a, b)] = min(samples)
+    finally:
+        if switcher is not backend:
+            switcher.close()
+    if adapter:
+        _switch_costs[adapter] = costs
+        for key in [key for key in _hop_orders if key[0] == adapter]:
+            del _hop_orders[key]
+    return costs
+
+
+def plan_hop_order(channels, costs=None, adapter=None):
+    """
+    Orders channels into a cycle that visits each channel exactly once (so
+    every channel keeps a revisit interval of len(channels) * dwell) while
+    minimising the total retune time around the cycle.
+
+    Starts from a nearest-neighbour tour and improves it with 2-opt moves.
+    With the default cost model this keeps each band together, so a cycle
+    crosses bands only once per band instead of on nearly every hop.
+    Results are cached per (adapter, channels, costs).
+
+    Args:
+        channels (str, list or ChannelPlan): Channels to order (see get_channel_plan()).
+        costs (dict): Optional; (from, to) -> seconds, e.g. from
+            calibrate_switch_costs().  Missing pairs use the default model.
+        adapter (str): Optional; use (and cache under) this adapter's
+            calibrated costs when `costs` is not given.
+
+    Returns:
+        list: The Channels in hop order.
+    """
+    channels = list(get_channel_plan(channels))
+    if costs is None:
+        costs = _switch_costs.get(adapter)
+    key = (adapter, tuple(channels), frozenset(costs.items()) if costs else None)
+    order = _hop_orders.get(key)
+    if order is None:
+        order = _hop_orders[key] = _optimise_cycle(channels, costs)
+    return list(order)
+
+
+def _optimise_cycle(channels, costs):
+    if len(channels) < 3:
+        return channels
+    cost = {(a, b): _switch_cost(costs, a, b) for a in channels for b in channels if a != b}
+
+    def tour_cost(tour):
+        return sum(cost[(tour[i - 1], tour[i])] for i in range(len(tour)))
+
+    # Nearest-neighbour construction from the first channel
+    tour = [channels[0]]
+    remaining = set(channels[1:])
+    while remaining:
+        current = tour[-1]
+        nearest = min(remaining, key=lambda channel: (cost[(current, channel)], channels.index(channel)))
+        tour.append(nearest)
+        remaining.remove(nearest)
+
+    # 2-opt: reverse segments while that lowers the (possibly asymmetric) cycle cost
+    best = tour_cost(tour)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, len(tour) - 1):
+            for j in range(i + 1, len(tour)):
+                candidate = tour[:i] + tour[i:j + 1][::-1] + tour[j + 1:]
+                candidate_cost = tour_cost(candidate)
+                if candidate_cost < best - 1e-12:
+                    tour, best, improved = candidate, candidate_cost, True
+    return tour
+
+
+def partition_channels(interfaces, channels=None):
+    """
+    Splits a channel plan across several interfaces so that no two
+    interfaces hop the same channel.
+
+    Each channel is assigned to exactly one interface whose adapter
+    supports it.  An adapter's channels are narrowed to what its phy has
+    enabled under the current regulatory domain (see
+    iwinfo.usable_channels()) when that can be discovered.  The most
+    constrained channels (fewest capable adapters) are placed first, each
+    going to the capable interface with the fewest channels so far, so the
+    work is striped as evenly as capabilities allow.  Channels no
+    interface supports are left out.
+
+    Args:
+        interfaces (dict): Interface name -> adapter name (key of
+            SUPPORTED_WIFI_ADAPTERS) or None for DEFAULT_WIFI_CHANNELS.
+        channels (str or list): Optional; the plan to cover (see
+            get_channel_plan()).  Defaults to everything the adapters support.
+
+    Returns:
+        dict: Interface name -> list of Channels, in plan order.
+    """
+    capabilities = {}
+    for iface, adapter in interfaces.items():
+        supported = list(_adapter_plan(adapter) if adapter else DEFAULT_CHANNEL_PLAN)
+        usable = usable_channels(iface, supported)
+        capabilities[iface] = supported if usable is None else usable
+    if channels is None:
+        plan = list(dict.fromkeys(channel for supported in capabilities.values() for channel in supported))
+    else:
+        plan = list(get_channel_plan(channels))
+
+    capable = {
+        channel: [iface for iface, supported in capabilities.items() if channel in supported]
+        for channel in plan
+    }
+    partition = {iface: [] for iface in interfaces}
+    for channel in sorted(plan, key=lambda channel: len(capable[channel])):
+        if capable[channel]:
+            iface = min(capable[channel], key=lambda iface: len(partition[iface]))
+            partition[iface].append(channel)
+
+    order = {channel: position for position, channel in enumerate(plan)}
+    for assigned in partition.values():
+        assigned.sort(key=order.get)
+    return partition
+
+
+def revisit_time(partition, dwell=0.15):
+    """
+    Returns the worst-case time (seconds) between visits to any channel
+    when every interface cycles through its share of a partition
+    (see partition_channels()) with the given dwell.
+    """
+    return max((len(assigned) for assigned in partition.values()), default=0) * dwell
+
+
+def coordinated_hopper(interfaces, dwell=0.15, channels=None, stop_event=None, backend=None, stats=None):
+    """
+    Hops several interfaces from one scheduler, each over its own share
+    of the channel plan (see partition_channels()).
+
+    On every tick all interfaces are switched to the next channel of their
+    share, then the scheduler waits for the next monotonic deadline.  With
+    N adapters the time to revisit every channel drops to roughly 1/N of
+    a single hopper's.
+    Requires root (sudo) privileges.
+
+    Usage: coordinated_hopper({"wlan0": "awus036ach", "wlan1": "awus036ax"}, dwell, channels, stop_event)
+
+    Args:
+        interfaces (dict): Interface name -> adapter name or None.
+        dwell (float): Time between channel switches (start to start).
+        channels (str or list): Optional; plan to cover (default: all supported).
+        stop_event (threading.Event): Optional event to stop the hopper.
+        backend (str or ChannelSwitchBackend): Optional; shared by all interfaces.
+        stats (dict): Optional; interface name -> HopStats.
+
+    Channels an interface's driver rejects are dropped from its share, and
+    transient failures skip that interface for one tick, as in hopper().
+
+    Returns:
+        dict: The partition that was used (interface name -> channels),
+        without channels that were dropped while hopping.
+    """
+    partition = {iface: assigned for iface, assigned in partition_channels(interfaces, channels).items() if assigned}
+    if not partition:
+        return partition
+
+    switcher = get_backend(backend or "auto")
+    stats = stats or {}
+    index = 0
+    deadline = monotonic()
+    try:
+        while not (stop_event and stop_event.is_set()):
+            try:
+                for iface, assigned in list(partition.items()):
+                    channel = assigned[index % len(assigned)]
+                    started = monotonic()
+                    try:
+                        switcher.set_channel(iface, channel.number, channel.band)
+                    except ChannelSwitchError as e:
+                        now = monotonic()
+                        if instrumentation.ENABLED:
+                            instrumentation.record("channel_switch", switcher.name, now - started, False,
+                                                   iface=iface, channel=channel, error=str(e))
+                        if e.rejected:
+                            print(f"Error: {e} (dropping channel {channel} on {iface})")
+                            assigned.remove(channel)
+                            if not assigned:
+                                del partition[iface]
+                                if not partition:
+                                    raise
+                        elif e.transient:
+                            print(f"Error: {e} (retrying)")
+                        else:
+                            raise
+                        continue
+                    now = monotonic()
+                    if instrumentation.ENABLED:
+                        instrumentation.record("channel_switch", switcher.name, now - started, True,
+                                               iface=iface, channel=channel)
+                    if iface in stats:
+                        stats[iface].record(started, channel, now - started, overrun=now > deadline + dwell)
+                index += 1
+
+                deadline += dwell
+                if now > deadline:
+                    deadline = now  # Resync rather than hop in a burst to catch up
+                _wait(deadline - now, stop_event)
+            except KeyboardInterrupt:
+                print("Exiting channel hopper")
+                break
+            except Exception as e:
+                print(f"Error: {e}")
+                break
+    finally:
+        if switcher is not backend:
+            switcher.close()
+    return partition
 
 
 if __name__ == "__main__":
@@ -0,0 +1,429 @@
+"""
+This module provides pluggable channel-switch backends for the channel
+hopper.
+
+Switching channel by running `iw dev <iface> set channel <n>` costs a
+fork/exec (plus a shell, the way hopper used to do it) on every hop.  The
+nl80211 backend instead keeps one generic netlink socket open and sends
+NL80211_CMD_SET_CHANNEL directly, which takes microseconds.  The `iw`
+backend is kept as a fallback for systems where the socket cannot be
+opened, and the mock backend records switches so code that hops can be
+exercised without wireless hardware.
+
+Classes:
+    ChannelSwitchBackend: Base class; subclasses implement set_frequency().
+    Nl80211Backend: In-process nl80211 over generic netlink (Linux only).
+    IwBackend: Runs `iw` (without a shell) for every switch.
+    MockBackend: Records switches in memory.
+
+Functions:
+    channel_to_frequency(channel, band=None): Channel number to MHz.
+    resolve_frequency(channel, band=None): Channel, (band, number), number or MHz to MHz.
+    get_backend(name="auto"): Returns a backend instance by name.
+
+Usage:
+    from dojoutils.channelswitch import get_backend
+
+    with get_backend() as backend:
+        backend.set_channel("wlan0mon", 6)
+"""
+
+import asyncio
+import errno
+import os
+import re
+import socket
+import struct
+import threading
+from subprocess import run
+from time import monotonic, sleep
+
+import dojoutils.instrumentation as instrumentation
+from dojoutils.shellcommands import iw_state_changed
+
+
+# Errors meaning the channel itself was refused (not allowed, not supported)
+REJECTED_ERRNOS = {errno.EINVAL, errno.ERANGE, errno.EOPNOTSUPP}
+# Errors no amount of retrying fixes (interface gone, iw missing)
+FATAL_ERRNOS = {errno.ENODEV, errno.ENOENT}
+
+# iw reports kernel errors as "command failed: Invalid argument (-22)"
+_IW_ERRNO = re.compile(r"\(-(\d+)\)")
+
+
+class ChannelSwitchError(Exception):
+    """
+    Exception raised when a channel switch fails.
+
+    Attributes:
+        errno (int): The kernel error (i.e. errno.EINVAL), or None if unknown.
+        rejected (bool): The channel itself was refused; switching to it
+            again will fail the same way.
+        transient (bool): The switch failed for a reason that may pass
+            (i.e. EBUSY during a scan, ENETDOWN, EPERM); retry later.
+    """
+
+    def __init__(self, message, errno=None):
+        super().__init__(message)
+        self.errno = errno
+
+    @property
+    def rejected(self):
+        return self.errno in REJECTED_ERRNOS
+
+    @property
+    def transient(self):
+        return self.errno is not None and self.errno not in REJECTED_ERRNOS | FATAL_ERRNOS
+
+
+def _iw_error(argv, stderr, returncode):
+    match = _IW_ERRNO.search(stderr)
+    message = stderr.strip() or f"exit status {returncode}"
+    return ChannelSwitchError(f"{' '.join(argv)}: {message}", int(match.group(1)) if match else None)
+
+
+def channel_to_frequency(channel, band=None):
+    """
+    Convert a 20MHz channel number to its center frequency in MHz.
+
+    Channel numbers overlap between 2.4GHz and 6GHz (1, 5, 9, ...), so
+    6GHz channels must be given with band="6GHz".  Without a band,
+    channels 1-14 are taken as 2.4GHz and everything else as 5GHz.
+
+    Args:
+        channel (int or str): Channel number.
+        band (str): Optional; "2.4GHz", "5GHz" or "6GHz".
+
+    Returns:
+        int: Center frequency in MHz.
+    """
+    channel = int(channel)
+    if band == "6GHz":
+        return 5935 if channel == 2 else 5950 + 5 * channel
+    if band == "2.4GHz" or (band is None and 1 <= channel <= 14):
+        return 2484 if channel == 14 else 2407 + 5 * channel
+    return 5000 + 5 * channel
+
+
+def resolve_frequency(channel, band=None):
+    """
+    Return the center frequency (MHz) of a channel given in any of the
+    forms used across dojoutils.
+
+    Args:
+        channel: A channelhopper.Channel, a (band, number) tuple, a
+            frequency in MHz (2400 or above, i.e. from a radiotap header)
+            or a channel number (int or str; see channel_to_frequency()).
+        band (str): Optional; band of a bare channel number.
+
+    Returns:
+        int: Center frequency in MHz.
+    """
+    frequency = getattr(channel, "frequency", None)
+    if frequency is not None:
+        return frequency
+    if isinstance(channel, tuple):
+        return channel_to_frequency(channel[1], channel[0])
+    value = int(channel)
+    return value if value >= 2400 else channel_to_frequency(value, band)
+
+
+class ChannelSwitchBackend:
+    """
+    Base class for channel-switch backends.
+
+    Subclasses implement set_frequency(); set_channel() converts the
+    channel number with channel_to_frequency().  Backends can be used as
+    context managers to close any resources they hold.
+    """
+    name = "base"
+
+    def set_channel(self, iface, channel, band=None):
+        """
+        Tune iface to a channel.  Raises ChannelSwitchError on failure.
+        """
+        self.set_frequency(iface, channel_to_frequency(channel, band))
+
+    def set_frequency(self, iface, frequency):
+        """
+        Tune iface to a center frequency (MHz).  Raises ChannelSwitchError
+        on failure.
+        """
+        raise NotImplementedError
+
+    async def set_channel_async(self, iface, channel, band=None):
+        """
+        Coroutine version of set_channel().  In-process backends switch in
+        microseconds, so the default simply calls set_channel().
+        """
+        self.set_channel(iface, channel, band)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class IwBackend(ChannelSwitchBackend):
+    """
+    Switches channel by running `iw` once per switch (no shell).
+    """
+    name = "iw"
+
+    def set_channel(self, iface, channel, band=None):
+        if band == "6GHz":
+            # `iw set channel` cannot express 6GHz channels; use the frequency
+            return self.set_frequency(iface, channel_to_frequency(channel, band))
+        self._run(["iw", "dev", iface, "set", "channel", str(channel)])
+
+    def set_frequency(self, iface, frequency):
+        self._run(["iw", "dev", iface, "set", "freq", str(frequency)])
+
+    async def set_channel_async(self, iface, channel, band=None):
+        if band == "6GHz":
+            argv = ["iw", "dev", iface, "set", "freq", str(channel_to_frequency(channel, band))]
+        else:
+            argv = ["iw", "dev", iface, "set", "channel", str(channel)]
+        started = monotonic()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *argv, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE)
+        except FileNotFoundError:
+            raise ChannelSwitchError("iw is not installed (sudo apt install iw)", errno.ENOENT) from None
+        try:
+            _, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            process.kill()
+            await process.wait()
+            raise
+        if instrumentation.ENABLED:
+            instrumentation.record("command", "iw", monotonic() - started, process.returncode == 0,
+                                   argv=argv, returncode=process.returncode)
+        if process.returncode != 0:
+            raise _iw_error(argv, stderr.decode(), process.returncode)
+        iw_state_changed()
+
+    def _run(self, argv):
+        started = monotonic()
+        try:
+            result = run(argv, capture_output=True, text=True)
+        except FileNotFoundError:
+            raise ChannelSwitchError("iw is not installed (sudo apt install iw)", errno.ENOENT) from None
+        if instrumentation.ENABLED:
+            instrumentation.record("command", "iw", monotonic() - started, result.returncode == 0,
+                                   argv=argv, returncode=result.returncode)
+        if result.returncode != 0:
+            raise _iw_error(argv, result.stderr, result.returncode)
+        iw_state_changed()
+
+
+# Netlink / generic netlink / nl80211 constants (linux/netlink.h,
+# linux/genetlink.h, linux/nl80211.h)
+NETLINK_GENERIC = 16
+NLMSG_ERROR = 2
+NLM_F_REQUEST = 0x1
+NLM_F_ACK = 0x4
+GENL_ID_CTRL = 0x10
+CTRL_CMD_GETFAMILY = 3
+CTRL_ATTR_FAMILY_ID = 1
+CTRL_ATTR_FAMILY_NAME = 2
+NL80211_CMD_SET_CHANNEL = 65
+NL80211_ATTR_IFINDEX = 3
+NL80211_ATTR_WIPHY_FREQ = 38
+NL80211_ATTR_WIPHY_CHANNEL_TYPE = 39
+NL80211_CHAN_NO_HT = 0
+
+_NLMSGHDR = struct.Struct("=IHHII")
+_GENLMSGHDR = struct.Struct("=BBH")
+_NLATTR = struct.Struct("=HH")
+
+
+def _nlattr(attr_type, payload):
+    attr = _NLATTR.pack(_NLATTR.size + len(payload), attr_type) + payload
+    return attr + b"\0" * (-len(attr) % 4)
+
+
+def _nlattr_u32(attr_type, value):
+    return _nlattr(attr_type, struct.pack("=I", value))
+
+
+def _parse_nlattrs(data):
+    attrs = {}
+    offset = 0
+    while offset + _NLATTR.size <= len(data):
+        length, attr_type = _NLATTR.unpack_from(data, offset)
+        if length < _NLATTR.size:
+            break
+        attrs[attr_type & 0x3fff] = data[offset + _NLATTR.size:offset + length]
+        offset += (length + 3) & ~3
+    return attrs
+
+
+class Nl80211Backend(ChannelSwitchBackend):
+    """
+    Switches channel in-process over a single generic netlink socket.
+
+    Raises OSError on construction if netlink or the nl80211 family is not
+    available (non-Linux, no cfg80211 driver loaded, ...).
+    """
+    name = "nl80211"
+
+    def __init__(self):
+        self._sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_GENERIC)
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._ifindex = {}
+        try:
+            self._sock.bind((0, 0))
+            self._family = self._resolve_family("nl80211")
+        except OSError:
+            self._sock.close()
+            raise
+
+    def set_frequency(self, iface, frequency):
+        ifindex = self._ifindex.get(iface)
+        if ifindex is None:
+            try:
+                ifindex = self._ifindex[iface] = socket.if_nametoindex(iface)
+            except OSError:
+                raise ChannelSwitchError(f"No such interface: {iface}", errno.ENODEV) from None
+        attrs = (
+            _nlattr_u32(NL80211_ATTR_IFINDEX, ifindex)
+            + _nlattr_u32(NL80211_ATTR_WIPHY_FREQ, int(frequency))
+            + _nlattr_u32(NL80211_ATTR_WIPHY_CHANNEL_TYPE, NL80211_CHAN_NO_HT)
+        )
+        try:
+            self._request(self._family, NL80211_CMD_SET_CHANNEL, attrs)
+        except OSError as e:
+            raise ChannelSwitchError(f"{iface} -> {frequency} MHz: {e.strerror}", e.errno) from None
+        iw_state_changed()
+
+    def close(self):
+        self._sock.close()
+
+    def _resolve_family(self, name):
+        reply = self._request(GENL_ID_CTRL, CTRL_CMD_GETFAMILY,
+                              _nlattr(CTRL_ATTR_FAMILY_NAME, name.encode() + b"\0"))
+        family = _parse_nlattrs(reply).get(CTRL_ATTR_FAMILY_ID)
+        if family is None:
+            raise OSError(f"generic netlink family {name!r} not found")
+        return struct.unpack("=H", family[:2])[0]
+
+    def _request(self, msg_type, cmd, attrs):
+        """
+        Send a generic netlink request and wait for its reply or ACK.
+
+        Returns the attribute payload of a data reply (b"" for a plain ACK).
+        Raises OSError with the kernel's errno on a netlink error.
+        """
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            payload = _GENLMSGHDR.pack(cmd, 1, 0) + attrs
+            header = _NLMSGHDR.pack(_NLMSGHDR.size + len(payload), msg_type,
+                                    NLM_F_REQUEST | NLM_F_ACK, seq, 0)
+            self._sock.send(header + payload)
+            result = None
+            while True:
+                data = self._sock.recv(65536)
+                offset = 0
+                while offset + _NLMSGHDR.size <= len(data):
+                    length, reply_type, _, reply_seq, _ = _NLMSGHDR.unpack_from(data, offset)
+                    if length < _NLMSGHDR.size:
+                        break
+                    body = data[offset + _NLMSGHDR.size:offset + length]
+                    offset += (length + 3) & ~3
+                    if reply_seq != seq:
+                        continue
+                    if reply_type == NLMSG_ERROR:
+                        error = struct.unpack_from("=i", body)[0]
+                        if error:
+                            raise OSError(-error, os.strerror(-error))
+                        return result if result is not None else b""
+                    result = body[_GENLMSGHDR.size:]
+
+
+class MockBackend(ChannelSwitchBackend):
+    """
+    Records channel switches instead of performing them.
+
+    Args:
+        latency (float): Optional; seconds each switch pretends to take.
+        fail_channels (iterable): Optional; channels that raise
+            ChannelSwitchError, to simulate rejected channels.  Given in
+            any form resolve_frequency() accepts, so ("6GHz", 1) fails
+            only the 6GHz channel and a bare 1 only the 2.4GHz one.
+
+    Attributes:
+        switches (list): (monotonic_time, iface, channel, band) per switch.
+        current (dict): Last channel set per interface.
+    """
+    name = "mock"
+
+    def __init__(self, latency=0.0, fail_channels=()):
+        self.latency = latency
+        self.fail_frequencies = {resolve_frequency(channel) for channel in fail_channels}
+        self.switches = []
+        self.current = {}
+        self._lock = threading.Lock()
+
+    def set_channel(self, iface, channel, band=None):
+        self._check(iface, channel_to_frequency(channel, band), channel)
+        if self.latency:
+            sleep(self.latency)
+        self._record(iface, channel, band)
+
+    def set_frequency(self, iface, frequency):
+        self._check(iface, int(frequency), f"{frequency} MHz")
+        if self.latency:
+            sleep(self.latency)
+        self._record(iface, frequency, None)
+
+    async def set_channel_async(self, iface, channel, band=None):
+        self._check(iface, channel_to_frequency(channel, band), channel)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self._record(iface, channel, band)
+
+    def _check(self, iface, frequency, channel):
+        if frequency in self.fail_frequencies:
+            raise ChannelSwitchError(f"{iface}: channel {channel} rejected", errno.EINVAL)
+
+    def _record(self, iface, channel, band):
+        with self._lock:
+            self.switches.append((monotonic(), iface, str(channel), band))
+            self.current[iface] = str(channel)
+
+
+BACKENDS = {
+    "nl80211": Nl80211Backend,
+    "iw": IwBackend,
+    "mock": MockBackend,
+}
+
+
+def get_backend(name="auto"):
+    """
+    Return a channel-switch backend instance.
+
+    Args:
+        name (str or ChannelSwitchBackend): "auto" (default) tries nl80211
+            and falls back to iw; "nl80211", "iw" or "mock" select one
+            explicitly.  A backend instance is returned unchanged.
+
+    Returns:
+        ChannelSwitchBackend: The backend.
+    """
+    if isinstance(name, ChannelSwitchBackend):
+        return name
+    if name == "auto":
+        try:
+            return Nl80211Backend()
+        except (OSError, AttributeError):
+            # AttributeError: no AF_NETLINK on this platform
+            return IwBackend()
+    return BACKENDS[name]()
@@ -0,0 +1,197 @@
+"""
+This module answers package-state questions from the dpkg status
+database without running dpkg.
+
+linuxcommands.is_installed() builds a `dpkg -s <package>` command, so
+checking dozens of packages costs a fork/exec per package, and each dpkg
+re-parses '/var/lib/dpkg/status'.  Here the file is parsed once into an
+index keyed by package name; the index is reused until the file's mtime
+or size changes (i.e. after apt installs or removes something).
+
+Classes:
+    DpkgStatus(path="/var/lib/dpkg/status"): Cached package index.
+
+Functions:
+    parse_dpkg_status(text): Status file text -> {name: PackageStatus}.
+    get_dpkg_status(): The process-wide DpkgStatus.
+    packages_installed(packages): {package: bool} for many packages.
+    package_versions(packages): {package: version | None} for many packages.
+
+Usage:
+    >>> packages_installed(["iw", "aircrack-ng", "tcpdump"])
+    {'iw': True, 'aircrack-ng': False, 'tcpdump': True}
+"""
+
+import os
+import threading
+from collections import namedtuple
+
+DPKG_STATUS = "/var/lib/dpkg/status"
+
+PackageStatus = namedtuple("PackageStatus", ["name", "version", "architecture", "status", "installed"])
+
+_FIELDS = {"Package", "Version", "Architecture", "Status"}
+_default = None
+_default_lock = threading.Lock()
+
+
+def parse_dpkg_status(text):
+    """
+    Parse the contents of a dpkg status file.
+
+    Only the Package, Version, Architecture and Status fields are kept.
+    A package counts as installed when its Status ends in 'installed'
+    (not 'config-files', 'half-installed', ...).
+
+    Parameters:
+    text (str): The status file contents.
+
+    Returns:
+    dict: Package name -> PackageStatus(name, version, architecture,
+    status, installed).  Multi-Arch packages are also listed as
+    'name:architecture'; the bare name refers to the first stanza seen,
+    preferring an installed one.
+    """
+    packages = {}
+    for stanza in text.split("\n\n"):
+        fields = {}
+        for line in stanza.splitlines():
+            if not line or line[0] in " \t":
+                continue  # Continuation of a multi-line field
+            key, _, value = line.partition(":")
+            if key in _FIELDS:
+                fields[key] = value.strip()
+        name = fields.get("Package")
+        if not name:
+            continue
+        status = fields.get("Status", "")
+        package = PackageStatus(
+            name=name,
+            version=fields.get("Version"),
+            architecture=fields.get("Architecture"),
+            status=status,
+            installed=status.rpartition(" ")[2] == "installed",
+        )
+        current = packages.get(name)
+        if current is None or (package.installed and not current.installed):
+            packages[name] = package
+        if package.architecture:
+            packages[f"{name}:{package.architecture}"] = package
+    return packages
+
+
+class DpkgStatus:
+    """
+    A package index parsed from the dpkg status file, re-parsed only when
+    the file's mtime or size changes.
+
+    Usage:
+        index = DpkgStatus()
+        index.is_installed(["iw", "wireless-tools"])   # {'iw': True, ...}
+        index.versions(["iw"])                         # {'iw': '5.19-1'}
+
+    Args:
+        path (str): Status file (default '/var/lib/dpkg/status').
+    """
+
+    def __init__(self, path=DPKG_STATUS):
+        self.path = path
+        self._stamp = None
+        self._packages = {}
+        self._lock = threading.Lock()
+
+    @property
+    def packages(self):
+        """
+        The current {name: PackageStatus} index.  Empty if the status file
+        does not exist (i.e. not a Debian-based system).
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return {}
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if stamp != self._stamp:
+                with open(self.path, "r", encoding="utf-8", errors="replace") as f:
+                    self._packages = parse_dpkg_status(f.read())
+                self._stamp = stamp
+            return self._packages
+
+    def get(self, package):
+        """
+        Return the PackageStatus of a package, or None if dpkg has no
+        record of it.
+        """
+        return self.packages.get(package)
+
+    def is_installed(self, packages):
+        """
+        Parameters:
+        packages (str or iterable): One package name or many.
+
+        Returns:
+        bool | dict: For one name, whether it is installed; for many,
+        {name: bool}.
+        """
+        index = self.packages
+        if isinstance(packages, str):
+            package = index.get(packages)
+            return package is not None and package.installed
+        return {name: name in index and index[name].installed for name in packages}
+
+    def versions(self, packages):
+        """
+        Parameters:
+        packages (str or iterable): One package name or many.
+
+        Returns:
+        str | None | dict: For one name, its installed version (None if
+        not installed); for many, {name: version | None}.
+        """
+        index = self.packages
+
+        def version(name):
+            package = index.get(name)
+            return package.version if package is not None and package.installed else None
+
+        if isinstance(packages, str):
+            return version(packages)
+        return {name: version(name) for name in packages}
+
+
+def get_dpkg_status():
+    """
+    Return the process-wide DpkgStatus for '/var/lib/dpkg/status'.
+    """
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = DpkgStatus()
+    return _default
+
+
+def packages_installed(packages):
+    """
+    Check whether packages are installed, without running dpkg.
+
+    Parameters:
+    packages (iterable): Package names (optionally 'name:arch').
+
+    Returns:
+    dict: {package: bool}
+    """
+    return get_dpkg_status().is_installed(list(packages))
+
+
+def package_versions(packages):
+    """
+    Return the installed versions of packages, without running dpkg.
+
+    Parameters:
+    packages (iterable): Package names (optionally 'name:arch').
+
+    Returns:
+    dict: {package: version | None}; None for packages not installed.
+    """
+    return get_dpkg_status().versions(list(packages))
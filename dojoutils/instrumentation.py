@@ -0,0 +1,201 @@
+"""
+This module provides opt-in instrumentation for dojoutils.
+
+When enabled, every external command (run_shell_cmd(), run_commands(),
+the asyncio commands, LinkTransaction, `iw` queries), every hopper
+channel switch and every OUI lookup is recorded: a counter per kind,
+name and outcome, and a latency histogram per kind and name.  Hooks
+registered with add_hook() are called with each event as it happens.
+
+Instrumentation is off by default.  Call sites only test the module
+attribute ENABLED before doing anything, so the disabled cost is one
+attribute lookup.  Set DOJOUTILS_INSTRUMENTATION=1 in the environment,
+or call enable(), to turn it on.
+
+Event kinds and names:
+    command:        executable name (i.e. 'iw', 'ip', 'systemctl')
+    channel_switch: backend name (i.e. 'nl80211', 'iw', 'mock')
+    oui_lookup:     'single', or 'batch' (one event per chunk)
+    oui_index:      'load' (cached index) or 'build' (registry files parsed)
+
+Functions:
+    enable(), disable(): Turn recording on or off.
+    add_hook(hook), remove_hook(hook): hook(event) is called per event.
+    record(kind, name, duration, ok=True, **details): Record one event.
+    snapshot(): Counters and histograms as a dict.
+    dump_json(path=None): snapshot() as JSON text (optionally written to path).
+    dump_prometheus(): Metrics in the Prometheus text exposition format.
+    reset(): Clears all metrics.
+
+Usage:
+    from dojoutils import instrumentation
+    instrumentation.enable()
+    instrumentation.add_hook(lambda event: print(event))
+    ...
+    print(instrumentation.dump_prometheus())
+"""
+
+import json
+import os
+import threading
+from bisect import bisect_left
+from collections import namedtuple
+
+ENABLED = os.environ.get("DOJOUTILS_INSTRUMENTATION", "") not in ("", "0")
+
+# Histogram bucket upper bounds in seconds (a final +Inf bucket is implied)
+BUCKETS = (0.00001, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+           0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+InstrumentationEvent = namedtuple("InstrumentationEvent", ["kind", "name", "duration", "ok", "details"])
+
+_lock = threading.Lock()
+_hooks = []
+_counters = {}    # (kind, name, outcome) -> count
+_histograms = {}  # (kind, name) -> [bucket counts..., sum, count]
+
+
+def enable():
+    """
+    Start recording events.
+    """
+    global ENABLED
+    ENABLED = True
+
+
+def disable():
+    """
+    Stop recording events.  Collected metrics are kept until reset().
+    """
+    global ENABLED
+    ENABLED = False
+
+
+def add_hook(hook):
+    """
+    Register hook(event) to be called with an InstrumentationEvent(kind,
+    name, duration, ok, details) for every recorded event.  Hooks run on
+    the thread that performed the operation, so they should be quick.
+    """
+    with _lock:
+        _hooks.append(hook)
+
+
+def remove_hook(hook):
+    with _lock:
+        if hook in _hooks:
+            _hooks.remove(hook)
+
+
+def record(kind, name, duration, ok=True, **details):
+    """
+    Record one event.  Call sites check ENABLED first; record() does not.
+
+    Parameters:
+    kind (str): Event kind (i.e. 'command').
+    name (str): What ran (i.e. 'iw').
+    duration (float): Seconds taken.
+    ok (bool, optional): Whether it succeeded. Defaults to True.
+    details: Extra fields passed to hooks (i.e. iface, channel, returncode).
+    """
+    outcome = "ok" if ok else "error"
+    index = bisect_left(BUCKETS, duration)
+    with _lock:
+        key = (kind, name, outcome)
+        _counters[key] = _counters.get(key, 0) + 1
+        histogram = _histograms.get((kind, name))
+        if histogram is None:
+            histogram = _histograms[(kind, name)] = [0] * (len(BUCKETS) + 1) + [0.0, 0]
+        histogram[index] += 1
+        histogram[-2] += duration
+        histogram[-1] += 1
+        hooks = list(_hooks)
+    if hooks:
+        event = InstrumentationEvent(kind, name, duration, ok, details)
+        for hook in hooks:
+            try:
+                hook(event)
+            except Exception as e:
+                print(f"Instrumentation hook {hook!r} failed: {e}")
+
+
+def snapshot():
+    """
+    Return the collected metrics.
+
+    Returns:
+    dict: {"counters": [{kind, name, outcome, count}, ...],
+    "histograms": [{kind, name, count, sum, buckets: {upper bound: count}}, ...]}.
+    Bucket counts are per bucket (not cumulative); the last bound is "+Inf".
+    """
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: list(value) for key, value in _histograms.items()}
+    bounds = [str(bound) for bound in BUCKETS] + ["+Inf"]
+    return {
+        "counters": [
+            {"kind": kind, "name": name, "outcome": outcome, "count": count}
+            for (kind, name, outcome), count in sorted(counters.items())
+        ],
+        "histograms": [
+            {"kind": kind, "name": name, "count": value[-1], "sum": value[-2],
+             "buckets": dict(zip(bounds, value[:-2]))}
+            for (kind, name), value in sorted(histograms.items())
+        ],
+    }
+
+
+def dump_json(path=None):
+    """
+    Return snapshot() as JSON text; also write it to `path` if given.
+    """
+    text = json.dumps(snapshot(), indent=2)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return text
+
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def dump_prometheus():
+    """
+    Return the metrics in the Prometheus text exposition format:
+    dojoutils_events_total (counter) and dojoutils_duration_seconds
+    (histogram), labelled by kind and name.
+    """
+    metrics = snapshot()
+    lines = [
+        "# HELP dojoutils_events_total Instrumented operations by kind, name and outcome.",
+        "# TYPE dojoutils_events_total counter",
+    ]
+    for counter in metrics["counters"]:
+        labels = _labels(kind=counter["kind"], name=counter["name"], outcome=counter["outcome"])
+        lines.append(f"dojoutils_events_total{labels} {counter['count']}")
+    lines += [
+        "# HELP dojoutils_duration_seconds Latency of instrumented operations.",
+        "# TYPE dojoutils_duration_seconds histogram",
+    ]
+    for histogram in metrics["histograms"]:
+        cumulative = 0
+        for bound, count in histogram["buckets"].items():
+            cumulative += count
+            labels = _labels(kind=histogram["kind"], name=histogram["name"], le=bound)
+            lines.append(f"dojoutils_duration_seconds_bucket{labels} {cumulative}")
+        labels = _labels(kind=histogram["kind"], name=histogram["name"])
+        lines.append(f"dojoutils_duration_seconds_sum{labels} {histogram['sum']}")
+        lines.append(f"dojoutils_duration_seconds_count{labels} {histogram['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    """
+    Clear all counters and histograms (hooks stay registered).
+    """
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
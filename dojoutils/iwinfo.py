@@ -0,0 +1,345 @@
+"""
+This module discovers what a wireless phy can actually do at runtime.
+
+SUPPORTED_WIFI_ADAPTERS is a hand-maintained table keyed by marketing
+names; the channels a phy will really accept depend on its chipset,
+driver and the current regulatory domain.  This module parses `iw phy`
+and `iw reg get` into structured records and caches the enabled channels
+per phy, so the hopper only schedules channels that can be set.
+
+The parsers take plain text, so they can be tested against captured
+`iw` output without wireless hardware.
+
+Functions:
+    parse_iw_phy(text): `iw phy` output -> {phy: [PhyChannel, ...]}.
+    parse_iw_reg(text): `iw reg get` output -> {"global"|phy: country}.
+    iface_phy(iface): Returns the phy name (i.e. 'phy0') of an interface.
+    get_phy_channels(phy, refresh=False): Cached PhyChannel list for a phy.
+    usable_channels(iface, channels): Filters channels to those the phy can set.
+    invalidate_phy_cache(phy=None): Drops cached phy data.
+    parse_iw_dev(text): `iw dev` output -> {iface: IwInterface}.
+    get_iw_interfaces(refresh=False): All interfaces from one cached `iw dev`.
+    get_iw_interface(iface, refresh=False): One interface's IwInterface.
+    invalidate_iw_dev_cache(): Drops the cached `iw dev` state.
+"""
+
+import os
+import re
+from collections import namedtuple
+from hashlib import sha256
+from subprocess import run
+from time import monotonic
+
+import dojoutils.instrumentation as instrumentation
+from dojoutils.channelswitch import channel_to_frequency
+
+PhyChannel = namedtuple("PhyChannel", ["frequency", "channel", "band", "disabled", "no_ir", "radar", "max_power"])
+IwInterface = namedtuple("IwInterface", ["name", "phy", "ifindex", "wdev", "type", "mac", "ssid",
+                                         "channel", "frequency", "width", "center1", "txpower"])
+
+# How long a cached phy channel list is trusted before the regulatory
+# domain is re-checked with `iw reg get`.
+REG_CHECK_INTERVAL = 60.0
+
+_WIPHY_RE = re.compile(r"^Wiphy (\S+)")
+_FREQ_RE = re.compile(r"^\s*\* (\d+(?:\.\d+)?) MHz \[(\d+)\](.*)$")
+_POWER_RE = re.compile(r"\((\d+(?:\.\d+)?) dBm\)")
+_REG_SECTION_RE = re.compile(r"^(global|phy#(\d+))")
+_COUNTRY_RE = re.compile(r"^country (\S+?):")
+
+# How long one `iw dev` result is served before it is re-read.  Our own
+# mode/channel/MAC changes invalidate it immediately (see
+# dojoutils.shellcommands.iw_state_changed()).
+IW_DEV_TTL = 1.0
+
+_DEV_PHY_RE = re.compile(r"^phy#(\d+)")
+_DEV_IFACE_RE = re.compile(r"^\s+Interface (\S+)")
+_DEV_CHANNEL_RE = re.compile(r"channel (\d+) \((\d+) MHz\)(?:, width: (\d+) MHz)?[^,]*(?:, center1: (\d+) MHz)?")
+_DEV_TXPOWER_RE = re.compile(r"txpower (-?\d+(?:\.\d+)?) dBm")
+
+_phy_cache = {}  # phy -> (checked_at, reg_fingerprint, [PhyChannel, ...])
+_dev_cache = None  # (fetched_at, {iface: IwInterface})
+
+
+def _band(frequency):
+    if frequency < 3000:
+        return "2.4GHz"
+    if frequency < 5925:
+        return "5GHz"
+    return "6GHz"
+
+
+def parse_iw_phy(text):
+    """
+    Parse `iw phy` (or `iw phy <phy> info`) output.
+
+    Parameters:
+    text (str): Captured command output.
+
+    Returns:
+    dict: phy name -> list of PhyChannel(frequency, channel, band,
+    disabled, no_ir, radar, max_power) in the order listed.
+    """
+    phys = {}
+    channels = None
+    for line in text.splitlines():
+        match = _WIPHY_RE.match(line)
+        if match:
+            channels = phys.setdefault(match.group(1), [])
+            continue
+        match = _FREQ_RE.match(line)
+        if not match or channels is None:
+            continue
+        frequency = int(float(match.group(1)))
+        flags = match.group(3)
+        power = _POWER_RE.search(flags)
+        channels.append(PhyChannel(
+            frequency=frequency,
+            channel=int(match.group(2)),
+            band=_band(frequency),
+            disabled="disabled" in flags,
+            no_ir="no IR" in flags or "passive scanning" in flags,
+            radar="radar detection" in flags,
+            max_power=float(power.group(1)) if power else None,
+        ))
+    return phys
+
+
+def parse_iw_reg(text):
+    """
+    Parse `iw reg get` output.
+
+    Parameters:
+    text (str): Captured command output.
+
+    Returns:
+    dict: 'global' and/or 'phyN' (self-managed phys) -> country code.
+    """
+    domains = {}
+    section = None
+    for line in text.splitlines():
+        match = _REG_SECTION_RE.match(line)
+        if match:
+            section = "global" if match.group(2) is None else f"phy{match.group(2)}"
+            continue
+        match = _COUNTRY_RE.match(line)
+        if match and section:
+            domains[section] = match.group(1)
+    return domains
+
+
+def _iw(*args):
+    """
+    Run iw and return its stdout, or None if iw is missing or fails.
+    """
+    started = monotonic()
+    try:
+        result = run(["iw", *args], capture_output=True, text=True)
+    except FileNotFoundError:
+        result = None
+    if instrumentation.ENABLED:
+        instrumentation.record("command", "iw", monotonic() - started, result is not None and result.returncode == 0,
+                               argv=["iw", *args], returncode=result.returncode if result is not None else None)
+    return result.stdout if result is not None and result.returncode == 0 else None
+
+
+def _reg_fingerprint():
+    output = _iw("reg", "get")
+    return sha256(output.encode()).hexdigest() if output is not None else None
+
+
+def iface_phy(iface):
+    """
+    Return the phy name (i.e. 'phy0') of a wireless interface, or None
+    if it is not a cfg80211 interface.
+    """
+    try:
+        with open(os.path.join("/sys/class/net", iface, "phy80211", "name"), "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def get_phy_channels(phy, refresh=False):
+    """
+    Return the PhyChannel list of a phy, parsing `iw phy <phy> info` once
+    and caching the result.
+
+    The cache entry is dropped when the regulatory domain changes; the
+    domain is re-checked at most every REG_CHECK_INTERVAL seconds.
+
+    Parameters:
+    phy (str): Phy name (i.e. 'phy0').
+    refresh (bool, optional): Ignore the cache.
+
+    Returns:
+    list | None: PhyChannel records, or None if iw is unavailable.
+    """
+    now = monotonic()
+    cached = _phy_cache.get(phy)
+    if cached and not refresh:
+        checked_at, fingerprint, channels = cached
+        if now - checked_at < REG_CHECK_INTERVAL:
+            return channels
+        current = _reg_fingerprint()
+        if current == fingerprint:
+            _phy_cache[phy] = (now, fingerprint, channels)
+            return channels
+    else:
+        current = _reg_fingerprint()
+
+    output = _iw("phy", phy, "info")
+    if output is None:
+        return None
+    channels = parse_iw_phy(output).get(phy, [])
+    _phy_cache[phy] = (now, current, channels)
+    return channels
+
+
+def invalidate_phy_cache(phy=None):
+    """
+    Drop cached channel data for one phy, or for all phys.
+    """
+    if phy is None:
+        _phy_cache.clear()
+    else:
+        _phy_cache.pop(phy, None)
+
+
+def usable_channels(iface, channels):
+    """
+    Filter a channel list down to the channels the interface's phy has
+    enabled under the current regulatory domain.
+
+    No-IR and radar (DFS) channels are kept: they can be monitored, just
+    not transmitted on.
+
+    Parameters:
+    iface (str): Wireless interface name.
+    channels (list): Channels (str, int or channelhopper.Channel).
+
+    Returns:
+    list | None: The usable channels in their original order, or None if
+    the phy's capabilities could not be discovered.
+    """
+    phy = iface_phy(iface)
+    if phy is None:
+        return None
+    phy_channels = get_phy_channels(phy)
+    if phy_channels is None:
+        return None
+    enabled = {channel.frequency for channel in phy_channels if not channel.disabled}
+    return [channel for channel in channels
+            if (getattr(channel, "frequency", None) or channel_to_frequency(channel)) in enabled]
+
+
+def parse_iw_dev(text):
+    """
+    Parse `iw dev` output.
+
+    Parameters:
+    text (str): Captured command output.
+
+    Returns:
+    dict: Interface name -> IwInterface(name, phy, ifindex, wdev, type,
+    mac, ssid, channel, frequency, width, center1, txpower).  Fields
+    iw does not report for an interface (i.e. the channel of a down
+    interface) are None.  Non-netdev interfaces (P2P-device) are skipped.
+    """
+    interfaces = {}
+    phy = None
+    fields = None
+
+    def finish():
+        if fields is not None:
+            interfaces[fields["name"]] = IwInterface(**fields)
+
+    for line in text.splitlines():
+        match = _DEV_PHY_RE.match(line)
+        if match:
+            finish()
+            fields = None
+            phy = f"phy{match.group(1)}"
+            continue
+        match = _DEV_IFACE_RE.match(line)
+        if match:
+            finish()
+            fields = dict.fromkeys(IwInterface._fields)
+            fields.update(name=match.group(1), phy=phy)
+            continue
+        if line.strip().startswith("Unnamed/non-netdev interface"):
+            finish()
+            fields = None
+            continue
+        if fields is None:
+            continue
+        key, _, value = line.strip().partition(" ")
+        if key == "ifindex":
+            fields["ifindex"] = int(value)
+        elif key == "wdev":
+            fields["wdev"] = int(value, 16)
+        elif key == "addr":
+            fields["mac"] = value
+        elif key == "ssid":
+            fields["ssid"] = value
+        elif key == "type":
+            fields["type"] = value
+        elif key == "channel":
+            match = _DEV_CHANNEL_RE.match(line.strip())
+            if match:
+                channel, frequency, width, center1 = match.groups()
+                fields.update(
+                    channel=int(channel),
+                    frequency=int(frequency),
+                    width=int(width) if width else None,
+                    center1=int(center1) if center1 else None,
+                )
+        elif key == "txpower":
+            match = _DEV_TXPOWER_RE.match(line.strip())
+            if match:
+                fields["txpower"] = float(match.group(1))
+    finish()
+    return interfaces
+
+
+def get_iw_interfaces(refresh=False):
+    """
+    Return every wireless interface from a single `iw dev` call.
+
+    Results are cached for IW_DEV_TTL seconds, so polling many interfaces
+    costs one process per TTL rather than one per interface per poll.
+
+    Parameters:
+    refresh (bool, optional): Ignore the cache.
+
+    Returns:
+    dict | None: Interface name -> IwInterface, or None if iw is unavailable.
+    """
+    global _dev_cache
+    cached = _dev_cache
+    now = monotonic()
+    if cached is not None and not refresh and now - cached[0] < IW_DEV_TTL:
+        return cached[1]
+    output = _iw("dev")
+    if output is None:
+        return None
+    interfaces = parse_iw_dev(output)
+    _dev_cache = (now, interfaces)
+    return interfaces
+
+
+def get_iw_interface(iface, refresh=False):
+    """
+    Return the IwInterface of one interface (see get_iw_interfaces()), or
+    None if it is not a wireless interface or iw is unavailable.
+    """
+    interfaces = get_iw_interfaces(refresh)
+    return interfaces.get(iface) if interfaces else None
+
+
+def invalidate_iw_dev_cache():
+    """
+    Drop the cached `iw dev` state so the next read runs iw again.
+    """
+    global _dev_cache
+    _dev_cache = None
@@ -1,3 +1,11 @@
+import re
+import shlex
+from subprocess import run, TimeoutExpired
+from time import monotonic
+import dojoutils.instrumentation as instrumentation
+from dojoutils.shellcommands import iw_state_changed
+
+
 def link_down(iface):
     return f"ip link set dev {iface} down"
 
@@ -39,3 +47,164 @@ def disable_service(service):
 
 def is_installed(package):
     return f"dpkg -s {package}"
+
+
+# `ip -batch` reports each failed line as "Command failed <file>:<line>"
+_BATCH_FAILED = re.compile(r"^Command failed \S*:(\d+)")
+
+
+class LinkTransaction:
+    """
+    Collects link, route and mode changes and applies them with as few
+    processes as possible.
+
+    Operations are the same command strings the functions above build.
+    Consecutive `ip` operations are applied in one `ip -batch -` process
+    (so reconfiguring many interfaces costs one fork, not one per step);
+    `iw` has no batch mode, so each `iw` operation runs on its own, in
+    order.  commands() returns the planned invocations without running
+    anything, so the generated text can be checked without root.
+    Keep ip steps adjacent where order allows: taking a fleet down, then
+    setting modes, then bringing it up costs three ip/iw phases, not
+    several per interface.
+
+    Usage:
+        failures = (LinkTransaction()
+                    .link_down("wlan0").set_mode("wlan0", "monitor")
+                    .set_mac("wlan0", "00:11:22:33:44:55").link_up("wlan0")
+                    .apply())
+        for command, error in failures:
+            print(f"{command}: {error}")
+
+    Args:
+        force (bool): Keep going after a failed operation (default True).
+            When False, the first failure stops the transaction and every
+            operation after it is reported as not run.
+    """
+
+    def __init__(self, force=True):
+        self.force = force
+        self.operations = []
+
+    def __len__(self):
+        return len(self.operations)
+
+    def add(self, command):
+        """
+        Append a command string (i.e. from link_down()); returns self.
+        """
+        self.operations.append(command)
+        return self
+
+    def link_down(self, iface):
+        return self.add(link_down(iface))
+
+    def link_up(self, iface):
+        return self.add(link_up(iface))
+
+    def set_mode(self, iface, mode):
+        return self.add(set_mode(iface, mode))
+
+    def set_channel(self, iface, channel):
+        return self.add(set_channel(iface, channel))
+
+    def set_mac(self, iface, mac):
+        return self.add(set_mac(iface, mac))
+
+    def add_route(self, dest_net, gw, netmask, interface):
+        return self.add(add_route(dest_net, gw, netmask, interface))
+
+    def commands(self):
+        """
+        Return the planned invocations as (argv, stdin, operations) tuples,
+        in order: one `ip -batch -` per run of consecutive ip operations
+        (stdin holds one operation per line), one argv per other operation.
+        """
+        groups = []
+        for command in self.operations:
+            argv = shlex.split(command)
+            if argv[0] == "ip" and groups and groups[-1][0][0] == "ip":
+                groups[-1][1].append(command)
+            else:
+                groups.append((argv, [command]))
+        commands = []
+        for argv, ops in groups:
+            if argv[0] == "ip":
+                batch = ["ip", "-force", "-batch", "-"] if self.force else ["ip", "-batch", "-"]
+                stdin = "".join(shlex.join(shlex.split(op)[1:]) + "\n" for op in ops)
+                commands.append((batch, stdin, ops))
+            else:
+                commands.append((argv, None, ops))
+        return commands
+
+    def apply(self, timeout=30):
+        """
+        Run the transaction.
+
+        Args:
+            timeout (float): Seconds each process may take (default 30).
+
+        Returns:
+            list: (command, error) for every operation that failed or, with
+            force=False, was not run.  Empty if everything succeeded.
+        """
+        failures = []
+        commands = self.commands()
+        try:
+            self._apply(commands, failures, timeout)
+        finally:
+            if commands:
+                iw_state_changed()
+        return failures
+
+    def _apply(self, commands, failures, timeout):
+        for index, (argv, stdin, ops) in enumerate(commands):
+            started = monotonic()
+            # failed: (position in ops, operation, error)
+            try:
+                result = run(argv, input=stdin, capture_output=True, text=True, timeout=timeout)
+            except FileNotFoundError:
+                failed = [(i, op, f"{argv[0]} is not installed") for i, op in enumerate(ops)]
+            except TimeoutExpired:
+                failed = [(i, op, f"timed out after {timeout}s") for i, op in enumerate(ops)]
+            else:
+                failed = _failed_operations(ops, result) if stdin is not None else (
+                    [(0, ops[0], result.stderr.strip() or f"exit status {result.returncode}")]
+                    if result.returncode != 0 else [])
+            if instrumentation.ENABLED:
+                instrumentation.record("command", argv[0], monotonic() - started, not failed,
+                                       argv=argv, operations=len(ops), failed=len(failed))
+            failures += [(op, error) for _, op, error in failed]
+            if failed and not self.force:
+                # ip -batch stops at the first failure.  Positions, not
+                # command text, since the same command can appear twice
+                reported = {position for position, _, _ in failed}
+                failures += [(op, "not run") for i, op in enumerate(ops)
+                             if i > failed[0][0] and i not in reported]
+                failures += [(op, "not run") for _, _, later in commands[index + 1:] for op in later]
+                break
+
+
+def _failed_operations(ops, result):
+    """
+    Map `ip -batch` error output back to the operations that failed.
+
+    Returns:
+        list: (position in ops, operation, error) per failed line.
+    """
+    failures = []
+    message = []
+    for line in result.stderr.splitlines():
+        match = _BATCH_FAILED.match(line)
+        if match:
+            line_number = int(match.group(1))
+            if 1 <= line_number <= len(ops):
+                failures.append((line_number - 1, ops[line_number - 1], " ".join(message) or "failed"))
+            message = []
+        elif line.strip():
+            message.append(line.strip())
+    if result.returncode != 0 and not failures:
+        # Failed before running any line (bad option, no permission, ...)
+        error = result.stderr.strip() or f"exit status {result.returncode}"
+        failures = [(i, op, error) for i, op in enumerate(ops)]
+    return failures
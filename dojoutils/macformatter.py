@@ -1,20 +1,259 @@
+"""
+This module parses and formats MAC addresses.
+
+format_mac_address() is the lenient, one-off formatter.  The MAC type
+stores an address as a 48-bit int, so parsing is done once and
+comparisons, hashing and set/dict lookups are integer operations.
+normalize_macs() and mac_values() handle large batches in one pass; when
+NumPy is installed, mac_values() returns a uint64 array and
+normalize_macs() accepts one.  NumPy is only imported by mac_values(),
+so importing this module stays cheap.
+
+Classes:
+    MAC: Integer-backed MAC address value.
+
+Functions:
+    format_mac_address(mac, case="lower", sep=":"): Formats one MAC address.
+    normalize_macs(macs, case="lower", sep=":"): Formats many MAC addresses.
+    mac_values(macs): Parses many MAC addresses into 48-bit integers.
+"""
+
 import re
+import sys
+from array import array
+from functools import total_ordering
+
+# Separators accepted between hex digits: "00:c0:ca:32:bd:25",
+# "00-C0-CA-32-BD-25", "00c0.ca32.bd25", "00 c0 ca 32 bd 25"
+_MAC_SEPARATORS = str.maketrans("", "", ":-. ")
+_HEX12 = re.compile(r"[0-9a-fA-F]{12}")
+
+
+def _parse(mac):
+    """
+    Return the 48-bit int of a MAC address (str, bytes, int or MAC).
+    Raises ValueError for anything that is not exactly 48 bits.
+    """
+    if isinstance(mac, MAC):
+        return mac._value
+    if isinstance(mac, str):
+        hexdigits = mac.translate(_MAC_SEPARATORS)
+        if not _HEX12.fullmatch(hexdigits):
+            raise ValueError(f"Invalid MAC address: {mac!r}")
+        return int(hexdigits, 16)
+    if isinstance(mac, (bytes, bytearray, memoryview)):
+        if len(mac) != 6:
+            raise ValueError(f"MAC address must be 6 bytes, got {len(mac)}")
+        return int.from_bytes(mac, "big")
+    if isinstance(mac, int) and not isinstance(mac, bool):
+        if not 0 <= mac < 1 << 48:
+            raise ValueError(f"MAC address out of range: {mac:#x}")
+        return mac
+    raise TypeError(f"Cannot convert {type(mac).__name__} to a MAC address")
+
+
+def _join(hexdigits, case, sep):
+    if case == "upper":
+        hexdigits = hexdigits.upper()
+    if not sep:
+        return hexdigits
+    return sep.join((hexdigits[0:2], hexdigits[2:4], hexdigits[4:6],
+                     hexdigits[6:8], hexdigits[8:10], hexdigits[10:12]))
+
+
+@total_ordering
+class MAC:
+    """
+    A MAC address stored as a 48-bit int.
+
+    Accepts a string in any of the common formats, 6 bytes, an int or
+    another MAC.  Invalid input raises ValueError (wrong length or
+    non-hex digits) or TypeError.
+
+    Usage:
+        mac = MAC("00c0.ca32.bd25")
+        str(mac)                          # '00:c0:ca:32:bd:25'
+        mac.format("upper", "-")          # '00-C0-CA-32-BD-25'
+        mac.oui                           # 0x00c0ca
+        mac == MAC(b"\\x00\\xc0\\xca\\x32\\xbd\\x25")  # True
+    """
+    __slots__ = ("_value",)
+
+    def __init__(self, mac):
+        self._value = _parse(mac)
+
+    @property
+    def value(self):
+        """The address as an int."""
+        return self._value
+
+    @property
+    def oui(self):
+        """The first three octets as an int (i.e. 0x00c0ca)."""
+        return self._value >> 24
+
+    @property
+    def is_multicast(self):
+        """True if the I/G bit (multicast, includes broadcast) is set."""
+        return bool(self._value >> 40 & 0x01)
+
+    @property
+    def is_locally_administered(self):
+        """True if the U/L bit is set (randomized and other non-OUI addresses)."""
+        return bool(self._value >> 40 & 0x02)
+
+    def format(self, case="lower", sep=":"):
+        """
+        Return the address as a string; takes the same case and sep
+        options as format_mac_address().
+        """
+        return _join(f"{self._value:012x}", case, sep)
+
+    def __str__(self):
+        return self.format()
+
+    def __repr__(self):
+        return f"MAC('{self.format()}')"
+
+    def __int__(self):
+        return self._value
+
+    __index__ = __int__
+
+    def __bytes__(self):
+        return self._value.to_bytes(6, "big")
+
+    def __eq__(self, other):
+        if isinstance(other, MAC):
+            return self._value == other._value
+        return NotImplemented
+
+    def __lt__(self, other):
+        if isinstance(other, MAC):
+            return self._value < other._value
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self._value)
+
+
+def _load_numpy():
+    """
+    Import NumPy on first use (it adds tens of milliseconds to startup);
+    None if it is not installed.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _pack(macs):
+    """
+    Return the addresses in `macs` as one bytes object, 6 bytes each.
+    """
+    # An ndarray can only exist if NumPy was already imported by the caller
+    numpy = sys.modules.get("numpy")
+    if numpy is not None and isinstance(macs, numpy.ndarray):
+        values = macs.astype(">u8", copy=False).reshape(-1)
+        if values.size and int(values.max()) >> 48:
+            raise ValueError("MAC address out of range")
+        return values.view(numpy.uint8).reshape(-1, 8)[:, 2:].tobytes()
+    macs = list(macs)
+    if all(isinstance(mac, str) for mac in macs):
+        # Strip separators from the whole batch at once, then convert it
+        # with a single bytes.fromhex call
+        hexdigits = "\n".join(macs).translate(_MAC_SEPARATORS).split("\n") if macs else []
+        if len(hexdigits) != len(macs):
+            # An address contained a newline; parse one at a time to report it
+            return b"".join(_parse(mac).to_bytes(6, "big") for mac in macs)
+        # Check each address first: bytes.fromhex skips whitespace, so
+        # "00c0ca32bd\t5" would otherwise shift every later address
+        fullmatch = _HEX12.fullmatch
+        for mac, digits in zip(macs, hexdigits):
+            if not fullmatch(digits):
+                raise ValueError(f"Invalid MAC address: {mac!r}")
+        return bytes.fromhex("".join(hexdigits))
+    return b"".join(_parse(mac).to_bytes(6, "big") for mac in macs)
+
+
+def normalize_macs(macs, case="lower", sep=":"):
+    """
+    Format many MAC addresses in one pass.
+
+    Parameters:
+    - macs (iterable or numpy.ndarray): Addresses as str, bytes, int or
+      MAC, or a NumPy integer array.
+    - case (str, optional): 'lower' (default) or 'upper'.
+    - sep (str, optional): Separator between octets; default ':'. None or
+      '' for no separator.
+
+    Returns:
+    - list: The formatted addresses, in input order.
+
+    Raises:
+    - ValueError: If any address is not exactly 48 bits.
+    """
+    packed = _pack(macs)
+    if sep and len(sep) == 1:
+        # One bytes.hex() call formats the whole batch; every address is
+        # then a fixed-width slice of the result.
+        text = packed.hex(sep)
+        width = 17
+        step = 18
+    else:
+        text = packed.hex()
+        width = step = 12
+    if case == "upper":
+        text = text.upper()
+    addresses = [text[i:i + width] for i in range(0, len(text), step)]
+    if sep and len(sep) > 1:
+        addresses = [_join(hexdigits, None, sep) for hexdigits in addresses]
+    return addresses
+
+
+def mac_values(macs):
+    """
+    Parse many MAC addresses into 48-bit integers in one pass.
+
+    Parameters:
+    - macs (iterable): Addresses as str, bytes, int or MAC.
+
+    Returns:
+    - numpy.ndarray | array.array: A uint64 NumPy array when NumPy is
+      installed, else an array.array of type 'Q'.
+
+    Raises:
+    - ValueError: If any address is not exactly 48 bits.
+    """
+    packed = _pack(macs)
+    numpy = _load_numpy()
+    if numpy is not None:
+        octets = numpy.frombuffer(packed, dtype=numpy.uint8).reshape(-1, 6)
+        padded = numpy.zeros((len(octets), 8), dtype=numpy.uint8)
+        padded[:, 2:] = octets
+        return padded.view(">u8").reshape(-1).astype(numpy.uint64)
+    return array("Q", (int.from_bytes(packed[i:i + 6], "big") for i in range(0, len(packed), 6)))
 
 
 def format_mac_address(mac, case="lower", sep=":"):
     """
     Format a MAC address into a standardized representation.
 
-    This function takes a MAC address in various formats and converts it into a 
-    standardized format. Non-hexadecimal characters are removed, and then colons (or 
-    another specified separator) are inserted every two characters. The function 
+    This function takes a MAC address in various formats and converts it into a
+    standardized format. Non-hexadecimal characters are removed, and then colons (or
+    another specified separator) are inserted every two characters. The function
     also allows specifying the case of the output (either lower or upper).
 
+    This function is lenient: input of any length is formatted as-is.  Use
+    MAC or normalize_macs() to reject invalid addresses.
+
     Parameters:
     - mac (str, required): The MAC address to be formatted.
-    - case (str, optional): The case of the output MAC address. 
+    - case (str, optional): The case of the output MAC address.
       Options are 'lower' (default) or 'upper'.
-    - sep (str, optional): Character to separate hex digits in MAC address. 
+    - sep (str, optional): Character to separate hex digits in MAC address.
       Default is ':'. If set to None, no separator is used.
 
     Returns:
@@ -30,6 +269,11 @@ def format_mac_address(mac, case="lower", sep=":"):
     >>> format_mac_address("00-c0-ca-32-bd-25", sep=None)
     '00c0ca32bd25'
     """
+    # Fast path for well-formed 48-bit addresses: no regex substitution
+    hexdigits = mac.translate(_MAC_SEPARATORS)
+    if _HEX12.fullmatch(hexdigits):
+        return _join(hexdigits.lower(), case, sep)
+
     # Remove all non-hexadecimal characters
     clean_mac = re.sub(r'[^0-9a-fA-F]', '', mac)
 
@@ -1,62 +1,742 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
 import os.path
 import re
-import dojoutils.macformatter as macformatter
+import sys
+import threading
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from time import monotonic
 import requests
 
-OUI_URL = "https://standards-oui.ieee.org/oui/oui.txt"
-OUI_FILE = "oui.txt"
+import dojoutils.instrumentation as instrumentation
 
-def oui_lookup(mac_address: str, case="upper", sep="") -> str:
-    if not check_for_oui_file():
-        if not download_oui_file():
-            return "OUI file download failed"
+# Registry locations can be overridden with environment variables or at
+# runtime with set_oui_location().  Files default to the user cache dir
+# rather than the current working directory.
+OUI_DIR = os.environ.get("DOJOUTILS_OUI_DIR") or os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "dojoutils"
+)
+OUI_URL = os.environ.get("DOJOUTILS_OUI_URL") or "https://standards-oui.ieee.org/oui/oui.txt"
 
-    formatted_mac = macformatter.format_mac_address(mac_address, case, sep)
-    formatted_mac = re.sub(r"[^A-F0-9]", "", formatted_mac)
-    node_oui = formatted_mac[:6]
 
-    try:
-        with open(OUI_FILE, 'r', encoding="utf-8") as f:
-            filedata = f.readlines()
-            for line in filedata:
-                if node_oui in line:
-                    vendor = line.replace("\t", "").replace("(base 16)", "").replace("\n", "")[8:].strip()
+def _default_oui_file():
+    """
+    Return the default 'oui.txt' path: OUI_DIR/oui.txt, unless no location
+    was configured and only a './oui.txt' exists.  Older versions read the
+    registry from the working directory, and since IEEE rejects `requests`
+    downloads (HTTP 418) users were told to fetch it there with wget.
+    """
+    path = os.path.join(OUI_DIR, "oui.txt")
+    configured = os.environ.get("DOJOUTILS_OUI_DIR")
+    if not configured and not os.path.isfile(path) and os.path.isfile("oui.txt"):
+        return os.path.abspath("oui.txt")
+    return path
+
+
+OUI_FILE = os.environ.get("DOJOUTILS_OUI_FILE") or _default_oui_file()
+OUI_CACHE_SUFFIX = ".idx"
+OUI_META_SUFFIX = ".meta"
+OUI_PART_SUFFIX = ".part"
+
+# IEEE registries: name -> (URL, file name).  The MA-L entry is always
+# resolved through OUI_URL/OUI_FILE; the others live next to OUI_FILE.
+OUI_REGISTRIES = {
+    "MA-L": (OUI_URL, "oui.txt"),
+    "MA-M": ("https://standards-oui.ieee.org/oui28/mam.txt", "mam.txt"),
+    "MA-S": ("https://standards-oui.ieee.org/oui36/oui36.txt", "oui36.txt"),
+    "CID": ("https://standards-oui.ieee.org/cid/cid.txt", "cid.txt"),
+}
+
+_NON_HEX = re.compile(r"[^0-9a-fA-F]")
+_HEX_ONLY = re.compile(r"[0-9a-fA-F]*")
+_MAC_SEPARATORS = str.maketrans("", "", ":-. \t\r\n")
+_database = None
+# Serialises building _database and every registry download in this
+# process, so two threads never write the same '.part' file
+_lock = threading.RLock()
+
+OUILookupResult = namedtuple("OUILookupResult", ["vendor", "ok"])
+
+
+class OUIDatabase:
+    """
+    Longest-prefix vendor index built from IEEE registry files.
+
+    Loads any mix of the MA-L ('oui.txt'), MA-M ('mam.txt'), MA-S
+    ('oui36.txt') and CID ('cid.txt') registries.  Assignments are kept
+    in one dict per prefix length (24, 28 and 36 bits) keyed by the
+    integer value of the prefix, so a lookup is at most one dict probe per
+    prefix length, longest first.  An MA-S block therefore wins over the
+    MA-L 'IEEE Registration Authority' entry of its parent OUI.
+
+    The parsed index is saved as a JSON cache next to the first registry
+    file ('oui.txt.idx') and is only rebuilt when a registry file's
+    mtime/size and the combined SHA-256 no longer match the cache.  The
+    cache is plain data (never pickle), so a tampered cache file can at
+    worst produce wrong vendor names, not run code.
+
+    Usage:
+        db = OUIDatabase(["oui.txt", "mam.txt", "oui36.txt"])
+        db.lookup("70:b3:d5:a9:f1:23")   # MA-S vendor, not the IEEE RA
+    """
+    CACHE_VERSION = 3
+
+    def __init__(self, paths=None):
+        if paths is None:
+            paths = default_registry_paths()
+        elif isinstance(paths, (str, os.PathLike)):
+            paths = [paths]
+        self.paths = [os.fspath(path) for path in paths]
+        self.path = self.paths[0]
+        self.cache_path = self.path + OUI_CACHE_SUFFIX
+        self._tables = {}
+        self._lookup_order = []
+        self._vendor_index = None
+        self.load()
+
+    def __len__(self):
+        return sum(len(table) for table in self._tables.values())
+
+    def __contains__(self, mac_address):
+        return self.lookup(mac_address) is not None
+
+    def load(self):
+        """
+        Load the index from the cache, rebuilding it from the
+        registry files if the cache is missing or stale.
+
+        Raises:
+        FileNotFoundError: If a registry file does not exist.
+        """
+        started = monotonic()
+        stamps = [(path, os.stat(path)) for path in self.paths]
+        stamps = [[path, stat.st_mtime_ns, stat.st_size] for path, stat in stamps]
+        cache = self._read_cache()
+        if cache and cache["stamps"] == stamps:
+            self._set_tables(cache["tables"])
+            if instrumentation.ENABLED:
+                instrumentation.record("oui_index", "load", monotonic() - started, paths=self.paths)
+            return
+
+        digest = _file_digest(self.paths)
+        if cache and cache["sha256"] == digest:
+            # Same content, new timestamps (i.e. re-downloaded); refresh stamps only
+            self._set_tables(cache["tables"])
+        else:
+            self._set_tables(self._parse())
+        self._write_cache(stamps, digest)
+        if instrumentation.ENABLED:
+            instrumentation.record("oui_index", "build", monotonic() - started, paths=self.paths)
+
+    def lookup(self, mac_address):
+        """
+        Return the vendor name for a MAC address (any common format), or
+        None if no registered prefix matches it.
+        """
+        return self.lookup_hex(_mac_hex(mac_address))
+
+    def lookup_hex(self, hexdigits):
+        """
+        Return the vendor for the longest registered prefix of a string of
+        hex digits (no separators), or None.
+        """
+        for digits, table in self._lookup_order:
+            if len(hexdigits) >= digits:
+                vendor = table.get(int(hexdigits[:digits], 16))
+                if vendor is not None:
                     return vendor
+        return None
+
+    def vendor_prefixes(self, pattern, regex=False):
+        """
+        Return every prefix registered to vendors matching a pattern.
+
+        Parameters:
+        - pattern (str): Case-insensitive substring of the vendor name, or
+          a regular expression if regex is True (searched, not anchored).
+        - regex (bool, optional): Treat pattern as a regular expression.
+
+        Returns:
+        - list: (prefix, bits) tuples in address order; prefix is the integer
+          value of the first `bits` bits (24, 28 or 36) of matching addresses.
+        """
+        if self._vendor_index is None:
+            # Built on first use: vendor -> its prefixes.  Searching the
+            # ~35k distinct names is cheaper than every assignment.
+            index = {}
+            for bits, table in self._tables.items():
+                for key, vendor in table.items():
+                    index.setdefault(vendor, []).append((key, bits))
+            self._vendor_index = index
+        if regex:
+            match = re.compile(pattern, re.IGNORECASE).search
+        else:
+            needle = pattern.casefold()
+            match = lambda vendor: needle in vendor.casefold()
+        return sorted((prefix for vendor, prefixes in self._vendor_index.items()
+                       if match(vendor) for prefix in prefixes),
+                      key=lambda prefix: (prefix[0] << (48 - prefix[1]), prefix[1]))
+
+    def _set_tables(self, tables):
+        self._tables = tables
+        self._vendor_index = None
+        self._lookup_order = [
+            (bits // 4, tables[bits]) for bits in sorted(tables, reverse=True)
+        ]
+
+    def _parse(self):
+        tables = {}
+        vendors = {}
+        for path in self.paths:
+            with open(path, "r", encoding="utf-8") as f:
+                oui = None
+                for line in f:
+                    if "(hex)" in line:
+                        try:
+                            oui = int(_NON_HEX.sub("", line.partition("(hex)")[0]), 16)
+                        except ValueError:
+                            oui = None
+                        continue
+                    field, marker, vendor = line.partition("(base 16)")
+                    if not marker:
+                        continue
+                    prefix = _parse_prefix(field.strip(), oui)
+                    if prefix is None:
+                        continue
+                    key, bits = prefix
+                    vendor = vendor.strip()
+                    # Many prefixes share a vendor; store each name only once
+                    tables.setdefault(bits, {})[key] = vendors.setdefault(vendor, vendor)
+        return tables
+
+    def _read_cache(self):
+        """
+        Return the cache as {"stamps", "sha256", "tables"}, or None if it is
+        missing, stale or malformed.
+
+        On disk each table is stored as parallel lists of prefix keys and
+        indexes into one list of vendor names, so each name is kept once.
+        """
+        try:
+            with open(self.cache_path, "rb") as f:
+                cache = json.loads(f.read())
+            if cache.get("version") != self.CACHE_VERSION:
+                return None
+            if [stamp[0] for stamp in cache["stamps"]] != self.paths:
+                return None
+            vendors = cache["vendors"]
+            if not all(isinstance(vendor, str) for vendor in vendors):
+                return None
+            tables = {}
+            for bits, (keys, indexes) in cache["tables"].items():
+                if len(keys) != len(indexes) or not all(isinstance(key, int) for key in keys):
+                    return None
+                tables[int(bits)] = dict(zip(keys, (vendors[index] for index in indexes)))
+        except (OSError, ValueError, AttributeError, KeyError, TypeError, IndexError):
+            return None
+        return {"stamps": cache["stamps"], "sha256": cache["sha256"], "tables": tables}
+
+    def _write_cache(self, stamps, digest):
+        vendors = {}
+        tables = {}
+        for bits, table in self._tables.items():
+            tables[str(bits)] = [list(table), [vendors.setdefault(vendor, len(vendors)) for vendor in table.values()]]
+        cache = {
+            "version": self.CACHE_VERSION,
+            "stamps": stamps,
+            "sha256": digest,
+            "vendors": list(vendors),
+            "tables": tables,
+        }
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(cache, f, separators=(",", ":"))
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            # A read-only directory only costs us the cache, not the lookup
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+def _parse_prefix(field, oui):
+    """
+    Convert the '(base 16)' field of a registry entry into (key, bits).
+
+    MA-L and CID entries carry the full 24-bit prefix ('00C0CA').  MA-M
+    and MA-S entries carry the block's range within the parent OUI from
+    the preceding '(hex)' line ('000000-0FFFFF' is a 28-bit block,
+    'A9F000-A9FFFF' a 36-bit one).
+    """
+    start, _, end = field.partition("-")
+    try:
+        if not end:
+            return int(start, 16), 24
+        if oui is None:
+            return None
+        digits = 0
+        while digits < len(start) and start[digits] == end[digits]:
+            digits += 1
+        block = int(start[:digits], 16) if digits else 0
+        return (oui << (4 * digits)) | block, 24 + 4 * digits
+    except (ValueError, IndexError):
+        return None
+
+
+def _mac_hex(mac_address):
+    """
+    Return the hex digits of a MAC address with separators removed.
+    """
+    # str.translate handles the usual ':', '-' and '.' formats without a regex sub
+    hexdigits = mac_address.translate(_MAC_SEPARATORS)
+    if _HEX_ONLY.fullmatch(hexdigits):
+        return hexdigits
+    return _NON_HEX.sub("", mac_address)
+
+
+def _file_digest(paths):
+    sha256 = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def set_oui_location(path=None, url=None):
+    """
+    Point the OUI subsystem at a different 'oui.txt' path and/or download
+    URL.  The MA-M, MA-S and CID registries follow OUI_FILE's directory.
+
+    Parameters:
+    - path (str, optional): New location of the MA-L registry file.
+    - url (str, optional): New MA-L download URL.
+    """
+    global OUI_FILE, OUI_URL, _database
+    if path:
+        OUI_FILE = os.fspath(path)
+    if url:
+        OUI_URL = url
+    _database = None
+
+
+def registry_url(registry):
+    """
+    Return the download URL of an IEEE registry ('MA-L', 'MA-M', 'MA-S'
+    or 'CID').
+    """
+    if registry == "MA-L":
+        return OUI_URL
+    return OUI_REGISTRIES[registry][0]
+
+
+def registry_path(registry):
+    """
+    Return the local path of an IEEE registry file ('MA-L', 'MA-M',
+    'MA-S' or 'CID').  Registries other than MA-L live next to OUI_FILE.
+    """
+    if registry == "MA-L":
+        return OUI_FILE
+    return os.path.join(os.path.dirname(OUI_FILE), OUI_REGISTRIES[registry][1])
+
+
+def default_registry_paths():
+    """
+    Return OUI_FILE plus whichever of the MA-M, MA-S and CID registry
+    files are present alongside it.
+    """
+    paths = [OUI_FILE]
+    for registry in ("MA-M", "MA-S", "CID"):
+        path = registry_path(registry)
+        if os.path.isfile(path):
+            paths.append(path)
+    return paths
+
+
+def get_oui_database(log=print):
+    """
+    Return the process-wide OUIDatabase, downloading 'oui.txt' first if
+    it is not present.
+
+    'oui.txt' (MA-L) is required.  The MA-M, MA-S and CID registries are
+    indexed when they are present, but never fetched here: without them,
+    addresses from MA-M/MA-S blocks resolve to their parent OUI's owner
+    ('IEEE Registration Authority').  Fetch them once with
+    download_oui_file('MA-M') etc.
+
+    Parameters:
+    - log (callable, optional): Receives the download progress messages.
+      Defaults to print.
+
+    Returns:
+    OUIDatabase | None: The shared database, or None if the MA-L download failed.
+    """
+    global _database
+    database = _database
+    if database is not None:
+        return database
+    with _lock:
+        if _database is None:
+            if not check_for_oui_file():
+                if not download_oui_file(log=log):
+                    return None
+            _database = OUIDatabase()
+        return _database
+
+
+def oui_lookup(mac_address: str, case="upper", sep="", log=print) -> str:
+    return oui_lookup_result(mac_address, log).vendor
+
+
+def oui_lookup_result(mac_address, log=print):
+    """
+    Like oui_lookup(), but also says whether the registry was available.
+
+    Parameters:
+    - mac_address (str): MAC address in any common notation.
+    - log (callable, optional): Receives download progress and error
+      messages.  Defaults to print.
+
+    Returns:
+    OUILookupResult: (vendor, ok).  ok is False when 'oui.txt' could not
+    be downloaded or read; vendor then holds the error text and a later
+    call tries again.  'Vendor Unknown' with ok=True is a real answer.
+    """
+    if instrumentation.ENABLED:
+        started = monotonic()
+        result = _oui_lookup(mac_address, log)
+        instrumentation.record("oui_lookup", "single", monotonic() - started, result.ok,
+                               mac=mac_address, vendor=result.vendor)
+        return result
+    return _oui_lookup(mac_address, log)
+
+
+def _oui_lookup(mac_address, log):
+    try:
+        database = get_oui_database(log)
     except FileNotFoundError:
-        return "OUI file not found"
+        return OUILookupResult("OUI file not found", False)
     except Exception as e:
-        print(f"Error reading OUI file: {e}")
-    return "Vendor Unknown"
+        log(f"Error reading OUI file: {e}")
+        return OUILookupResult("Vendor Unknown", False)
+    if database is None:
+        return OUILookupResult("OUI file download failed", False)
+    return OUILookupResult(database.lookup(mac_address) or "Vendor Unknown", True)
+
+
+def _iter_macs(source):
+    """
+    Yield stripped, non-empty MAC strings from an iterable, an open text or
+    binary stream, or a path to a file with one MAC per line.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "r", encoding="utf-8") as f:
+            yield from _iter_macs(f)
+        return
+    for mac in source:
+        if isinstance(mac, bytes):
+            mac = mac.decode("ascii", "replace")
+        mac = mac.strip()
+        if mac:
+            yield mac
+
+
+def _resolve(database, macs, vendors, cache_size):
+    """
+    Resolve a sequence of MACs, memoising vendors per (36-bit) prefix.
+    """
+    results = []
+    for mac in macs:
+        prefix = _mac_hex(mac)[:9]
+        vendor = vendors.get(prefix)
+        if vendor is None:
+            vendor = database.lookup_hex(prefix) or "Vendor Unknown"
+            if len(vendors) >= cache_size:
+                vendors.clear()
+            vendors[prefix] = vendor
+        results.append((mac, vendor))
+    return results
+
+
+def _init_worker(paths):
+    global _database
+    _database = OUIDatabase(paths)
+
+
+def _resolve_chunk(macs):
+    return _resolve(_database, macs, {}, len(macs) + 1)
+
+
+def oui_lookup_many(macs, processes=1, chunk_size=10000, cache_size=65536, log=print):
+    """
+    Resolve vendor names for many MAC addresses.
+
+    Results are yielded lazily and in input order, so memory stays bounded
+    by chunk_size (times the number of in-flight chunks when using a
+    process pool) regardless of input size.  Vendors are memoised per OUI
+    prefix, so repeated prefixes are only resolved once.
+
+    Parameters:
+    - macs: An iterable of MAC strings, an open text/binary stream, or a
+      path to a file containing one MAC per line.
+    - processes (int, optional): Number of worker processes.  Default 1
+      resolves in the calling process.
+    - chunk_size (int, optional): MACs handed to a worker at a time.
+    - cache_size (int, optional): Max number of memoised prefixes.
+    - log (callable, optional): Receives download progress messages if
+      'oui.txt' has to be fetched.  Defaults to print.
+
+    Yields:
+    - tuple: (mac, vendor) for every input MAC.  Unknown OUIs yield
+      'Vendor Unknown'.
+
+    Example:
+    >>> for mac, vendor in oui_lookup_many("macs.txt", processes=4):
+    ...     print(mac, vendor)
+    """
+    database = get_oui_database(log)
+    if database is None:
+        raise FileNotFoundError(f"{OUI_FILE} not available")
+
+    source = _iter_macs(macs)
+    if processes <= 1:
+        vendors = {}
+        while True:
+            chunk = list(islice(source, chunk_size))
+            if not chunk:
+                return
+            if instrumentation.ENABLED:
+                started = monotonic()
+                results = _resolve(database, chunk, vendors, cache_size)
+                instrumentation.record("oui_lookup", "batch", monotonic() - started, macs=len(chunk))
+                yield from results
+            else:
+                yield from _resolve(database, chunk, vendors, cache_size)
+
+    with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(database.paths,)) as pool:
+        pending = deque()
+        while True:
+            # Keep a couple of chunks per worker in flight, no more
+            while len(pending) < processes * 2:
+                chunk = list(islice(source, chunk_size))
+                if not chunk:
+                    break
+                pending.append((pool.submit(_resolve_chunk, chunk), monotonic()))
+            if not pending:
+                return
+            future, submitted = pending.popleft()
+            results = future.result()
+            if instrumentation.ENABLED:
+                # Wall time from submission, including time queued behind other chunks
+                instrumentation.record("oui_lookup", "batch", monotonic() - submitted, macs=len(results))
+            yield from results
+
+
+def main(argv=None):
+    """
+    Command line entry point: read MACs (one per line) from a file or
+    stdin and write '(mac, vendor)' records as CSV or JSON Lines.
+    """
+    parser = argparse.ArgumentParser(description="Resolve MAC address vendors from the IEEE OUI registry.")
+    parser.add_argument("input", nargs="?", default="-", help="File with one MAC per line (default: stdin)")
+    parser.add_argument("-f", "--format", choices=("csv", "jsonl"), default="csv", help="Output format (default: csv)")
+    parser.add_argument("-p", "--processes", type=int, default=1, help="Worker processes (default: 1)")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == "-" else args.input
+    # stdout carries the records; progress and errors go to stderr
+    results = oui_lookup_many(source, processes=args.processes,
+                              log=lambda message: print(message, file=sys.stderr))
+    if args.format == "csv":
+        writer = csv.writer(sys.stdout)
+        writer.writerow(("mac", "vendor"))
+        writer.writerows(results)
+    else:
+        for mac, vendor in results:
+            sys.stdout.write(json.dumps({"mac": mac, "vendor": vendor}) + "\n")
+    return 0
 
 
 def check_for_oui_file() -> bool:
     """
-    Checks for the existence of the 'oui.txt' file in the local directory.
+    Checks for the existence of the 'oui.txt' file at OUI_FILE.
+
+    Only complete downloads are ever renamed into place, so an existing
+    file can be trusted.
 
     Returns:
-    bool: True if the 'oui.txt' file exists in the local directory, else False.
+    bool: True if the 'oui.txt' file exists, else False.
     """
     return os.path.isfile(OUI_FILE)
 
 
-def download_oui_file() -> bool:
+def _read_meta(path):
+    try:
+        with open(path + OUI_META_SUFFIX, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return meta if isinstance(meta, dict) else {}
+
+
+def _write_meta(path, meta):
+    meta_path = path + OUI_META_SUFFIX
+    tmp_path = f"{meta_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+
+def _expected_size(response, offset):
+    """
+    Return the final file size announced by a (ranged) response, or None
+    if it cannot be known (chunked or content-encoded transfer).
+    """
+    if response.status_code == 206:
+        total = response.headers.get("Content-Range", "").rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+    length = response.headers.get("Content-Length")
+    if length is None or response.headers.get("Content-Encoding"):
+        return None
+    return offset + int(length)
+
+
+def refresh_registry(registry="MA-L", force=False, timeout=60) -> bool:
+    """
+    Bring a local IEEE registry file up to date.
+
+    - Sends If-None-Match/If-Modified-Since using the ETag/Last-Modified
+      saved from the previous download, so an unchanged registry costs a
+      single 304 response.
+    - Downloads into '<file>.part'.  If an earlier download was cut off,
+      it is resumed with a Range request (guarded by If-Range so a changed
+      registry restarts from scratch).  A 416 reply to the resume means
+      '.part' is already complete (finished) or stale (discarded, and the
+      download restarts).
+    - The finished file is size-checked, fsync'd and atomically renamed
+      over the old one; a crash never leaves a truncated registry behind.
+    - The derived OUIDatabase is only invalidated if the content changed.
+
+    Parameters:
+    - registry (str, optional): 'MA-L' (default), 'MA-M', 'MA-S' or 'CID'.
+    - force (bool, optional): Skip the conditional request headers.
+    - timeout (float, optional): Socket timeout in seconds.
+
+    Returns:
+    bool: True if the local file content changed, False if it was current.
+
+    Raises:
+    requests.RequestException: On HTTP errors or an incomplete download.
+    OSError: If the file cannot be written.
     """
-    Downloads the OUI data file from the IEEE website.
+    with _lock:
+        return _refresh_registry(registry, force, timeout)
+
+
+def _refresh_registry(registry, force, timeout):
+    global _database
+    url = registry_url(registry)
+    path = registry_path(registry)
+    part_path = path + OUI_PART_SUFFIX
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    meta = _read_meta(path)
+    headers = {}
+    if not force and os.path.isfile(path) and meta.get("url") == url:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    offset = 0
+    partial = meta.get("partial") or {}
+    validator = partial.get("etag") or partial.get("last_modified")
+    if validator and partial.get("url") == url and os.path.isfile(part_path):
+        offset = os.path.getsize(part_path)
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = validator
+
+    with requests.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if response.status_code == 304:
+            return False
+        if response.status_code == 416 and offset:
+            # Nothing left to fetch from `offset`: either '.part' is already
+            # complete (interrupted before the rename) or it does not match
+            total = response.headers.get("Content-Range", "").rpartition("/")[2]
+            if total != str(offset):
+                os.remove(part_path)
+                meta.pop("partial", None)
+                _write_meta(path, meta)
+                return _refresh_registry(registry, force, timeout)
+            validators = {key: partial.get(key) for key in ("url", "etag", "last_modified")}
+            expected = offset
+        else:
+            response.raise_for_status()
+            if response.status_code != 206:
+                offset = 0  # Server ignored or rejected the range; start over
+            validators = {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+            meta["partial"] = validators
+            _write_meta(path, meta)
+
+            expected = _expected_size(response, offset)
+            with open(part_path, "ab" if offset else "wb") as f:
+                for chunk in response.iter_content(chunk_size=8192):  # Handle large downloads
+                    f.write(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+
+    size = os.path.getsize(part_path)
+    if expected is not None and size != expected:
+        raise requests.RequestException(f"Incomplete download of {url} ({size} of {expected} bytes)")
+
+    changed = not os.path.isfile(path) or _file_digest([path]) != _file_digest([part_path])
+    if changed:
+        os.replace(part_path, path)
+        _database = None  # Re-index on next lookup
+    else:
+        os.remove(part_path)
+    _write_meta(path, validators)
+    return changed
+
+
+def download_oui_file(registry="MA-L", log=print) -> bool:
+    """
+    Downloads (or refreshes) an IEEE registry file, by default the MA-L
+    'oui.txt', from the IEEE website.  See refresh_registry().
+
+    Parameters:
+    - registry (str, optional): 'MA-L' (default), 'MA-M', 'MA-S' or 'CID'.
+    - log (callable, optional): Receives the progress messages. Defaults to print.
 
     Returns:
-    bool: True if the file is downloaded and saved successfully, False otherwise.
+    bool: True if the file is present and current, False otherwise.
     """
+    path = registry_path(registry)
     try:
-        print(f"Downloading {OUI_FILE} from IEEE.org...")
-        response = requests.get(OUI_URL, stream=True)
-        response.raise_for_status()
+        log(f"Downloading {path} from IEEE.org...")
+        if refresh_registry(registry):
+            log(f"{path} downloaded successfully.")
+        else:
+            log(f"{path} is already up to date.")
+        return True
+    except (requests.RequestException, OSError) as e:
+        log(f"Error downloading {path}: {e}")
+        return False
 
-        with open(OUI_FILE, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):  # Handle large downloads
-                f.write(chunk)
 
-        print(f"{OUI_FILE} downloaded successfully.")
-        return True
-    except requests.RequestException as e:
-        print(f"Error downloading {OUI_FILE}: {e}")
-        return False
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
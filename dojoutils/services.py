@@ -0,0 +1,201 @@
+"""
+This module queries and changes many systemd units per systemctl call.
+
+The linuxcommands service helpers (check_service(), start_service(), ...)
+build one single-unit command each, so checking 40 units costs 40
+process launches.  Here every state query is one `systemctl show` for
+all units, and every action is one `systemctl <verb>` per verb.
+Results are dicts keyed by unit name.
+
+The parsers take plain text, so they can be tested against recorded
+systemctl output.  D-Bus is not used: it would need a third-party
+binding (dbus-python, jeepney, ...), and one systemctl process per batch
+is already a flat cost.
+
+Functions:
+    parse_systemctl_show(text, units): `systemctl show` output -> {unit: ServiceState}.
+    parse_action_errors(stderr, units): systemctl error output -> {unit: message}.
+    service_states(units): Returns {unit: ServiceState} from one systemctl call.
+    services_active(units): Returns {unit: bool}.
+    manage_services(actions): Runs {verb: [units]}, one systemctl call per verb.
+
+Usage:
+    >>> services_active(["ssh", "NetworkManager", "hostapd"])
+    {'ssh': True, 'NetworkManager': False, 'hostapd': False}
+    >>> manage_services({"stop": ["NetworkManager", "wpa_supplicant"], "start": ["hostapd"]})
+"""
+
+from collections import namedtuple
+
+from dojoutils.shellcommands import run_commands
+
+SERVICE_PROPERTIES = ("Id", "LoadState", "ActiveState", "SubState", "UnitFileState", "MainPID")
+
+ServiceState = namedtuple("ServiceState", ["unit", "id", "load_state", "active_state", "sub_state",
+                                           "unit_file_state", "main_pid", "active"])
+ServiceActionResult = namedtuple("ServiceActionResult", ["ok", "error", "state"])
+
+# State each verb should leave a unit in: (field, accepted values)
+_EXPECTED = {
+    "start": ("active_state", {"active"}),
+    "restart": ("active_state", {"active"}),
+    "reload": ("active_state", {"active"}),
+    "try-restart": ("active_state", {"active", "inactive"}),
+    "stop": ("active_state", {"inactive", "failed"}),
+    "enable": ("unit_file_state", {"enabled", "enabled-runtime", "static", "alias"}),
+    "disable": ("unit_file_state", {"disabled", "static"}),
+    "mask": ("unit_file_state", {"masked", "masked-runtime"}),
+    "unmask": ("unit_file_state", {"enabled", "disabled", "static", "alias", "indirect", "generated"}),
+}
+
+
+def _unit_name(unit):
+    """
+    Return the full unit name systemctl uses in its messages ('ssh' -> 'ssh.service').
+    """
+    return unit if "." in unit else f"{unit}.service"
+
+
+def parse_systemctl_show(text, units):
+    """
+    Parse `systemctl show --property=... <units>` output.
+
+    systemctl prints one block of Key=Value lines per unit, in argument
+    order, separated by blank lines; blocks are matched to `units` by
+    position, so aliases (whose Id is the real unit) map back correctly.
+
+    Parameters:
+    text (str): Captured stdout.
+    units (list): The units passed to systemctl, in order.
+
+    Returns:
+    dict: Unit -> ServiceState(unit, id, load_state, active_state,
+    sub_state, unit_file_state, main_pid, active).
+    """
+    blocks = [block for block in text.strip("\n").split("\n\n") if block.strip()]
+    states = {}
+    for unit, block in zip(units, blocks):
+        properties = dict(line.partition("=")[::2] for line in block.splitlines() if "=" in line)
+        main_pid = properties.get("MainPID", "")
+        active_state = properties.get("ActiveState") or None
+        states[unit] = ServiceState(
+            unit=unit,
+            id=properties.get("Id") or None,
+            load_state=properties.get("LoadState") or None,
+            active_state=active_state,
+            sub_state=properties.get("SubState") or None,
+            unit_file_state=properties.get("UnitFileState") or None,
+            main_pid=int(main_pid) if main_pid.isdigit() and main_pid != "0" else None,
+            active=active_state in ("active", "reloading"),
+        )
+    return states
+
+
+def parse_action_errors(stderr, units):
+    """
+    Attribute systemctl error lines to the units they name.
+
+    Parameters:
+    stderr (str): Captured stderr of `systemctl <verb> <units>`.
+    units (list): The units passed to systemctl.
+
+    Returns:
+    dict: Unit -> error message, for units mentioned in the output.
+    """
+    names = {unit: _unit_name(unit) for unit in units}
+    errors = {}
+    for line in stderr.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        for unit, name in names.items():
+            if name in line or f" {unit} " in f" {line} ":
+                errors[unit] = f"{errors[unit]} {line}" if unit in errors else line
+    return errors
+
+
+def _systemctl(args, timeout):
+    return run_commands([["systemctl", "--no-pager", *args]], timeout=timeout)[0]
+
+
+def service_states(units, timeout=30):
+    """
+    Return the state of many units from one `systemctl show` call.
+
+    Parameters:
+    units (iterable): Unit names ('ssh' or 'ssh.service').
+    timeout (float, optional): Seconds before systemctl is killed.
+
+    Returns:
+    dict: Unit -> ServiceState.  Units systemctl does not know have
+    load_state 'not-found'.  Empty if systemctl could not be run.
+    """
+    units = list(dict.fromkeys(units))
+    if not units:
+        return {}
+    result = _systemctl(["show", f"--property={','.join(SERVICE_PROPERTIES)}", "--", *units], timeout)
+    if result.returncode != 0 and not result.stdout:
+        print(f"Error querying services: {result.stderr.strip()}")
+        return {}
+    return parse_systemctl_show(result.stdout, units)
+
+
+def services_active(units, timeout=30):
+    """
+    Return {unit: bool} for many units, like check_service() for each,
+    from one systemctl call.
+    """
+    units = list(units)
+    states = service_states(units, timeout)
+    return {unit: unit in states and states[unit].active for unit in units}
+
+
+def manage_services(actions, timeout=60):
+    """
+    Apply service actions with one systemctl call per verb, then read back
+    every affected unit's state with one more call.
+
+    Parameters:
+    actions (dict): Verb ('start', 'stop', 'restart', 'reload', 'enable',
+    'disable', 'mask', 'unmask', ...) -> list of units.  Verbs run in dict
+    order, so {"stop": [...], "start": [...]} stops first.
+    timeout (float, optional): Seconds each systemctl call may take.
+
+    Returns:
+    dict: Verb -> {unit: ServiceActionResult(ok, error, state)}.  ok is
+    True when systemctl reported no error for the unit and its state
+    afterwards matches the verb (i.e. active after 'start').  The state
+    check only applies to the last verb run on a unit; earlier verbs on
+    the same unit are judged by systemctl's errors alone.
+    """
+    errors = {}
+    last_verb = {}
+    for verb, units in actions.items():
+        units = list(dict.fromkeys(units))
+        if not units:
+            continue
+        result = _systemctl([verb, "--", *units], timeout)
+        verb_errors = parse_action_errors(result.stderr, units)
+        if result.timed_out:
+            verb_errors = {unit: f"timed out after {timeout}s" for unit in units}
+        elif result.returncode != 0 and not verb_errors:
+            message = result.stderr.strip() or f"exit status {result.returncode}"
+            verb_errors = {unit: message for unit in units}
+        errors[verb] = (units, verb_errors)
+        last_verb.update(dict.fromkeys(units, verb))
+
+    states = service_states({unit for units, _ in errors.values() for unit in units}, timeout)
+    results = {}
+    for verb, (units, verb_errors) in errors.items():
+        results[verb] = {}
+        for unit in units:
+            state = states.get(unit)
+            error = verb_errors.get(unit)
+            ok = error is None
+            if ok and verb in _EXPECTED and state is not None and last_verb[unit] == verb:
+                field, accepted = _EXPECTED[verb]
+                ok = getattr(state, field) in accepted
+                if not ok:
+                    error = f"{field.replace('_', ' ')} is {getattr(state, field)}"
+            results[verb][unit] = ServiceActionResult(ok, error, state)
+    return results
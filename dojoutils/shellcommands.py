@@ -1,92 +1,221 @@
 """
-This module provides functionality to execute shell 
+This module provides functionality to execute shell
 commands from within Python.
 
-It uses the subprocess module to safely execute shell 
-commands and capture their output.
+It uses the subprocess module to safely execute shell
+commands (without a shell) and capture their output.
 
-Function:
-    run_shell_cmd(cmd):
-        Executes a given shell command and returns 
-        its standard output and standard error.
+Functions:
+    run_commands(cmds, max_workers=8, timeout=None, on_stdout=None, on_stderr=None):
+        Executes many commands concurrently, with a limit on
+        how many run at once and an optional per-command
+        timeout.  Output can be streamed line by line to
+        callbacks while the commands run.  Returns a
+        CommandResult (argv, returncode, duration, stdout,
+        stderr, timed_out) per command, in input order.
+
+    iw_state_changed():
+        Drops cached `iw dev` state (dojoutils.iwinfo); called
+        automatically after iw/ip commands that change an
+        interface.
 
-        This function takes a shell command as a string, 
-        splits it into a list of arguments,
-        and then executes it using subprocess.Popen. The 
-        standard output (stdout) and standard
-        error (stderr) of the command are captured and 
-        returned.
+    run_shell_cmd(cmd, timeout=None):
+        Executes a given shell command and returns
+        its standard output and standard error.
 
-        The function prints the stdout and stderr to the 
-        console, which can be useful for debugging or 
-        logging purposes.
+        This function takes a shell command as a string,
+        splits it into a list of arguments (honouring
+        quotes), and then executes it with run_commands().
+        The standard output (stdout) and standard error
+        (stderr) of the command are captured and returned.
 
 Parameters:
     cmd (str): The shell command to be executed.
 
 Returns:
-    list: A list containing two elements - the standard 
+    list: A list containing two elements - the standard
     output and standard error of the executed command.
 
-        The first element of the list is the standard 
+        The first element of the list is the standard
         output (stdout) of the command.
         The second element is the standard error (stderr).
 
 Example:
     >>> run_shell_cmd("echo Hello World")
-    stdout: b'Hello World\n'
-    stderr: b''
-    [b'Hello World\n', b'']
+    ['Hello World\n', '']
+
+    >>> results = run_commands([["ip", "link", "set", "dev", iface, "up"] for iface in ifaces],
+    ...                        max_workers=4, timeout=10)
+    >>> failed = [result.argv for result in results if result.returncode != 0]
 
 Note:
-    - The command is executed in a separate process, and 
+    - The command is executed in a separate process, and
     this function waits for it to complete.
-    - This function should be used with caution, especially 
-    when executing commands from untrusted sources, as it can 
+    - This function should be used with caution, especially
+    when executing commands from untrusted sources, as it can
     pose security risks.
 """
 
+import os
+import selectors
+import shlex
 import subprocess
+import sys
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic
+
+import dojoutils.instrumentation as instrumentation
+
+CommandResult = namedtuple("CommandResult", ["argv", "returncode", "duration", "stdout", "stderr", "timed_out"])
+
+# Return code reported when a command cannot be started (as the shell does)
+COMMAND_NOT_FOUND = 127
+
+
+# iw/ip sub-commands that change an interface's mode, channel, address, ...
+_STATE_CHANGING = {"set", "add", "del", "delete"}
+
+
+def iw_state_changed():
+    """
+    Drop the cached `iw dev` state (see dojoutils.iwinfo.get_iw_interfaces())
+    after changing an interface.  Costs nothing if iwinfo was never imported.
+    """
+    iwinfo = sys.modules.get("dojoutils.iwinfo")
+    if iwinfo is not None:
+        iwinfo.invalidate_iw_dev_cache()
+
+
+def _changes_interface(argv):
+    return bool(argv) and os.path.basename(argv[0]) in ("iw", "ip") and not _STATE_CHANGING.isdisjoint(argv[1:])
+
+
+def _argv(cmd):
+    return shlex.split(cmd) if isinstance(cmd, str) else [str(arg) for arg in cmd]
+
+
+def _record(result):
+    instrumentation.record("command", os.path.basename(result.argv[0]), result.duration,
+                           result.returncode == 0 and not result.timed_out, argv=result.argv,
+                           returncode=result.returncode, timed_out=result.timed_out)
+
+
+def _run_one(argv, timeout, on_stdout, on_stderr, callback_lock):
+    """
+    Run one command, streaming complete lines to the callbacks; kill it
+    if it runs past `timeout` seconds.
+    """
+    started = monotonic()
+    try:
+        process = subprocess.Popen(argv, stdin=subprocess.DEVNULL,
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as e:
+        result = CommandResult(argv, COMMAND_NOT_FOUND, monotonic() - started, "", f"{argv[0]}: {e.strerror}\n", False)
+        if instrumentation.ENABLED:
+            _record(result)
+        return result
+
+    streams = {
+        process.stdout: ([], on_stdout, bytearray()),
+        process.stderr: ([], on_stderr, bytearray()),
+    }
+
+    def emit(callback, data):
+        with callback_lock:
+            callback(argv, data.decode(errors="replace"))
+
+    deadline = started + timeout if timeout is not None else None
+    timed_out = False
+    with selectors.DefaultSelector() as selector:
+        for stream in streams:
+            selector.register(stream, selectors.EVENT_READ)
+        while selector.get_map():
+            remaining = None if deadline is None else deadline - monotonic()
+            if remaining is not None and remaining <= 0:
+                timed_out = True
+                process.kill()
+                break
+            for key, _ in selector.select(remaining):
+                chunks, callback, partial = streams[key.fileobj]
+                data = os.read(key.fd, 65536)
+                if not data:
+                    selector.unregister(key.fileobj)
+                    continue
+                chunks.append(data)
+                if callback:
+                    partial += data
+                    *lines, rest = partial.split(b"\n")
+                    for line in lines:
+                        emit(callback, line)
+                    partial[:] = rest
+
+    if not timed_out:
+        # The child may close its pipes and keep running; the deadline
+        # still applies
+        try:
+            process.wait(None if deadline is None else max(0.0, deadline - monotonic()))
+        except subprocess.TimeoutExpired:
+            timed_out = True
+            process.kill()
+    process.wait()
+    if _changes_interface(argv):
+        iw_state_changed()
+    for stream, (_, callback, partial) in streams.items():
+        stream.close()
+        if callback and partial:
+            emit(callback, partial)
+    stdout, stderr = (b"".join(chunks).decode(errors="replace") for chunks, _, _ in streams.values())
+    result = CommandResult(argv, process.returncode, monotonic() - started, stdout, stderr, timed_out)
+    if instrumentation.ENABLED:
+        _record(result)
+    return result
+
+
+def run_commands(cmds, max_workers=8, timeout=None, on_stdout=None, on_stderr=None):
+    """
+    Executes many commands concurrently without a shell.
+
+    Parameters:
+    cmds (iterable): Commands as argv lists, or strings (split with shlex).
+    max_workers (int, optional): Most commands running at once. Defaults to 8.
+    timeout (float, optional): Seconds each command may run before it is
+    killed. Defaults to None (no limit).
+    on_stdout (callable, optional): Called as on_stdout(argv, line) for each
+    line of standard output while the command runs (newline stripped).
+    on_stderr (callable, optional): Same for standard error.
+
+    Callbacks run on worker threads but never concurrently with each other.
+
+    Returns:
+    list: A CommandResult(argv, returncode, duration, stdout, stderr,
+    timed_out) per command, in input order.  A command that times out
+    has timed_out=True and the returncode of the killed process; one that
+    cannot be started has returncode 127 and the error in stderr.
+    """
+    argvs = [_argv(cmd) for cmd in cmds]
+    if not argvs:
+        return []
+    callback_lock = threading.Lock()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(argvs))) as pool:
+        futures = [pool.submit(_run_one, argv, timeout, on_stdout, on_stderr, callback_lock) for argv in argvs]
+        return [future.result() for future in futures]
+
 
-def run_shell_cmd(cmd):
+def run_shell_cmd(cmd, timeout=None):
     """
-    Executes a given shell command and captures its standard 
+    Executes a given shell command and captures its standard
     output and error.
 
     Parameters:
     cmd (str): The shell command to be executed.
+    timeout (float, optional): Seconds before the command is killed.
+    Defaults to None (no limit).
 
     Returns:
-    list: A list containing the standard output and standard 
+    list: A list containing the standard output and standard
     error from the executed command.
     """
-    process = subprocess.Popen(
-        cmd.split(),
-        stdout=subprocess.PIPE, 
-        stderr=subprocess.PIPE)
-    stdout, stderr = process.communicate()
-    # print(f"stdout: {stdout}")
-    # print(f"stderr: {stderr}")
-    return [stdout.decode(), stderr.decode()]
-    # if len(stderr) > 0:
-    #    return [False, stderr.decode()]
-    # else:
-    #    return [True, stdout.decode()]
-
-    # Alternative method using subprocess.run()
-    # This method is simpler, but it doesn't allow capturing
-    # the output and error separately.
-    #result = subprocess.run(cmd.split(), capture_output=True, text=True)
-    #if result.returncode != 0:
-    #    print(f"Error executing command: {cmd}")
-    #    print(f"Error message: {result.stderr}")
-    #    return None
-    #else:
-    #    return [result.stdout, result.stderr]
-
-    # I wonder if subprocess.check_call() would be a better option
-    # than subprocess.run() or subprocess.Popen()?  Perhaps in certain
-    # situations, but it doesn't allow capturing the output and error.
-    # But for running a command like dhclient, it might be a better
-    # option.  It's worth looking into.
-    
\ No newline at end of file
+    result = run_commands([cmd], timeout=timeout)[0]
+    return [result.stdout, result.stderr]
@@ -9,12 +9,17 @@ operations. This includes detecting the operating system, looking up the
 OUI (Organizationally Unique Identifier) of MAC addresses, and drawing 
 lines for aesthetic terminal output.
 
+Classes:
+    InterfaceInventory(if_dir="/sys/class/net"):
+        Cached, event-driven view of the interfaces with phy,
+        driver, MAC, mode and operstate.
+
 Functions:
-    get_wlan_interfaces():
+    get_wlan_interfaces(if_dir="/sys/class/net"):
         Scans and retrieves available WLAN interfaces and their 
         respective MAC addresses.
 
-    interface_selector(wlan_interfaces, showmac=True, linetype=1):
+    interface_selector(showmac=True, linetype=1):
         Provides an interactive interface for selecting a WLAN 
         interface from the list of available interfaces.
 
@@ -26,24 +31,280 @@ Note:
 """
 
 import os
+import shutil
+import socket
+import struct
+import sys
+import threading
+from collections import namedtuple
 from sys import exit
+from time import monotonic
 import dojoutils.getos as getos
-from dojoutils.ouilookup import oui_lookup
+import dojoutils.ouilookup as ouilookup
 from dojoutils.draw_line import drawline
 
+SYS_CLASS_NET = "/sys/class/net"
+
+InterfaceInfo = namedtuple("InterfaceInfo", ["name", "ifindex", "phy", "driver", "mac", "mode", "operstate", "wireless"])
+
+# ARPHRD_* link types (linux/if_arp.h) as reported in /sys/class/net/<iface>/type.
+# Only monitor mode has its own link type; station, AP, IBSS and mesh are all
+# ARPHRD_ETHER (1), so their mode is left as None (see iwinfo.get_iw_interfaces()).
+_LINK_MODES = {
+    801: "monitor",     # ARPHRD_IEEE80211
+    802: "monitor",     # ARPHRD_IEEE80211_PRISM
+    803: "monitor",     # ARPHRD_IEEE80211_RADIOTAP
+}
 
-def get_wlan_interfaces():
+# rtnetlink (linux/rtnetlink.h, linux/if_link.h)
+NETLINK_ROUTE = 0
+RTMGRP_LINK = 0x1
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+IFLA_IFNAME = 3
+_NLMSGHDR = struct.Struct("=IHHII")
+_IFINFOMSG = struct.Struct("=BxHiII")
+_RTATTR = struct.Struct("=HH")
+
+
+def _read(path):
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _read_interface(if_dir, name):
+    """
+    Gather everything we report about one interface in a single pass over
+    its sysfs directory.  Returns None if the interface has vanished.
+    """
+    path = os.path.join(if_dir, name)
+    ifindex = _read(os.path.join(path, "ifindex"))
+    if ifindex is None and not os.path.isdir(path):
+        return None
+    phy = _read(os.path.join(path, "phy80211", "name"))
+    wireless = phy is not None or os.path.isdir(os.path.join(path, "wireless"))
+    try:
+        driver = os.path.basename(os.readlink(os.path.join(path, "device", "driver")))
+    except OSError:
+        driver = None
+    link_type = _read(os.path.join(path, "type"))
+    mode = _LINK_MODES.get(int(link_type)) if wireless and link_type and link_type.isdigit() else None
+    return InterfaceInfo(
+        name=name,
+        ifindex=int(ifindex) if ifindex and ifindex.isdigit() else None,
+        phy=phy,
+        driver=driver,
+        mac=_read(os.path.join(path, "address")),
+        mode=mode,
+        operstate=_read(os.path.join(path, "operstate")),
+        wireless=wireless,
+    )
+
+
+class InterfaceInventory:
+    """
+    A cached view of the network interfaces in /sys/class/net.
+
+    The directory is scanned once; after that the inventory keeps itself
+    current from RTNETLINK link notifications (RTMGRP_LINK), re-reading
+    only the interfaces the kernel reports as added, changed or removed.
+    Where a netlink socket cannot be opened (or if_dir is not the real
+    sysfs tree), it falls back to comparing the directory listing and
+    rescanning at most every `max_age` seconds.
+
+    Usage:
+        inventory = InterfaceInventory()
+        for name, info in inventory.snapshot().items():
+            print(name, info.phy, info.driver, info.mac, info.mode, info.operstate)
+
+    Args:
+        if_dir (str): Directory to scan (default '/sys/class/net').
+        max_age (float): Fallback mode only; seconds a scan is trusted
+            when the set of interfaces has not changed (default 1.0).
+        use_netlink (bool): Force netlink on or off; default None uses it
+            when if_dir is the real sysfs tree and the socket can be opened.
+    """
+
+    def __init__(self, if_dir=SYS_CLASS_NET, max_age=1.0, use_netlink=None):
+        self.if_dir = if_dir
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._interfaces = {}
+        self._names = None
+        self._scanned_at = None
+        self._sock = None
+        if use_netlink is None:
+            use_netlink = os.path.realpath(if_dir) == os.path.realpath(SYS_CLASS_NET)
+        if use_netlink:
+            try:
+                self._sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+                self._sock.bind((0, RTMGRP_LINK))
+                self._sock.setblocking(False)
+            except (OSError, AttributeError):
+                # AttributeError: no AF_NETLINK on this platform
+                if self._sock is not None:
+                    self._sock.close()
+                self._sock = None
+        # Subscribe before the first scan so no change can slip in between
+        self.refresh()
+
+    @property
+    def event_driven(self):
+        """True if the inventory is kept current by netlink notifications."""
+        return self._sock is not None
+
+    def refresh(self):
+        """
+        Rescan every interface.
+        """
+        with self._lock:
+            self._scan()
+
+    def snapshot(self, wireless_only=True):
+        """
+        Return the current interfaces.
+
+        Args:
+            wireless_only (bool): Only include wireless interfaces (default True).
+
+        Returns:
+            dict: Interface name -> InterfaceInfo(name, ifindex, phy, driver,
+            mac, mode, operstate, wireless).  mode is 'monitor' or None:
+            sysfs cannot tell managed, AP, IBSS and mesh apart, so use
+            iwinfo.get_iw_interface() for the exact type.
+        """
+        with self._lock:
+            if self._sock is not None:
+                self._apply_events()
+            else:
+                self._check_generation()
+            interfaces = dict(self._interfaces)
+        if wireless_only:
+            return {name: info for name, info in interfaces.items() if info.wireless}
+        return interfaces
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _scan(self):
+        interfaces = {}
+        try:
+            with os.scandir(self.if_dir) as entries:
+                names = [entry.name for entry in entries]
+        except OSError:
+            names = []
+        for name in names:
+            info = _read_interface(self.if_dir, name)
+            if info is not None:
+                interfaces[name] = info
+        self._interfaces = interfaces
+        self._names = set(names)
+        self._scanned_at = monotonic()
+
+    def _check_generation(self):
+        try:
+            names = set(os.listdir(self.if_dir))
+        except OSError:
+            names = set()
+        if names != self._names or monotonic() - self._scanned_at >= self.max_age:
+            self._scan()
+
+    def _apply_events(self):
+        """
+        Drain pending link notifications and re-read the interfaces they name.
+
+        Events are matched to entries by ifindex: a rename (i.e. wlan0 ->
+        wlan0mon) arrives as one RTM_NEWLINK carrying only the new name, so
+        the entry held under the old name has to be found by its index.
+        """
+        changed = {}
+        while True:
+            try:
+                data = self._sock.recv(65536)
+            except BlockingIOError:
+                break
+            except OSError:
+                # ENOBUFS: notifications were dropped, so trust nothing
+                self._scan()
+                return
+            offset = 0
+            while offset + _NLMSGHDR.size <= len(data):
+                length, msg_type = _NLMSGHDR.unpack_from(data, offset)[:2]
+                if length < _NLMSGHDR.size:
+                    break
+                if msg_type in (RTM_NEWLINK, RTM_DELLINK) and length >= _NLMSGHDR.size + _IFINFOMSG.size:
+                    ifindex = _IFINFOMSG.unpack_from(data, offset + _NLMSGHDR.size)[2]
+                    name = _ifla_ifname(data[offset + _NLMSGHDR.size + _IFINFOMSG.size:offset + length])
+                    changed[ifindex] = (name, msg_type)
+                offset += (length + 3) & ~3
+        for ifindex, (name, msg_type) in changed.items():
+            stale = [old for old, info in self._interfaces.items() if info.ifindex == ifindex and old != name]
+            for old in stale:
+                del self._interfaces[old]
+            if not name:
+                continue
+            info = _read_interface(self.if_dir, name) if msg_type == RTM_NEWLINK else None
+            if info is None:
+                self._interfaces.pop(name, None)
+            else:
+                self._interfaces[name] = info
+
+
+def _ifla_ifname(attrs):
+    offset = 0
+    while offset + _RTATTR.size <= len(attrs):
+        length, attr_type = _RTATTR.unpack_from(attrs, offset)
+        if length < _RTATTR.size:
+            break
+        if attr_type == IFLA_IFNAME:
+            return attrs[offset + _RTATTR.size:offset + length].split(b"\0", 1)[0].decode()
+        offset += (length + 3) & ~3
+    return None
+
+
+_inventories = {}
+
+
+def get_inventory(if_dir=SYS_CLASS_NET):
+    """
+    Return the shared InterfaceInventory for a directory, creating it on
+    first use.
+    """
+    inventory = _inventories.get(if_dir)
+    if inventory is None:
+        inventory = _inventories[if_dir] = InterfaceInventory(if_dir)
+    return inventory
+
+
+def get_wlan_interfaces(if_dir=SYS_CLASS_NET):
     """
     Scans the system to identify available wireless network interfaces 
     along with their MAC addresses.
 
     This function checks for WLAN interfaces by inspecting the 
     '/sys/class/net' directory. It filters out non-wireless interfaces and 
-    retrieves the MAC addresses for the wireless ones.
+    retrieves the MAC addresses for the wireless ones.  The directory is
+    scanned once and then kept current by a shared InterfaceInventory, so
+    calling this in a loop is cheap.
+
+    Parameters:
+    if_dir (str, optional): Directory to scan. Defaults to '/sys/class/net';
+    point it at a copy of that tree to run without the real interfaces.
 
     Returns:
     dict: A dictionary where keys are interface names and values are 
-    their respective MAC addresses.
+    their respective MAC addresses (None if the address is unreadable).
 
     Raises:
     SystemExit: If the operating system is not Linux, as the function 
@@ -52,35 +313,150 @@ def get_wlan_interfaces():
     if getos.os_is() != "Linux":
         print("\nThis tool only runs on Debian/Ubuntu versions of Linux.\nExiting.\n")
         return None
-    
-    if_dir = "/sys/class/net"
-    interfaces = os.listdir(if_dir)
-    wlan_interfaces = {}
-    for iface in interfaces:
-        wireless_dir = os.path.join(if_dir, iface, 'wireless')
-        if os.path.isdir(wireless_dir):
-            address_file = os.path.join(if_dir, iface, 'address')
-            if os.path.isfile(address_file):
-                with open(address_file, 'r') as f:
-                    mac_address = f.read().strip()
-            wlan_interfaces[iface] = mac_address
-
-    return wlan_interfaces
+
+    return {name: info.mac for name, info in get_inventory(if_dir).snapshot().items()}
+
+
+# MAC -> vendor, shared by every interface_selector() call in the process
+_vendor_cache = {}
+
+
+# The one background vendor resolver and the listing it reports to.  A
+# refresh ('r') hands the running resolver the new listing rather than
+# starting a second thread, so only one lookup (or download) is in flight.
+_resolver_lock = threading.Lock()
+_resolver_thread = None
+_resolver_listing = None
+
+
+def _lookup_vendor(mac_address, log=print):
+    vendor = _vendor_cache.get(mac_address)
+    if vendor is None:
+        vendor, ok = ouilookup.oui_lookup_result(mac_address, log=log)
+        vendor = vendor.strip()
+        # Only cache real answers: if the registry could not be downloaded
+        # or read, the next lookup retries
+        if ok:
+            _vendor_cache[mac_address] = vendor
+    return vendor
+
+
+def _start_resolver(listing):
+    global _resolver_thread, _resolver_listing
+    with _resolver_lock:
+        _resolver_listing = listing
+        if _resolver_thread is None:
+            _resolver_thread = threading.Thread(target=_resolver, daemon=True)
+            _resolver_thread.start()
+
+
+def _resolver_log(text):
+    # Download messages go through the current listing's print() so its
+    # rows_below stays right
+    _resolver_listing.print(text)
+
+
+def _resolver():
+    global _resolver_thread
+    while True:
+        with _resolver_lock:
+            listing = _resolver_listing
+            index = listing._next_pending()
+            if index is None:
+                _resolver_thread = None
+                return
+        listing._show(index, _lookup_vendor(listing.interfaces[index][1], log=_resolver_log))
+
+
+class _InterfaceList:
+    """
+    Prints the numbered interface list and fills in vendor names as the
+    background resolver (see _start_resolver()) works through them.
+
+    On a terminal, each line is rewritten in place (ANSI save cursor,
+    cursor up, clear line, restore cursor) so the prompt below is left
+    alone; otherwise only vendors that were already cached are shown.
+    Output printed below the list must go through print() so the
+    distance back up to the list is known.
+    """
+
+    def __init__(self, wlan_interfaces, showmac, linetype):
+        self.interfaces = list(wlan_interfaces.items())
+        self.showmac = showmac
+        self.tty = sys.stdout.isatty()
+        self.rows_below = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self._pending = []
+
+        print(" WLAN Interface Selector")
+        drawline(linetype)
+        for index, (interface, mac_address) in enumerate(self.interfaces):
+            if showmac:
+                vendor = _vendor_cache.get(mac_address)
+                if vendor is None and mac_address:
+                    self._pending.append(index)
+                print(self._line(index, (vendor or "resolving...") if mac_address else "no MAC address"))
+            else:
+                print(f"{index + 1}.  {interface}")
+        print()
+        if self._pending:
+            _start_resolver(self)
+
+    def _line(self, index, vendor):
+        interface, mac_address = self.interfaces[index]
+        line = f"{index + 1}. {interface}  ({mac_address}) ({vendor})"
+        if self.tty:
+            # A wrapped line would throw off the cursor arithmetic
+            line = line[:shutil.get_terminal_size().columns - 1]
+        return line
+
+    def _next_pending(self):
+        """
+        Return the index of the next row to resolve, or None when done.
+        """
+        with self._lock:
+            if self._closed or not self._pending:
+                return None
+            return self._pending.pop(0)
+
+    def _show(self, index, vendor):
+        with self._lock:
+            if self._closed or not self.tty:
+                return
+            rows_up = len(self.interfaces) - index + 1 + self.rows_below
+            sys.stdout.write(f"\0337\033[{rows_up}A\r\033[2K{self._line(index, vendor)}\0338")
+            sys.stdout.flush()
+
+    def input(self, prompt):
+        choice = input(prompt)
+        with self._lock:
+            self.rows_below += 1
+        return choice
+
+    def print(self, text=""):
+        with self._lock:
+            print(text)
+            self.rows_below += text.count("\n") + 1
+
+    def close(self):
+        with self._lock:
+            self._closed = True
 
 
 def interface_selector(showmac=True, linetype=1):
     """
     Provides an interactive interface for selecting a wireless network 
-    interface from a given list.
+    interface.
 
     This function displays a list of available WLAN interfaces. If 
     'showmac' is True, it also shows the MAC address and the corresponding 
-    OUI vendor name for each interface. The user can select an interface by 
-    entering its corresponding number.
+    OUI vendor name for each interface. The list is printed straight away;
+    vendor names are looked up in the background (through a cache shared
+    by every call) and filled in as they arrive. The user can select an
+    interface by entering its corresponding number.
 
     Parameters:
-    wlan_interfaces (dict): A dictionary of WLAN interfaces and their
-      MAC addresses.
     showmac (bool, optional): Whether to show MAC addresses and OUI 
     vendor names. Defaults to True.
     linetype (int, optional): The type of line to be drawn for aesthetic 
@@ -96,45 +472,30 @@ def interface_selector(showmac=True, linetype=1):
     - The function allows refreshing the list of interfaces or quitting 
     the selection process.
     """
-
-    wlan_interfaces = get_wlan_interfaces()
-    
-    print(" WLAN Interface Selector")
-    drawline(linetype)
-    for count, (interface, mac_address) in enumerate(wlan_interfaces.items(), start=1):
-        if showmac:
-            oui = oui_lookup(mac_address)
-            print(f"{count}. {interface}  ({mac_address}) ({oui.strip()})")
-        else:
-            print(f"{count}.  {interface}")
-    print()
-
     max_attempts = 3
     attempt_count = 0
 
     while attempt_count < max_attempts:
-        choice = input("#️⃣  Enter WLAN interface by number ('q' to quit, 'r' to refresh): ").strip()
-        if choice.lower() == 'r':
-            wlan_interfaces = get_wlan_interfaces()
-            refresh = interface_selector(wlan_interfaces, showmac)
-            if refresh is None:
-                return None
-        elif choice.lower() == 'q':
-            print("Quitting WLAN Interface Selection.")
+        wlan_interfaces = get_wlan_interfaces()
+        if wlan_interfaces is None:
             return None
+        listing = _InterfaceList(wlan_interfaces, showmac, linetype)
+        try:
+            while attempt_count < max_attempts:
+                choice = listing.input("#️⃣  Enter WLAN interface by number ('q' to quit, 'r' to refresh): ").strip()
+                if choice.lower() == 'r':
+                    break  # Re-enumerate and redraw
+                elif choice.lower() == 'q':
+                    print("Quitting WLAN Interface Selection.")
+                    return None
 
-        if choice.isdigit() and 1 <= int(choice) <= len(wlan_interfaces.keys()):
-            return [x for x in wlan_interfaces.keys()][int(choice) - 1]
-        else:
-            print("❌  Invalid. Enter a number from the list (1, 2, etc.).\n")
-            attempt_count += 1
+                if choice.isdigit() and 1 <= int(choice) <= len(wlan_interfaces):
+                    return list(wlan_interfaces)[int(choice) - 1]
+                else:
+                    listing.print("❌  Invalid. Enter a number from the list (1, 2, etc.).\n")
+                    attempt_count += 1
+        finally:
+            listing.close()
 
     print("Maximum attempts reached. Exiting.")
     return None
-
-
-
-
-
-
-
@@ -0,0 +1,106 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from dojoutils import ouilookup
+from dojoutils.bpffilter import (compile_prefix_filter, merge_prefixes, parse_prefix, vendor_filter,
+                                 _prefix_term)
+from dojoutils.ouilookup import OUIDatabase
+
+FIXTURES = Path(__file__).parent / "fixtures" / "oui"
+NEVER = "wlan[0] & 0 = 1"
+
+
+@pytest.fixture
+def database(tmp_path):
+    for name in ("oui.txt", "mam.txt", "oui36.txt"):
+        shutil.copy(FIXTURES / name, tmp_path / name)
+    return OUIDatabase([tmp_path / name for name in ("oui.txt", "mam.txt", "oui36.txt")])
+
+
+@pytest.mark.parametrize("text, prefix", [
+    ("00:C0:CA", (0x00C0CA, 24)),
+    ("00-c0-ca", (0x00C0CA, 24)),
+    ("70B3.D5A", (0x70B3D5A, 28)),
+    ("70:B3:D5:A9:F", (0x70B3D5A9F, 36)),
+    ("00:C0:C8/22", (0x00C0C8 >> 2, 22)),
+    ("00:C0:CA/24", (0x00C0CA, 24)),
+    ("00:C0:CA:12:34:56/48", (0x00C0CA123456, 48)),
+])
+def test_parse_prefix(text, prefix):
+    assert parse_prefix(text) == prefix
+
+
+@pytest.mark.parametrize("text", ["", "zz:zz", "00:C0:CA/25", "00:C0:CA/0", "00:C0:CA/x", "/8", "00:C0:CA:12:34:56:7"])
+def test_parse_prefix_rejects(text):
+    with pytest.raises(ValueError):
+        parse_prefix(text)
+
+
+def test_merge_drops_covered_prefixes():
+    assert merge_prefixes(["00:C0:CA", "00:C0:CA:5", "00:C0:CA:12:3"]) == [(0x00C0CA, 24)]
+
+
+def test_merge_siblings():
+    assert merge_prefixes([(0x00C0CA, 24), (0x00C0CB, 24)]) == [(0x00C0CA >> 1, 23)]
+
+
+def test_merge_siblings_repeatedly():
+    assert merge_prefixes(["00:C0:C8", "00:C0:C9", "00:C0:CA", "00:C0:CB"]) == [(0x00C0C8 >> 2, 22)]
+    # 28-bit halves merge into their 24-bit parent, which then merges with its sibling
+    halves = [(0x00C0CA0 | n, 28) for n in range(16)]
+    assert merge_prefixes(halves + [(0x00C0CB, 24)]) == [(0x00C0CA >> 1, 23)]
+
+
+def test_merge_keeps_unrelated_prefixes_in_address_order():
+    assert merge_prefixes(["B8:D8:12", "00:C0:CA", "00:C0:CC", "70:B3:D5:A9:F"]) == [
+        (0x00C0CA, 24), (0x00C0CC, 24), (0x70B3D5A9F, 36), (0xB8D812, 24)]
+
+
+def test_merge_rejects_out_of_range():
+    with pytest.raises(ValueError):
+        merge_prefixes([(0x1FF, 8)])
+    with pytest.raises(ValueError):
+        merge_prefixes([(0, 49)])
+
+
+@pytest.mark.parametrize("prefix, term", [
+    ((0x00C0CA, 24), "wlan[10:4] & 0xffffff00 = 0x00c0ca00"),
+    ((0x70B3D5A, 28), "wlan[10:4] & 0xfffffff0 = 0x70b3d5a0"),
+    ((0x00C0CA12, 32), "wlan[10:4] = 0x00c0ca12"),
+    ((0x70B3D5A9F, 36), "(wlan[10:4] = 0x70b3d5a9 and wlan[14] & 0xf0 = 0xf0)"),
+    ((0x70B3D5A9F1, 40), "(wlan[10:4] = 0x70b3d5a9 and wlan[14] = 0xf1)"),
+    ((0x70B3D5A9F12, 44), "(wlan[10:4] = 0x70b3d5a9 and wlan[14:2] & 0xfff0 = 0xf120)"),
+])
+def test_prefix_term(prefix, term):
+    assert _prefix_term(10, *prefix) == term
+
+
+def test_fields():
+    assert compile_prefix_filter(["00:C0:CA"], fields=("addr1", "addr3")) == (
+        "wlan[4:4] & 0xffffff00 = 0x00c0ca00 or wlan[16:4] & 0xffffff00 = 0x00c0ca00")
+    assert compile_prefix_filter(["00:C0:CA", "B8:D8:12"], fields=("addr2", "addr1")) == (
+        "wlan[10:4] & 0xffffff00 = 0x00c0ca00 or wlan[10:4] & 0xffffff00 = 0xb8d81200"
+        " or wlan[4:4] & 0xffffff00 = 0x00c0ca00 or wlan[4:4] & 0xffffff00 = 0xb8d81200")
+    with pytest.raises(KeyError):
+        compile_prefix_filter(["00:C0:CA"], fields=("addr4",))
+
+
+def test_empty_set_never_matches():
+    assert compile_prefix_filter([]) == NEVER
+    assert compile_prefix_filter([], fields=("addr1", "addr2", "addr3")) == NEVER
+
+
+def test_vendor_filter(database):
+    assert vendor_filter("alfa", database=database) == "wlan[10:4] & 0xffffff00 = 0x00c0ca00"
+    assert vendor_filter("Tiny Sensors", database=database) == (
+        "(wlan[10:4] = 0x70b3d5a9 and wlan[14] & 0xf0 = 0xf0)")
+    assert vendor_filter("^IEEE", regex=True, database=database) == (
+        "wlan[10:4] & 0xffffff00 = 0x70b3d500 or wlan[10:4] & 0xffffff00 = 0xb8d81200")
+    assert vendor_filter("no such vendor", database=database) == NEVER
+
+
+def test_vendor_filter_default_database(database, monkeypatch):
+    monkeypatch.setattr(ouilookup, "_database", database)
+    assert vendor_filter("alfa", fields=("addr3",)) == "wlan[16:4] & 0xffffff00 = 0x00c0ca00"
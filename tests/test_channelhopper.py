@@ -0,0 +1,151 @@
+import errno
+import random
+import threading
+import time
+
+import pytest
+
+from dojoutils import channelhopper
+from dojoutils.channelhopper import ChannelFeed, ChannelFeedReader
+from dojoutils.channelswitch import ChannelSwitchError, MockBackend
+
+
+@pytest.fixture
+def feed():
+    feed = ChannelFeed()
+    yield feed
+    feed.close()
+
+
+def test_feed_round_trip(feed):
+    reader = ChannelFeedReader(feed.name)
+    assert reader.read() == (0, 0, 0.0, 0)
+    feed.publish(6, timestamp=100.0)
+    feed.publish(1, timestamp=101.0, band="6GHz")
+    assert reader.read() == (1, 5955, 101.0, 2)
+    reader.close()
+
+
+def test_failed_publish_leaves_feed_readable(feed):
+    reader = ChannelFeedReader(feed.name)
+    feed.publish(11, timestamp=1.0)
+    with pytest.raises(ValueError):
+        feed.publish("x")
+    assert reader.read() == (11, 2462, 1.0, 1)
+    feed.publish(36, timestamp=2.0)
+    assert reader.read() == (36, 5180, 2.0, 2)
+    reader.close()
+
+
+def test_read_gives_up_on_stalled_writer(feed, monkeypatch):
+    monkeypatch.setattr(channelhopper, "FEED_READ_TIMEOUT", 0.01)
+    reader = ChannelFeedReader(feed.name)
+    channelhopper._FEED_SEQ.pack_into(feed._buf, 0, 1)  # Writer died mid-update
+    with pytest.raises(TimeoutError):
+        reader.read()
+    reader.close()
+
+
+def test_partition_narrowed_to_usable_channels(monkeypatch):
+    # wlan1's phy has channel 11 disabled
+    monkeypatch.setattr(channelhopper, "usable_channels",
+                        lambda iface, channels: [c for c in channels if iface != "wlan1" or c.number != 11])
+    partition = channelhopper.partition_channels({"wlan0": None, "wlan1": None}, ["1", "6", "11"])
+    assert sorted(c.number for assigned in partition.values() for c in assigned) == [1, 6, 11]
+    assert 11 not in [c.number for c in partition["wlan1"]]
+
+
+def test_coordinated_hopper_drops_rejected_channel(monkeypatch):
+    monkeypatch.setattr(channelhopper, "usable_channels", lambda iface, channels: None)
+    backend = MockBackend(fail_channels=["11"])
+    stop = threading.Event()
+    thread = threading.Thread(target=channelhopper.coordinated_hopper,
+                              args=({"wlan0": None, "wlan1": None},),
+                              kwargs=dict(dwell=0.001, channels=["1", "6", "11", "36"], stop_event=stop,
+                                          backend=backend))
+    thread.start()
+    time.sleep(0.2)
+    assert thread.is_alive()
+    stop.set()
+    thread.join()
+    assert len(backend.switches) > 50
+    assert {channel for _, _, channel, _ in backend.switches} == {"1", "6", "36"}
+
+
+class FlakyBackend(MockBackend):
+    """Fails every third switch with the given errno."""
+
+    def __init__(self, error):
+        super().__init__()
+        self.error = error
+        self.calls = 0
+
+    def set_channel(self, iface, channel, band=None):
+        self.calls += 1
+        if self.calls % 3 == 1:
+            raise ChannelSwitchError("busy", self.error)
+        super().set_channel(iface, channel, band)
+
+
+def test_hopper_keeps_channels_on_transient_errors(monkeypatch):
+    monkeypatch.setattr(channelhopper, "_resolve_channels",
+                        lambda channels, adapter, iface=None: [channelhopper.make_channel(c) for c in channels])
+    backend = FlakyBackend(errno.EBUSY)
+    stop = threading.Event()
+    thread = threading.Thread(target=channelhopper.hopper, args=("wlan0",),
+                              kwargs=dict(dwell=0.001, channels=["1", "6"], mode="sequential",
+                                          stop_event=stop, backend=backend))
+    thread.start()
+    time.sleep(0.2)
+    assert thread.is_alive()
+    stop.set()
+    thread.join()
+    assert {channel for _, _, channel, _ in backend.switches} == {"1", "6"}
+
+
+def test_hopper_stops_when_interface_is_gone(monkeypatch):
+    monkeypatch.setattr(channelhopper, "_resolve_channels",
+                        lambda channels, adapter, iface=None: [channelhopper.make_channel(c) for c in channels])
+    backend = FlakyBackend(errno.ENODEV)
+    channelhopper.hopper("wlan0", dwell=0.001, channels=["1", "6"], backend=backend)
+    assert backend.calls == 1
+
+
+def test_activity_keeps_bands_apart():
+    two = channelhopper.make_channel(1)
+    six = channelhopper.make_channel(1, "6GHz")
+    activity = channelhopper.ChannelActivity()
+    activity.record(2412, count=100)          # Radiotap frequency
+    activity.record(("2.4GHz", 1), count=10)
+    activity.record(1)                        # Bare number: 2.4GHz
+    activity.update()
+    assert activity.scores == {2412: pytest.approx(111, rel=1e-3)}
+    assert activity.dwell_for(six, 0.1, [two, six]) < activity.dwell_for(two, 0.1, [two, six])
+
+    activity.record(1, band="6GHz", count=5)
+    activity.update()
+    assert activity.scores[5955] == pytest.approx(5, rel=1e-3)
+
+
+def test_decayed_activity_falls_back_to_uniform():
+    random.seed(1234)
+    channels = [channelhopper.make_channel(number) for number in list(range(1, 14)) + list(range(36, 166, 4))]
+    busy = channels[5]
+    activity = channelhopper.ChannelActivity(half_life=1.0)
+
+    activity.scores = {busy.frequency: 1000.0}
+    assert sum(activity.choose(channels) == busy for _ in range(2000)) > 1000
+
+    activity.scores = {busy.frequency: 1000.0 * 0.5 ** 60}  # 60 half-lives later
+    picks = sum(activity.choose(channels) == busy for _ in range(20000))
+    assert picks < 3 * 20000 / len(channels)
+
+
+def test_mock_backend_fails_by_band():
+    backend = MockBackend(fail_channels=[("6GHz", 1)])
+    backend.set_channel("wlan0", 1)
+    with pytest.raises(ChannelSwitchError) as excinfo:
+        backend.set_channel("wlan0", 1, "6GHz")
+    assert excinfo.value.rejected
+    with pytest.raises(ChannelSwitchError):
+        backend.set_frequency("wlan0", 5955)
@@ -0,0 +1,51 @@
+import os
+from pathlib import Path
+
+from dojoutils.dpkgstatus import DpkgStatus, PackageStatus, parse_dpkg_status
+
+FIXTURE = Path(__file__).parent / "fixtures" / "dpkg" / "status"
+
+
+def test_parse_dpkg_status():
+    packages = parse_dpkg_status(FIXTURE.read_text())
+    assert packages["iw"] == PackageStatus("iw", "5.19-1", "amd64", "install ok installed", True)
+    assert packages["iw:amd64"] is packages["iw"]
+
+
+def test_not_installed_states():
+    packages = parse_dpkg_status(FIXTURE.read_text())
+    assert packages["wireless-tools"].status == "deinstall ok config-files"
+    assert not packages["wireless-tools"].installed
+    assert not packages["aircrack-ng"].installed  # half-installed
+    assert packages["aircrack-ng"].version == "1:1.7-5"
+
+
+def test_multi_arch_package():
+    packages = parse_dpkg_status(FIXTURE.read_text())
+    assert packages["libssl3"].architecture == "i386"  # First stanza seen
+    assert packages["libssl3:amd64"].architecture == "amd64"
+    assert packages["libssl3:i386"].installed
+
+
+def test_continuation_lines_are_not_fields():
+    assert parse_dpkg_status(FIXTURE.read_text())["iw"].status == "install ok installed"
+
+
+def test_dpkg_status_index(tmp_path):
+    path = tmp_path / "status"
+    path.write_text(FIXTURE.read_text())
+    index = DpkgStatus(str(path))
+    assert index.is_installed(["iw", "wireless-tools", "missing"]) == {
+        "iw": True, "wireless-tools": False, "missing": False}
+    assert index.versions("iw") == "5.19-1"
+    assert index.versions("wireless-tools") is None
+
+    # A changed file (new size and mtime) is re-parsed
+    path.write_text("Package: iw\nStatus: install ok installed\nVersion: 6.9-1\n")
+    os.utime(path, ns=(0, 1))
+    assert index.versions("iw") == "6.9-1"
+    assert index.get("wireless-tools") is None
+
+
+def test_missing_status_file(tmp_path):
+    assert DpkgStatus(str(tmp_path / "status")).packages == {}
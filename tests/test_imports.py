@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules the light paths of the package must not pull in (user-facing
+# scripts pay for every one of them at startup)
+HEAVY = {"requests", "numpy", "asyncio", "subprocess"}
+
+
+def imported_modules(code):
+    """
+    Return the modules imported while running `code` in a fresh
+    interpreter, as reported by `python -X importtime`.
+    """
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, env=env, check=True)
+    lines = [line for line in result.stderr.splitlines() if line.startswith("import time:")]
+    return {line.rpartition("|")[2].strip() for line in lines[1:]}
+
+
+@pytest.fixture(scope="module")
+def baseline():
+    # Whatever site/sitecustomize imports is not the package's doing
+    return imported_modules("pass")
+
+
+@pytest.mark.parametrize("code", [
+    "import dojoutils",
+    "import dojoutils; dojoutils.format_mac_address",
+    "import dojoutils; dojoutils.MAC",
+    "import dojoutils; dojoutils.drawline",
+])
+def test_light_imports_stay_light(code, baseline):
+    added = imported_modules(code) - baseline
+    heavy = {module for module in added if module.partition(".")[0] in HEAVY}
+    assert not heavy, f"{code!r} imports {sorted(heavy)}"
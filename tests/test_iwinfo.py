@@ -0,0 +1,56 @@
+from pathlib import Path
+
+from dojoutils.iwinfo import IwInterface, PhyChannel, parse_iw_dev, parse_iw_phy, parse_iw_reg
+
+FIXTURES = Path(__file__).parent / "fixtures" / "iw"
+
+
+def read_fixture(name):
+    return (FIXTURES / name).read_text()
+
+
+def test_parse_iw_dev():
+    interfaces = parse_iw_dev(read_fixture("dev.txt"))
+    assert list(interfaces) == ["wlan1mon", "wlan0", "wlan2"]  # P2P-device skipped
+    assert interfaces["wlan1mon"] == IwInterface(
+        name="wlan1mon", phy="phy1", ifindex=5, wdev=0x100000001, type="monitor",
+        mac="00:c0:ca:32:bd:25", ssid=None, channel=36, frequency=5180, width=20,
+        center1=5180, txpower=20.0,
+    )
+    assert interfaces["wlan0"] == IwInterface(
+        name="wlan0", phy="phy0", ifindex=3, wdev=1, type="managed",
+        mac="dc:a6:32:01:02:03", ssid="dojo-lab", channel=6, frequency=2437, width=40,
+        center1=2447, txpower=31.0,
+    )
+
+
+def test_parse_iw_dev_down_interface_has_no_channel():
+    wlan2 = parse_iw_dev(read_fixture("dev.txt"))["wlan2"]
+    assert (wlan2.phy, wlan2.ifindex, wlan2.type) == ("phy0", 7, "managed")
+    assert wlan2.channel is wlan2.frequency is wlan2.width is wlan2.txpower is None
+
+
+def test_parse_iw_dev_empty():
+    assert parse_iw_dev("") == {}
+
+
+def test_parse_iw_phy():
+    phys = parse_iw_phy(read_fixture("phy.txt"))
+    assert list(phys) == ["phy0", "phy1"]
+    assert [channel.channel for channel in phys["phy0"]] == [1, 6, 12, 14, 36, 52, 144]
+    assert phys["phy0"][0] == PhyChannel(2412, 1, "2.4GHz", False, False, False, 20.0)
+    assert phys["phy0"][2] == PhyChannel(2467, 12, "2.4GHz", False, True, False, 20.0)
+    assert phys["phy0"][3] == PhyChannel(2484, 14, "2.4GHz", True, False, False, None)
+    assert phys["phy0"][5] == PhyChannel(5260, 52, "5GHz", False, True, True, 20.0)
+    assert phys["phy1"] == [
+        PhyChannel(2412, 1, "2.4GHz", False, False, False, 30.0),
+        PhyChannel(5955, 1, "6GHz", False, True, False, 12.0),
+    ]
+
+
+def test_parse_iw_reg():
+    assert parse_iw_reg(read_fixture("reg.txt")) == {"global": "US", "phy1": "DE"}
+
+
+def test_parse_iw_reg_global_only():
+    assert parse_iw_reg("global\ncountry 00: DFS-UNSET\n\t(2402 - 2472 @ 40), (6, 20), (N/A)\n") == {"global": "00"}
@@ -0,0 +1,128 @@
+from subprocess import CompletedProcess
+
+import pytest
+
+from dojoutils import linuxcommands
+from dojoutils.linuxcommands import LinkTransaction, _failed_operations
+
+
+def fleet():
+    return (LinkTransaction()
+            .link_down("wlan0").link_down("wlan1")
+            .set_mode("wlan0", "monitor").set_mode("wlan1", "monitor")
+            .set_mac("wlan0", "00:11:22:33:44:55").link_up("wlan0").link_up("wlan1"))
+
+
+def test_commands_group_ip_runs_and_split_iw():
+    commands = fleet().commands()
+    assert [argv for argv, _, _ in commands] == [
+        ["ip", "-force", "-batch", "-"],
+        ["iw", "dev", "wlan0", "set", "type", "monitor"],
+        ["iw", "dev", "wlan1", "set", "type", "monitor"],
+        ["ip", "-force", "-batch", "-"],
+    ]
+    assert [len(ops) for _, _, ops in commands] == [2, 1, 1, 3]
+    assert [stdin for _, stdin, _ in commands] == [
+        "link set dev wlan0 down\nlink set dev wlan1 down\n",
+        None,
+        None,
+        "link set dev wlan0 address 00:11:22:33:44:55\nlink set dev wlan0 up\nlink set dev wlan1 up\n",
+    ]
+
+
+def test_commands_without_force():
+    transaction = LinkTransaction(force=False).link_down("wlan0").add_route("10.0.0.0", "10.0.0.1", "255.0.0.0", "eth0")
+    (argv, stdin, ops), = transaction.commands()
+    assert argv == ["ip", "-batch", "-"]
+    assert stdin == "link set dev wlan0 down\nroute add 10.0.0.0 via 10.0.0.1 netmask 255.0.0.0 dev eth0\n"
+    assert ops == transaction.operations
+
+
+def test_commands_empty():
+    assert LinkTransaction().commands() == []
+    assert len(fleet()) == 7
+
+
+def test_failed_operations_maps_line_numbers():
+    ops = ["ip link set dev wlan0 down", "ip link set dev wlan9 down", "ip link set dev wlan1 down"]
+    stderr = 'Cannot find device "wlan9"\nCommand failed -:2\n'
+    assert _failed_operations(ops, CompletedProcess([], 1, "", stderr)) == [
+        (1, "ip link set dev wlan9 down", 'Cannot find device "wlan9"')]
+
+
+def test_failed_operations_without_line_numbers():
+    ops = ["ip link set dev wlan0 down", "ip link set dev wlan1 down"]
+    result = CompletedProcess([], 255, "", "Option \"-batch\" is unknown\n")
+    assert _failed_operations(ops, result) == [(0, ops[0], 'Option "-batch" is unknown'),
+                                               (1, ops[1], 'Option "-batch" is unknown')]
+    assert _failed_operations(ops, CompletedProcess([], 0, "", "")) == []
+
+
+@pytest.fixture
+def fake_run(monkeypatch):
+    """
+    Replaces subprocess.run: ip batches fail on their `fail_line`, iw
+    commands listed in `fail_iw` exit with status 1.
+    """
+    calls = []
+
+    def run(argv, input=None, **kwargs):
+        calls.append((argv, input))
+        if argv[0] == "ip" and fake_run.fail_line:
+            return CompletedProcess(argv, 1, "", f"RTNETLINK answers: busy\nCommand failed -:{fake_run.fail_line}\n")
+        if argv[0] == "iw" and argv in fake_run.fail_iw:
+            return CompletedProcess(argv, 1, "", "command failed: Device or resource busy (-16)\n")
+        return CompletedProcess(argv, 0, "", "")
+
+    fake_run.calls, fake_run.fail_line, fake_run.fail_iw = calls, None, []
+    monkeypatch.setattr(linuxcommands, "run", run)
+    return fake_run
+
+
+def test_apply_success(fake_run):
+    assert fleet().apply() == []
+    assert len(fake_run.calls) == 4
+
+
+def test_force_keeps_going(fake_run):
+    fake_run.fail_iw = [["iw", "dev", "wlan0", "set", "type", "monitor"]]
+    assert fleet().apply() == [("iw dev wlan0 set type monitor", "command failed: Device or resource busy (-16)")]
+    assert len(fake_run.calls) == 4
+
+
+def test_no_force_reports_not_run(fake_run):
+    fake_run.fail_iw = [["iw", "dev", "wlan0", "set", "type", "monitor"]]
+    transaction = fleet()
+    transaction.force = False
+    assert transaction.apply() == [
+        ("iw dev wlan0 set type monitor", "command failed: Device or resource busy (-16)"),
+        ("iw dev wlan1 set type monitor", "not run"),
+        ("ip link set dev wlan0 address 00:11:22:33:44:55", "not run"),
+        ("ip link set dev wlan0 up", "not run"),
+        ("ip link set dev wlan1 up", "not run"),
+    ]
+    assert len(fake_run.calls) == 2
+
+
+def test_no_force_with_repeated_command(fake_run):
+    # The failing line is the second "down", not the first
+    transaction = (LinkTransaction(force=False)
+                   .link_down("wlan0").link_up("wlan0").link_down("wlan0").link_up("wlan1"))
+    fake_run.fail_line = 3
+    assert transaction.apply() == [
+        ("ip link set dev wlan0 down", "RTNETLINK answers: busy"),
+        ("ip link set dev wlan1 up", "not run"),
+    ]
+
+
+def test_missing_executable(monkeypatch):
+    def run(argv, **kwargs):
+        raise FileNotFoundError(argv[0])
+
+    monkeypatch.setattr(linuxcommands, "run", run)
+    transaction = LinkTransaction(force=False).link_down("wlan0").link_up("wlan0").set_mode("wlan0", "monitor")
+    assert transaction.apply() == [
+        ("ip link set dev wlan0 down", "ip is not installed"),
+        ("ip link set dev wlan0 up", "ip is not installed"),
+        ("iw dev wlan0 set type monitor", "not run"),
+    ]
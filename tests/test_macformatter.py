@@ -0,0 +1,44 @@
+import pytest
+
+from dojoutils.macformatter import MAC, format_mac_address, mac_values, normalize_macs
+
+
+def test_normalize_formats():
+    macs = ["00:C0:CA:32:BD:25", "00c0.ca32.bd26", "00-c0-ca-32-bd-27", 0x00C0CA32BD28, b"\x00\xc0\xca\x32\xbd\x29"]
+    assert normalize_macs(macs) == [f"00:c0:ca:32:bd:{n}" for n in range(25, 30)]
+    assert normalize_macs(macs[:1], case="upper", sep="") == ["00C0CA32BD25"]
+    assert normalize_macs(macs[:1], sep="::") == ["00::c0::ca::32::bd::25"]
+    assert normalize_macs([]) == []
+
+
+@pytest.mark.parametrize("bad", [
+    "00c0ca32bd\t5",       # bytes.fromhex would skip the tab
+    "123456789ab\t",
+    "00c0ca32bd2",
+    "00c0ca32bd255",
+    "00c0ca32bdzz",
+    "00c0ca32\nbd25",
+])
+def test_normalize_rejects_malformed(bad):
+    with pytest.raises(ValueError, match="Invalid MAC address"):
+        normalize_macs(["00c0ca32bd25", bad])
+
+
+def test_mac_values_round_trip():
+    values = mac_values(["00:c0:ca:32:bd:25", "ff:ff:ff:ff:ff:ff"])
+    assert [int(value) for value in values] == [0x00C0CA32BD25, 0xFFFFFFFFFFFF]
+    assert normalize_macs(values) == ["00:c0:ca:32:bd:25", "ff:ff:ff:ff:ff:ff"]
+
+
+def test_mac_type():
+    mac = MAC("00c0.ca32.bd25")
+    assert str(mac) == "00:c0:ca:32:bd:25"
+    assert mac.oui == 0x00C0CA
+    assert mac == MAC(0x00C0CA32BD25)
+    with pytest.raises(ValueError):
+        MAC("00c0ca32bd2")
+
+
+def test_format_mac_address_is_lenient():
+    assert format_mac_address("00c0.ca32.bd25", case="upper", sep="-") == "00-C0-CA-32-BD-25"
+    assert format_mac_address("00c0ca", sep=None) == "00c0ca"
@@ -0,0 +1,155 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from dojoutils import ouilookup
+
+REGISTRY = b"".join(b"%06X     (base 16)\t\tVendor %d\n" % (i, i) for i in range(2000))
+
+
+class RegistryHandler(BaseHTTPRequestHandler):
+    """
+    Serves server.body with an ETag, honouring If-None-Match, Range and
+    If-Range like the IEEE's server.  server.truncate cuts the next
+    response short after that many bytes.
+    """
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        body, etag = server.body, server.etag
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        start = 0
+        byte_range = self.headers.get("Range")
+        if byte_range and self.headers.get("If-Range") in (None, etag):
+            start = int(byte_range.partition("=")[2].rstrip("-"))
+            if start >= len(body):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(body)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+        else:
+            self.send_response(200)
+        payload = body[start:]
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if server.truncate is not None:
+            payload, server.truncate = payload[:server.truncate], None
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), RegistryHandler)
+    httpd.body, httpd.etag, httpd.truncate, httpd.requests = REGISTRY, '"v1"', None, []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def oui_file(server, tmp_path, monkeypatch):
+    path = tmp_path / "oui.txt"
+    monkeypatch.setattr(ouilookup, "OUI_FILE", str(path))
+    monkeypatch.setattr(ouilookup, "OUI_URL", f"http://127.0.0.1:{server.server_port}/oui.txt")
+    monkeypatch.setattr(ouilookup, "_database", None)
+    return path
+
+
+def part(path):
+    return path.with_name(path.name + ouilookup.OUI_PART_SUFFIX)
+
+
+def test_download_then_not_modified(server, oui_file):
+    assert ouilookup.refresh_registry() is True
+    assert oui_file.read_bytes() == REGISTRY
+    assert not part(oui_file).exists()
+
+    assert ouilookup.refresh_registry() is False
+    assert server.requests[-1]["If-None-Match"] == '"v1"'
+
+
+def test_short_body_raises_and_keeps_old_file(server, oui_file):
+    oui_file.write_bytes(b"old registry\n")
+    server.truncate = 20000
+    with pytest.raises(requests.RequestException):
+        ouilookup.refresh_registry()
+    assert oui_file.read_bytes() == b"old registry\n"  # Only complete downloads are renamed into place
+    assert 0 < part(oui_file).stat().st_size <= 20000
+
+
+def test_resume_with_range(server, oui_file):
+    server.truncate = 20000
+    with pytest.raises(requests.RequestException):
+        ouilookup.refresh_registry()
+    offset = part(oui_file).stat().st_size
+
+    assert ouilookup.refresh_registry() is True
+    assert server.requests[-1]["Range"] == f"bytes={offset}-"
+    assert server.requests[-1]["If-Range"] == '"v1"'
+    assert oui_file.read_bytes() == REGISTRY
+    assert not part(oui_file).exists()
+
+
+def test_changed_registry_restarts_download(server, oui_file):
+    server.truncate = 20000
+    with pytest.raises(requests.RequestException):
+        ouilookup.refresh_registry()
+
+    server.body, server.etag = REGISTRY.replace(b"Vendor", b"Maker"), '"v2"'
+    assert ouilookup.refresh_registry() is True
+    assert server.requests[-1]["If-Range"] == '"v1"'  # Mismatch: the server sent a 200
+    assert oui_file.read_bytes() == server.body
+    assert ouilookup._read_meta(str(oui_file))["etag"] == '"v2"'
+
+
+def test_complete_part_file_is_finished(server, oui_file):
+    # Interrupted after the last write but before the rename
+    server.truncate = 20000
+    with pytest.raises(requests.RequestException):
+        ouilookup.refresh_registry()
+    part(oui_file).write_bytes(REGISTRY)
+
+    assert ouilookup.download_oui_file(log=lambda message: None)
+    assert server.requests[-1]["Range"] == f"bytes={len(REGISTRY)}-"
+    assert oui_file.read_bytes() == REGISTRY
+    assert not part(oui_file).exists()
+    assert ouilookup.refresh_registry() is False
+
+
+def test_oversized_part_file_is_discarded(server, oui_file):
+    server.truncate = 20000
+    with pytest.raises(requests.RequestException):
+        ouilookup.refresh_registry()
+    part(oui_file).write_bytes(REGISTRY + b"garbage")
+
+    assert ouilookup.refresh_registry() is True
+    assert "Range" not in server.requests[-1]
+    assert oui_file.read_bytes() == REGISTRY
+
+
+def test_concurrent_refreshes_are_serialised(server, oui_file):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(ouilookup.refresh_registry())) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    # One download; the others ran after it and got 304s
+    assert sorted(results) == [False, False, False, True]
+    assert oui_file.read_bytes() == REGISTRY
@@ -0,0 +1,121 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from dojoutils import ouilookup
+from dojoutils.ouilookup import OUIDatabase
+
+FIXTURES = Path(__file__).parent / "fixtures" / "oui"
+REGISTRIES = ["oui.txt", "mam.txt", "oui36.txt"]
+
+
+@pytest.fixture
+def registry_dir(tmp_path):
+    # The index cache is written next to the first registry, so work on copies
+    for name in REGISTRIES:
+        shutil.copy(FIXTURES / name, tmp_path / name)
+    return tmp_path
+
+
+@pytest.fixture
+def database(registry_dir):
+    return OUIDatabase([registry_dir / name for name in REGISTRIES])
+
+
+@pytest.mark.parametrize("mac, vendor", [
+    ("00:c0:ca:12:34:56", "ALFA, INC."),                   # MA-L
+    ("70-B3-D5-A1-00-00", "Block Owner Ltd"),              # MA-M inside 70:B3:D5
+    ("70b3.d5a9.f123", "Tiny Sensors GmbH"),               # MA-S inside that MA-M block
+    ("70:b3:d5:a9:e0:00", "Block Owner Ltd"),              # Just outside the MA-S block
+    ("70:b3:d5:00:00:01", "IEEE Registration Authority"),  # Outside every block
+    ("b8:d8:12:6f:ff:ff", "Glamo Inc."),
+    ("b8:d8:12:70:00:00", "IEEE Registration Authority"),
+])
+def test_longest_prefix_wins(database, mac, vendor):
+    assert database.lookup(mac) == vendor
+
+
+def test_unknown_prefix(database):
+    assert database.lookup("02:00:00:00:00:01") is None
+    assert "02:00:00:00:00:01" not in database
+
+
+def test_entry_counts(database):
+    assert {bits: len(table) for bits, table in database._tables.items()} == {24: 3, 28: 2, 36: 1}
+
+
+def test_cached_index_matches_parsed(database, registry_dir):
+    assert (registry_dir / "oui.txt.idx").is_file()
+    reloaded = OUIDatabase(database.paths)
+    assert reloaded._tables == database._tables
+    assert reloaded.lookup("70:b3:d5:a9:f1:23") == "Tiny Sensors GmbH"
+
+
+def test_corrupt_cache_is_rebuilt(database, registry_dir):
+    (registry_dir / "oui.txt.idx").write_bytes(b"\x80\x04not json")
+    assert OUIDatabase(database.paths).lookup("00:c0:ca:00:00:00") == "ALFA, INC."
+
+
+def test_vendor_prefixes(database):
+    assert database.vendor_prefixes("tiny sensors") == [(0x70B3D5A9F, 36)]
+    assert database.vendor_prefixes("^IEEE", regex=True) == [(0x70B3D5, 24), (0xB8D812, 24)]
+
+
+def test_default_database_never_fetches_extra_registries(tmp_path, monkeypatch):
+    shutil.copy(FIXTURES / "oui.txt", tmp_path / "oui.txt")
+    fetched = []
+
+    def fake_download(registry="MA-L", log=print):
+        fetched.append(registry)
+        return False
+
+    monkeypatch.setattr(ouilookup, "download_oui_file", fake_download)
+    monkeypatch.setattr(ouilookup, "OUI_FILE", str(tmp_path / "oui.txt"))
+    monkeypatch.setattr(ouilookup, "_database", None)
+    assert ouilookup.oui_lookup("70:b3:d5:a9:f1:23") == "IEEE Registration Authority"
+    assert fetched == []
+
+    # Registries fetched beforehand are picked up
+    shutil.copy(FIXTURES / "mam.txt", tmp_path / "mam.txt")
+    shutil.copy(FIXTURES / "oui36.txt", tmp_path / "oui36.txt")
+    monkeypatch.setattr(ouilookup, "_database", None)
+    assert ouilookup.oui_lookup("70:b3:d5:a9:f1:23") == "Tiny Sensors GmbH"
+    assert fetched == []
+
+
+def test_legacy_oui_file_in_working_directory(tmp_path, monkeypatch):
+    shutil.copy(FIXTURES / "oui.txt", tmp_path / "oui.txt")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("DOJOUTILS_OUI_DIR", raising=False)
+    monkeypatch.setattr(ouilookup, "OUI_DIR", str(tmp_path / "cache"))
+    assert ouilookup._default_oui_file() == str(tmp_path / "oui.txt")
+
+    # A copy in the cache directory takes precedence
+    (tmp_path / "cache").mkdir()
+    shutil.copy(FIXTURES / "oui.txt", tmp_path / "cache" / "oui.txt")
+    assert ouilookup._default_oui_file() == str(tmp_path / "cache" / "oui.txt")
+
+
+def test_configured_directory_ignores_working_directory(tmp_path, monkeypatch):
+    shutil.copy(FIXTURES / "oui.txt", tmp_path / "oui.txt")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("DOJOUTILS_OUI_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(ouilookup, "OUI_DIR", str(tmp_path / "cache"))
+    assert ouilookup._default_oui_file() == str(tmp_path / "cache" / "oui.txt")
+
+
+def test_cli_keeps_messages_out_of_the_records(tmp_path, monkeypatch, capsys):
+    def fake_download(registry="MA-L", log=print):
+        log(f"Downloading {registry}")
+        shutil.copy(FIXTURES / "oui.txt", ouilookup.registry_path(registry))
+        return True
+
+    (tmp_path / "macs.txt").write_text("00:c0:ca:12:34:56\n")
+    monkeypatch.setattr(ouilookup, "download_oui_file", fake_download)
+    monkeypatch.setattr(ouilookup, "OUI_FILE", str(tmp_path / "oui.txt"))
+    monkeypatch.setattr(ouilookup, "_database", None)
+    assert ouilookup.main([str(tmp_path / "macs.txt")]) == 0
+    out, err = capsys.readouterr()
+    assert out.splitlines() == ["mac,vendor", "00:c0:ca:12:34:56,\"ALFA, INC.\""]
+    assert err == "Downloading MA-L\n"
@@ -0,0 +1,42 @@
+from pathlib import Path
+
+from dojoutils.services import ServiceState, parse_action_errors, parse_systemctl_show
+
+FIXTURE = Path(__file__).parent / "fixtures" / "systemctl" / "show.txt"
+UNITS = ["ssh", "NetworkManager", "wpa_supplicant.service", "nosuch"]
+
+
+def test_parse_systemctl_show():
+    states = parse_systemctl_show(FIXTURE.read_text(), UNITS)
+    assert list(states) == UNITS
+    assert states["ssh"] == ServiceState("ssh", "ssh.service", "loaded", "active", "running", "enabled", 812, True)
+    assert states["NetworkManager"] == ServiceState(
+        "NetworkManager", "NetworkManager.service", "loaded", "inactive", "dead", "disabled", None, False)
+
+
+def test_reloading_counts_as_active():
+    state = parse_systemctl_show(FIXTURE.read_text(), UNITS)["wpa_supplicant.service"]
+    assert state.active and state.main_pid == 1420
+    assert state.unit_file_state is None
+
+
+def test_unknown_unit():
+    state = parse_systemctl_show(FIXTURE.read_text(), UNITS)["nosuch"]
+    assert state.load_state == "not-found"
+    assert not state.active and state.main_pid is None
+
+
+def test_blocks_matched_by_position():
+    # An alias keeps the name it was asked for; its Id is the real unit
+    states = parse_systemctl_show(FIXTURE.read_text(), ["sshd", "NetworkManager"])
+    assert list(states) == ["sshd", "NetworkManager"]
+    assert states["sshd"].id == "ssh.service"
+
+
+def test_parse_action_errors():
+    stderr = ("Failed to start nosuch.service: Unit nosuch.service not found.\n"
+              "Job for ssh.service failed because the control process exited with error code.\n")
+    assert parse_action_errors(stderr, ["ssh", "nosuch", "NetworkManager"]) == {
+        "nosuch": "Failed to start nosuch.service: Unit nosuch.service not found.",
+        "ssh": "Job for ssh.service failed because the control process exited with error code.",
+    }
@@ -0,0 +1,60 @@
+import sys
+import time
+
+from dojoutils.shellcommands import COMMAND_NOT_FOUND, run_commands, run_shell_cmd
+
+PYTHON = sys.executable
+
+
+def test_results_in_input_order():
+    results = run_commands([[PYTHON, "-c", "import time; time.sleep(0.3); print('slow')"],
+                            [PYTHON, "-c", "print('fast')"]])
+    assert [result.stdout for result in results] == ["slow\n", "fast\n"]
+    assert [result.returncode for result in results] == [0, 0]
+
+
+def test_stdout_and_stderr_are_captured():
+    result = run_commands([[PYTHON, "-c", "import sys; print('out'); print('err', file=sys.stderr); sys.exit(3)"]])[0]
+    assert (result.stdout, result.stderr, result.returncode, result.timed_out) == ("out\n", "err\n", 3, False)
+
+
+def test_streaming_callbacks():
+    seen = []
+    script = "import sys; print('one'); print('bad', file=sys.stderr); sys.stdout.write('two\\nthree')"
+    result = run_commands([[PYTHON, "-c", script]],
+                          on_stdout=lambda argv, line: seen.append(("out", line)),
+                          on_stderr=lambda argv, line: seen.append(("err", line)))[0]
+    assert [line for kind, line in seen if kind == "out"] == ["one", "two", "three"]  # Unterminated last line too
+    assert [line for kind, line in seen if kind == "err"] == ["bad"]
+    assert result.stdout == "one\ntwo\nthree"
+
+
+def test_timeout_kills_command():
+    started = time.monotonic()
+    result = run_commands([[PYTHON, "-c", "import time; time.sleep(10)"]], timeout=0.3)[0]
+    assert result.timed_out
+    assert result.returncode != 0
+    assert time.monotonic() - started < 5
+
+
+def test_timeout_after_pipes_are_closed():
+    started = time.monotonic()
+    result = run_commands([["sh", "-c", "exec >&- 2>&-; sleep 3"]], timeout=0.5)[0]
+    assert result.timed_out
+    assert time.monotonic() - started < 2
+
+
+def test_command_not_found():
+    result = run_commands([["dojoutils-no-such-command", "--help"]])[0]
+    assert result.returncode == COMMAND_NOT_FOUND == 127
+    assert result.stderr.startswith("dojoutils-no-such-command: ")
+    assert not result.timed_out
+
+
+def test_string_commands_and_run_shell_cmd():
+    assert run_commands(["echo 'a b'"])[0].stdout == "a b\n"
+    assert run_shell_cmd("echo hello") == ["hello\n", ""]
+
+
+def test_no_commands():
+    assert run_commands([]) == []
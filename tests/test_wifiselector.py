@@ -0,0 +1,144 @@
+import shutil
+import struct
+import threading
+from pathlib import Path
+
+import pytest
+
+from dojoutils import ouilookup, wifiselector
+from dojoutils.wifiselector import InterfaceInventory, RTM_DELLINK, RTM_NEWLINK
+
+
+OUI_FIXTURES = Path(__file__).parent / "fixtures" / "oui"
+
+
+def make_interface(root, name, ifindex, wireless=True):
+    path = root / name
+    path.mkdir()
+    (path / "ifindex").write_text(f"{ifindex}\n")
+    (path / "address").write_text("00:c0:ca:32:bd:25\n")
+    (path / "operstate").write_text("up\n")
+    if wireless:
+        (path / "wireless").mkdir()
+
+
+def link_message(msg_type, ifindex, name=None):
+    attrs = b""
+    if name is not None:
+        payload = name.encode() + b"\0"
+        attrs = struct.pack("=HH", 4 + len(payload), wifiselector.IFLA_IFNAME) + payload
+        attrs += b"\0" * (-len(attrs) % 4)
+    body = wifiselector._IFINFOMSG.pack(0, 1, ifindex, 0, 0) + attrs
+    return wifiselector._NLMSGHDR.pack(16 + len(body), msg_type, 0, 0, 0) + body
+
+
+class FakeSocket:
+    """Hands out queued netlink datagrams, like a non-blocking socket."""
+
+    def __init__(self):
+        self.queue = []
+
+    def recv(self, size):
+        if not self.queue:
+            raise BlockingIOError
+        return self.queue.pop(0)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def inventory(tmp_path):
+    make_interface(tmp_path, "wlan0", 3)
+    make_interface(tmp_path, "eth0", 2, wireless=False)
+    inventory = InterfaceInventory(str(tmp_path), use_netlink=False)
+    inventory._sock = FakeSocket()
+    return inventory
+
+
+def test_snapshot_reads_sysfs(inventory):
+    assert list(inventory.snapshot()) == ["wlan0"]
+    assert sorted(inventory.snapshot(wireless_only=False)) == ["eth0", "wlan0"]
+    assert inventory.snapshot()["wlan0"].ifindex == 3
+
+
+def test_mode_from_link_type(inventory, tmp_path):
+    (tmp_path / "wlan0" / "type").write_text("803\n")  # ARPHRD_IEEE80211_RADIOTAP
+    make_interface(tmp_path, "wlan1", 7)
+    (tmp_path / "wlan1" / "type").write_text("1\n")    # ARPHRD_ETHER: managed, AP, mesh, ...
+    inventory._sock.queue += [link_message(RTM_NEWLINK, 3, "wlan0"), link_message(RTM_NEWLINK, 7, "wlan1")]
+    snapshot = inventory.snapshot()
+    assert snapshot["wlan0"].mode == "monitor"
+    assert snapshot["wlan1"].mode is None
+
+
+def test_rename_replaces_old_name(inventory, tmp_path):
+    (tmp_path / "wlan0").rename(tmp_path / "wlan0mon")
+    inventory._sock.queue.append(link_message(RTM_NEWLINK, 3, "wlan0mon"))
+    assert list(inventory.snapshot()) == ["wlan0mon"]
+
+
+def test_add_and_remove(inventory, tmp_path):
+    make_interface(tmp_path, "wlan1", 7)
+    inventory._sock.queue.append(link_message(RTM_NEWLINK, 7, "wlan1"))
+    assert sorted(inventory.snapshot()) == ["wlan0", "wlan1"]
+    inventory._sock.queue.append(link_message(RTM_DELLINK, 3, "wlan0"))
+    assert list(inventory.snapshot()) == ["wlan1"]
+    inventory._sock.queue.append(link_message(RTM_DELLINK, 7))  # No IFLA_IFNAME
+    assert inventory.snapshot() == {}
+
+
+def test_vendor_lookup_failures_are_not_cached(tmp_path, monkeypatch):
+    available = False
+
+    def fake_download(registry="MA-L", log=print):
+        log(f"Downloading {registry}")
+        if available and registry == "MA-L":
+            shutil.copy(OUI_FIXTURES / "oui.txt", ouilookup.registry_path(registry))
+            return True
+        return False
+
+    monkeypatch.setattr(ouilookup, "download_oui_file", fake_download)
+    monkeypatch.setattr(ouilookup, "OUI_FILE", str(tmp_path / "oui.txt"))
+    monkeypatch.setattr(ouilookup, "_database", None)
+    monkeypatch.setattr(wifiselector, "_vendor_cache", {})
+    messages = []
+
+    assert wifiselector._lookup_vendor("00:c0:ca:32:bd:25", log=messages.append) == "OUI file download failed"
+    assert messages == ["Downloading MA-L"]
+    assert wifiselector._vendor_cache == {}
+
+    available = True
+    assert wifiselector._lookup_vendor("00:c0:ca:32:bd:25", log=messages.append) == "ALFA, INC."
+    assert wifiselector._vendor_cache == {"00:c0:ca:32:bd:25": "ALFA, INC."}
+
+
+
+def test_refresh_reuses_running_resolver(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    looked_up = []
+
+    def slow_lookup(mac_address, log=print):
+        looked_up.append((mac_address, threading.current_thread()))
+        started.set()
+        release.wait(5)
+        return "Vendor"
+
+    monkeypatch.setattr(wifiselector, "drawline", lambda linetype: None)
+    monkeypatch.setattr(wifiselector, "_lookup_vendor", slow_lookup)
+    monkeypatch.setattr(wifiselector, "_vendor_cache", {})
+    interfaces = {"wlan0": "00:c0:ca:00:00:01", "wlan1": "00:c0:ca:00:00:02"}
+
+    first = wifiselector._InterfaceList(interfaces, showmac=True, linetype=1)
+    resolver = wifiselector._resolver_thread
+    assert started.wait(5)
+    first.close()  # 'r' while the first lookup (i.e. a download) is in flight
+    second = wifiselector._InterfaceList(interfaces, showmac=True, linetype=1)
+    assert wifiselector._resolver_thread is resolver
+    assert wifiselector._resolver_listing is second
+
+    release.set()
+    resolver.join(5)
+    assert not resolver.is_alive() and wifiselector._resolver_thread is None
+    assert {thread for _, thread in looked_up} == {resolver}
+    assert [mac for mac, _ in looked_up] == ["00:c0:ca:00:00:01", "00:c0:ca:00:00:01", "00:c0:ca:00:00:02"]